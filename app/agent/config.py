@@ -3,9 +3,18 @@ from typing import Any, Literal
 from pydantic import BaseModel
 
 
+class SummarizationConfig(BaseModel):
+    enabled: bool = False
+    debounce_seconds: float = 60.0
+    trigger_tokens: int = 4000
+    keep_tokens: int = 1500
+    model: str | None = None
+
+
 class AgentConfig(BaseModel):
     prompt_source: Literal["file", "langfuse"] = "file"
     checkpoint_type: Literal["memory", "postgres"] = "memory"
+    summarization: SummarizationConfig = SummarizationConfig()
 
     custom_params: dict[str, Any] = {}
 
@@ -9,6 +9,17 @@ from langfuse import Langfuse
 from app.agent.config import AgentConfig
 from app.agent.interfaces import AgentInstance
 from app.agent.langgraph.checkpoint.resolver import CheckpointerResolver
+from app.agent.langgraph.llm import (
+    ChainCache,
+    CircuitBreakers,
+    HedgeBudgets,
+    LLMRateLimiter,
+    LLMTransport,
+    ModelCache,
+    ResponseCache,
+    SemanticResponseCache,
+)
+from app.agent.langgraph.tools import ToolPools, ToolResultCache
 from app.agent.prompt_resolver import PromptProviderResolver
 from app.bootstrap.config import AppConfig
 
@@ -30,11 +41,33 @@ class AgentFactory:
         langfuse_client: Langfuse,
         checkpointer_resolver: CheckpointerResolver,
         prompt_provider_resolver: PromptProviderResolver,
+        model_cache: ModelCache | None = None,
+        llm_transport: LLMTransport | None = None,
+        chain_cache: ChainCache | None = None,
+        response_cache: ResponseCache | None = None,
+        semantic_cache: SemanticResponseCache | None = None,
+        hedge_budgets: HedgeBudgets | None = None,
+        circuit_breakers: CircuitBreakers | None = None,
+        rate_limiter: LLMRateLimiter | None = None,
+        tool_pools: ToolPools | None = None,
+        tool_cache: ToolResultCache | None = None,
     ):
         self.global_config = global_config
         self._langfuse_client = langfuse_client
         self._checkpointer_resolver = checkpointer_resolver
         self._prompt_provider_resolver = prompt_provider_resolver
+        self._model_cache = ModelCache() if model_cache is None else model_cache
+        self._llm_transport = llm_transport
+        self._chain_cache = ChainCache() if chain_cache is None else chain_cache
+        self._response_cache = response_cache
+        self._semantic_cache = semantic_cache
+        self._hedge_budgets = HedgeBudgets() if hedge_budgets is None else hedge_budgets
+        self._circuit_breakers = (
+            CircuitBreakers() if circuit_breakers is None else circuit_breakers
+        )
+        self._rate_limiter = LLMRateLimiter() if rate_limiter is None else rate_limiter
+        self._tool_pools = ToolPools() if tool_pools is None else tool_pools
+        self._tool_cache = ToolResultCache() if tool_cache is None else tool_cache
 
     @classmethod
     def register_agent(
@@ -99,15 +132,30 @@ class AgentFactory:
         agent_instance = agent_class(
             checkpointer=checkpointer,
             prompt_provider=prompt_provider,
+            model_cache=self._model_cache,
+            transport=self._llm_transport,
+            chain_cache=self._chain_cache,
+            response_cache=self._response_cache,
+            semantic_cache=self._semantic_cache,
+            hedge_budgets=self._hedge_budgets,
+            circuit_breakers=self._circuit_breakers,
+            rate_limiter=self._rate_limiter,
+            tool_pools=self._tool_pools,
+            tool_cache=self._tool_cache,
             **agent_config.get_custom_params(),
         )
         compiled_graph = agent_instance.build_graph()
 
         from app.agent.langgraph.langgraph_agent_instance import LangGraphAgentInstance
+        from app.agent.services.stream_processor import StreamProcessor
 
         return LangGraphAgentInstance(
             agent_id=agent_id,
             graph=compiled_graph,
             tracing_client=self._langfuse_client,
             config=self.global_config,
+            stream_processor=StreamProcessor.from_params(
+                agent_config.get_custom_params()
+            ),
+            summarizer=agent_instance.get_summarizer(agent_config.summarization),
         )
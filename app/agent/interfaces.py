@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import AsyncGenerator
-from typing import Any, Protocol
+from typing import Protocol
+from uuid import UUID
 
+from app.agent.services.events import EventEncoder
+from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.stream_options import StreamOptions
 from app.bootstrap.config import AppConfig
 from app.models import Thread, User
 
@@ -14,15 +18,39 @@ class AgentInstance(ABC):
         self.config = config
 
     @abstractmethod
-    async def stream_response(
-        self, message: str, thread: Thread, user: User
-    ) -> AsyncGenerator[dict[str, Any]]:
+    def stream_events(
+        self,
+        message: str,
+        thread: Thread,
+        user: User,
+        run_id: UUID | None = None,
+        options: StreamOptions | None = None,
+    ) -> AsyncGenerator[BaseEvent]:
         pass
 
+    async def stream_response(
+        self,
+        message: str,
+        thread: Thread,
+        user: User,
+        run_id: UUID | None = None,
+        options: StreamOptions | None = None,
+    ) -> AsyncGenerator[bytes]:
+        encoder = EventEncoder()
+        async for event in self.stream_events(message, thread, user, run_id, options):
+            yield encoder.encode(event)
+
+    @property
+    def summarize_after(self) -> float | None:
+        """Seconds to wait after a run before summarizing its thread, None if off."""
+        return None
+
+    async def summarize_history(self, thread: Thread, user: User) -> None:
+        """Compact older turns of the thread so the next turn starts smaller."""
+        return None
+
     @abstractmethod
-    async def load_history(
-        self, thread: Thread, user: User
-    ) -> AsyncGenerator[dict[str, Any]]:
+    def load_history(self, thread: Thread, user: User) -> AsyncGenerator[bytes]:
         pass
 
 
@@ -8,13 +8,39 @@ from langgraph.graph import add_messages
 from langgraph.managed import IsLastStep
 from pydantic import BaseModel, Field
 
+TraceEntry = dict[str, str | None]
+
+
+def merge_trace_map(
+    left: list[TraceEntry], right: list[TraceEntry] | TraceEntry
+) -> list[TraceEntry]:
+    """Append trace entries, replacing any entry whose message id is already mapped.
+
+    Nodes return only their new entries. Full maps written by nodes before this
+    reducer existed merge idempotently, so older checkpoints need no rewrite.
+    """
+    if isinstance(right, dict):
+        right = [right]
+    if not right:
+        return left
+
+    ids = {entry.get("id") for entry in right}
+    if not any(entry.get("id") in ids for entry in left):
+        return [*left, *right]
+
+    merged = {entry.get("id"): entry for entry in left}
+    merged.update((entry.get("id"), entry) for entry in right)
+    return list(merged.values())
+
 
 class BaseState(BaseModel):
     messages: Annotated[Sequence[AnyMessage], add_messages] = Field(
         default_factory=list
     )
     llm_context: list[AnyMessage] | None = Field(default=None, exclude=True)
-    message_trace_map: list[dict[str, str | None]] = Field(default_factory=list)
+    message_trace_map: Annotated[list[TraceEntry], merge_trace_map] = Field(
+        default_factory=list
+    )
 
 
 class State(BaseState):
@@ -0,0 +1,11 @@
+from .summarizer import ConversationSummarizer
+from .token_counter import TokenCounter
+from .window import ContextBuilder, TokenBudgetWindow, resolve_history
+
+__all__ = [
+    "ContextBuilder",
+    "ConversationSummarizer",
+    "TokenBudgetWindow",
+    "TokenCounter",
+    "resolve_history",
+]
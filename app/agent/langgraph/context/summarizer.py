@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from app.agent.config import SummarizationConfig
+from app.agent.langgraph.context.token_counter import TokenCounter, shared_token_counter
+from app.agent.langgraph.context.window import TokenBudgetWindow, resolve_history
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ID = "conversation_summary"
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Merge the previous summary with the new messages into one "
+    "concise summary. Keep facts, decisions, user preferences, open questions "
+    "and tool results that later turns may rely on. Reply with the summary only."
+)
+
+
+def _render(message: AnyMessage) -> str:
+    text = message.text()
+    if isinstance(message, AIMessage) and message.tool_calls:
+        calls = ", ".join(
+            f"{call['name']}({call['args']})" for call in message.tool_calls
+        )
+        text = f"{text}\n[called {calls}]".strip()
+    return f"{message.type}: {text}"
+
+
+class ConversationSummarizer:
+    """Compacts older turns of a thread into a rolling summary in ``llm_context``.
+
+    Runs after a turn has finished. Nothing happens until the uncompacted history
+    exceeds ``trigger_tokens``; then everything except the latest ``keep_tokens``
+    worth of messages is folded into the summary. The summary is written as
+    ``as_node``, so the thread resumes as if that node had just finished.
+    """
+
+    def __init__(
+        self,
+        config: SummarizationConfig,
+        model_factory: Callable[[], BaseChatModel],
+        counter: TokenCounter | None = None,
+        as_node: str = "call_model",
+    ):
+        self.config = config
+        self._model_factory = model_factory
+        self.counter = shared_token_counter if counter is None else counter
+        self.as_node = as_node
+
+    @property
+    def debounce(self) -> float:
+        return self.config.debounce_seconds
+
+    async def summarize(
+        self, graph: CompiledStateGraph[Any, Any, Any], config: RunnableConfig
+    ) -> bool:
+        snapshot = await graph.aget_state(config)
+        messages = snapshot.values.get("messages", [])
+        if not messages:
+            return False
+
+        history = resolve_history(messages, snapshot.values.get("llm_context"))
+        summary = history[0] if history and history[0].id == SUMMARY_ID else None
+        body = history[1:] if summary else history
+
+        if sum(self.counter.count(m) for m in body) <= self.config.trigger_tokens:
+            return False
+
+        recent = TokenBudgetWindow(self.config.keep_tokens, self.counter).build(body)
+        older = body[: len(body) - len(recent)]
+        if not older:
+            return False
+
+        text = await self._summarize(summary, older)
+        await graph.aupdate_state(
+            config,
+            {
+                "llm_context": [
+                    SystemMessage(
+                        id=SUMMARY_ID,
+                        content=f"Summary of the earlier conversation:\n{text}",
+                    ),
+                    *recent,
+                ]
+            },
+            as_node=self.as_node,
+        )
+        logger.debug(f"Summarized {len(older)} messages, kept {len(recent)}")
+        return True
+
+    async def _summarize(
+        self, summary: AnyMessage | None, messages: list[AnyMessage]
+    ) -> str:
+        previous = summary.text() if summary else "(none)"
+        transcript = "\n".join(_render(message) for message in messages)
+        response = await self._model_factory().ainvoke(
+            [
+                SystemMessage(content=SUMMARY_INSTRUCTIONS),
+                HumanMessage(
+                    content=f"Previous summary:\n{previous}\n\nNew messages:\n{transcript}"
+                ),
+            ]
+        )
+        return response.text()
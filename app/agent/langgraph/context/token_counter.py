@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+
+def _approximate(message: BaseMessage) -> int:
+    return count_tokens_approximately([message])
+
+
+class TokenCounter:
+    """Counts message tokens once and remembers the result per message.
+
+    Messages are keyed by id plus content length, so an edited message is
+    counted again. Messages without an id are counted on every call.
+    """
+
+    def __init__(
+        self,
+        count: Callable[[BaseMessage], int] = _approximate,
+        maxsize: int = 50_000,
+    ):
+        self._count = count
+        self.maxsize = maxsize
+        self._counts: OrderedDict[Hashable, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def count(self, message: BaseMessage) -> int:
+        if message.id is None:
+            return self._count(message)
+
+        key = (message.id, message.type, len(str(message.content)))
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                return cached
+
+        tokens = self._count(message)
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return tokens
+
+
+shared_token_counter = TokenCounter()
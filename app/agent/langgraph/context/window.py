@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, SystemMessage, ToolMessage
+
+from app.agent.langgraph.context.token_counter import TokenCounter, shared_token_counter
+
+
+class ContextBuilder(ABC):
+    @abstractmethod
+    def build(self, messages: Sequence[AnyMessage]) -> list[AnyMessage]:
+        """Select the messages sent to the model for this call."""
+        pass
+
+
+def group_units(messages: Sequence[AnyMessage]) -> list[list[AnyMessage]]:
+    """Split history into units that must be kept or dropped together.
+
+    An AI message with tool calls forms one unit with the tool results that
+    answer it; every other message is a unit of its own.
+    """
+    units: list[list[AnyMessage]] = []
+    pending: set[str] = set()
+
+    for message in messages:
+        if isinstance(message, ToolMessage) and message.tool_call_id in pending:
+            units[-1].append(message)
+            pending.discard(message.tool_call_id)
+            continue
+
+        units.append([message])
+        pending = (
+            {call["id"] for call in message.tool_calls if call["id"]}
+            if isinstance(message, AIMessage)
+            else set()
+        )
+
+    return units
+
+
+def resolve_history(
+    messages: Sequence[AnyMessage], llm_context: Sequence[AnyMessage] | None
+) -> list[AnyMessage]:
+    """Combine a compacted ``llm_context`` with the messages added after it.
+
+    The compacted context ends with recent messages copied from the thread; the
+    last of them that is still in *messages* anchors where new messages begin.
+    Without an anchor the full history is used.
+    """
+    if not llm_context:
+        return list(messages)
+
+    positions = {message.id: i for i, message in enumerate(messages) if message.id}
+    for message in reversed(llm_context):
+        if message.id in positions:
+            return [*llm_context, *messages[positions[message.id] + 1 :]]
+    return list(messages)
+
+
+class TokenBudgetWindow(ContextBuilder):
+    """Keeps leading system messages and the most recent units within a budget.
+
+    The latest unit is always kept, even when it alone exceeds the budget.
+    """
+
+    def __init__(self, budget: int, counter: TokenCounter | None = None):
+        self.budget = budget
+        self.counter = shared_token_counter if counter is None else counter
+
+    def count(self, messages: Sequence[AnyMessage]) -> int:
+        return sum(self.counter.count(message) for message in messages)
+
+    def build(self, messages: Sequence[AnyMessage]) -> list[AnyMessage]:
+        pinned: list[AnyMessage] = []
+        start = 0
+        while start < len(messages) and isinstance(messages[start], SystemMessage):
+            pinned.append(messages[start])
+            start += 1
+
+        remaining = self.budget - self.count(pinned)
+        window: list[list[AnyMessage]] = []
+        for unit in reversed(group_units(messages[start:])):
+            tokens = self.count(unit)
+            if window and tokens > remaining:
+                break
+            window.append(unit)
+            remaining -= tokens
+
+        return pinned + [message for unit in reversed(window) for message in unit]
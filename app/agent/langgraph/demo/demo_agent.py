@@ -5,7 +5,6 @@ from langchain_core.messages import AIMessage
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import ToolNode
 
 from app.agent.langgraph import Graph
 from app.agent.langgraph.base_state import BaseState, State
@@ -47,7 +46,7 @@ class DemoAgent(Graph):
         )
 
         builder.add_node("call_model", self.call_model)
-        builder.add_node("tools", ToolNode(TOOLS))
+        builder.add_node("tools", self.get_tool_node())
 
         builder.add_edge(START, "call_model")
         builder.add_conditional_edges("call_model", route_model_output)
@@ -1,9 +1,10 @@
-from typing import Any
+from typing import Any, ClassVar
 
 from langchain_core.tools import ArgsSchema, BaseTool
 from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 
+from app.agent.langgraph.tools import ExecutionPolicy
 from app.agent.models import CustomUIMessage
 
 
@@ -15,6 +16,7 @@ class WeatherTool(BaseTool):
     name: str = "get_weather"
     description: str = "Get weather information for a given city"
     args_schema: ArgsSchema | None = WeatherInput
+    execution_policy: ClassVar[ExecutionPolicy] = ExecutionPolicy.ASYNC
 
     async def _arun(self, city: str, **kwargs: Any) -> str:
         writer = get_stream_writer()
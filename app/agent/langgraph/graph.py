@@ -1,38 +1,172 @@
 from __future__ import annotations
 
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from typing import Any, TypedDict, cast
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AIMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+)
+from langchain_core.messages.ai import add_ai_message_chunks
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
 from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph.state import CompiledStateGraph
 
+from app.agent.config import SummarizationConfig
 from app.agent.langgraph.base_state import BaseState, State
+from app.agent.langgraph.context import (
+    ContextBuilder,
+    ConversationSummarizer,
+    TokenBudgetWindow,
+    resolve_history,
+)
+from app.agent.langgraph.context.token_counter import shared_token_counter
+from app.agent.langgraph.llm import (
+    ChainCache,
+    CircuitBreakers,
+    HedgeBudgets,
+    LLMRateLimiter,
+    LLMTransport,
+    ModelCache,
+    ResponseCache,
+    SemanticResponseCache,
+)
+from app.agent.langgraph.llm.chain_cache import Chain, chain_cache_key
+from app.agent.langgraph.llm.circuit_breaker import (
+    FALLBACK_CALLS,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_provider_failure,
+)
+from app.agent.langgraph.llm.hedging import hedged_stream, relay
+from app.agent.langgraph.llm.rate_limiter import Reservation, is_unprocessed
+from app.agent.langgraph.llm.response_cache import (
+    RESPONSE_CACHE_REQUESTS,
+    ReplayChatModel,
+    response_cache_key,
+)
+from app.agent.langgraph.llm.usage import record_usage
+from app.agent.langgraph.tools import ToolExecutor, ToolPools, ToolResultCache
 from app.agent.prompt import Prompt, PromptProvider
 
 logger = logging.getLogger(__name__)
 
+VOLATILE_PLACEHOLDER_NOTE = "(see the latest context message)"
+
 
 class ModelResponse(TypedDict):
     messages: list[AIMessage]
     message_trace_map: list[dict[str, str | None]]
 
 
+class ModelCall:
+    """The circuit breaker slot and rate-limit reservation held by one model
+    request. Only its first outcome counts; ``release`` after it is a no-op and
+    a released request keeps its estimated token spend.
+    """
+
+    def __init__(
+        self, breaker: CircuitBreaker, reservation: Reservation, prompt_tokens: int
+    ):
+        self._breaker = breaker
+        self._reservation = reservation
+        self._prompt_tokens = prompt_tokens
+        self._started = time.perf_counter()
+        self._done = False
+
+    def succeeded(self, response: AIMessage) -> None:
+        if self._finish():
+            self._breaker.record(True, time.perf_counter() - self._started)
+            if response.usage_metadata:
+                used = response.usage_metadata["total_tokens"]
+            else:
+                used = self._prompt_tokens + shared_token_counter.count(response)
+            self._reservation.settle(used)
+
+    def failed(self, error: Exception) -> None:
+        """Count *error* against the model only if it is a provider failure, and
+        refund the reserved tokens only if the provider never processed the call.
+        """
+        if not self._finish():
+            return
+        if is_unprocessed(error):
+            self._reservation.settle(0)
+        if is_provider_failure(error):
+            self._breaker.record(False, time.perf_counter() - self._started)
+        else:
+            self._breaker.release()
+
+    def release(self) -> None:
+        """End the request without an outcome, e.g. when it was cancelled."""
+        if self._finish():
+            self._breaker.release()
+
+    def _finish(self) -> bool:
+        done, self._done = self._done, True
+        return not done
+
+
+async def _tracked(
+    stream: AsyncIterator[AIMessageChunk], call: ModelCall
+) -> AsyncIterator[AIMessageChunk]:
+    chunks: list[AIMessageChunk] = []
+    try:
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        call.failed(e)
+        raise
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    call.succeeded(add_ai_message_chunks(*chunks) if chunks else AIMessage(content=""))
+
+
 class Graph(ABC):
     def __init__(
         self,
         checkpointer: BaseCheckpointSaver[Any],
         prompt_provider: PromptProvider,
+        model_cache: ModelCache | None = None,
+        transport: LLMTransport | None = None,
+        chain_cache: ChainCache | None = None,
+        response_cache: ResponseCache | None = None,
+        semantic_cache: SemanticResponseCache | None = None,
+        hedge_budgets: HedgeBudgets | None = None,
+        circuit_breakers: CircuitBreakers | None = None,
+        rate_limiter: LLMRateLimiter | None = None,
+        tool_pools: ToolPools | None = None,
+        tool_cache: ToolResultCache | None = None,
         **kwargs: Any,
     ):
         self._checkpointer = checkpointer
         self._prompt_provider = prompt_provider
+        self._model_cache = ModelCache() if model_cache is None else model_cache
+        self._transport = transport
+        self._chain_cache = ChainCache() if chain_cache is None else chain_cache
+        self._response_cache = response_cache
+        self._semantic_cache = semantic_cache
+        self._hedge_budgets = HedgeBudgets() if hedge_budgets is None else hedge_budgets
+        self._circuit_breakers = (
+            CircuitBreakers() if circuit_breakers is None else circuit_breakers
+        )
+        self._rate_limiter = LLMRateLimiter() if rate_limiter is None else rate_limiter
+        self._tool_pools = tool_pools
+        self._tool_cache = tool_cache
         self._custom_params = kwargs
 
     @property
@@ -48,6 +182,19 @@ class Graph(ABC):
 
     def get_model(self, prompt: Prompt) -> BaseChatModel:
         cfg = getattr(prompt, "config", {}) or {}
+
+        # Fallback and hedge models share the prompt, so the model is part of
+        # the owner: switching between them must not evict the other's client.
+        return self._model_cache.get_or_create(
+            cfg,
+            lambda: self.create_model(cfg),
+            owner=(
+                f"{self.get_prompt_name()}:{self.get_prompt_label()}"
+                f":{cfg.get('model', '')}"
+            ),
+        )
+
+    def create_model(self, cfg: dict[str, Any]) -> BaseChatModel:
         cfg_model = cfg.get("model", "")
         provider, model = cfg_model.split("/", 1)
 
@@ -58,6 +205,7 @@ class Graph(ABC):
                 model_provider=provider,
                 temperature=cfg.get("temperature"),
                 max_tokens=cfg.get("max_tokens"),
+                **(self._transport.model_kwargs(provider) if self._transport else {}),
             ),
         )
 
@@ -98,9 +246,82 @@ class Graph(ABC):
         """Get tools for the model. Override to provide specific tools."""
         return []
 
+    def get_tool_node(self) -> ToolExecutor:
+        """Get the node that runs tool calls. Override to customize execution."""
+        return ToolExecutor(
+            self.get_tools(),
+            timeout=float(self._custom_params.get("tool_timeout", 30)),
+            max_concurrency=int(self._custom_params.get("tool_max_concurrency", 4)),
+            timeouts=self._custom_params.get("tool_timeouts"),
+            concurrency=self._custom_params.get("tool_concurrency"),
+            pools=self._tool_pools,
+            cache=self._tool_cache,
+            cache_ttl=float(self._custom_params.get("tool_cache_ttl", 0)),
+        )
+
     def get_prompt_placeholders(self) -> dict[str, str]:
         """Get placeholder variables for prompt template. Override to add more."""
-        return {"system_time": datetime.now(tz=UTC).isoformat()}
+        return {"system_time": self.get_system_time().isoformat()}
+
+    def get_system_time(self) -> datetime:
+        """Get the current time, rounded down to ``system_time_granularity`` seconds."""
+        now = datetime.now(tz=UTC)
+        granularity = float(self._custom_params.get("system_time_granularity", 0))
+        if granularity <= 0:
+            return now
+        return datetime.fromtimestamp(
+            now.timestamp() // granularity * granularity, tz=UTC
+        )
+
+    def is_prompt_cache_layout(self) -> bool:
+        """Keep the system prompt byte-stable and move volatile values to the end."""
+        return bool(self._custom_params.get("prompt_cache_layout", False))
+
+    def get_volatile_placeholders(self) -> set[str]:
+        """Placeholders that change between calls. Override when adding volatile ones."""
+        return {"system_time"}
+
+    def format_volatile_context(self, values: dict[str, str]) -> str:
+        """Render volatile placeholder values for the trailing context message."""
+        return "\n".join(f"{name}: {value}" for name, value in sorted(values.items()))
+
+    def get_context_budget(self, prompt: Prompt) -> int | None:
+        """Token budget for history sent to the model, or None to send all of it.
+
+        Read from the prompt config first, then from the ``context_token_budget``
+        custom param, which may be a number or a mapping of model to number.
+        """
+        budget = prompt.config.get("context_token_budget")
+        if budget is None:
+            budget = self._custom_params.get("context_token_budget")
+        if isinstance(budget, dict):
+            budget = budget.get(prompt.config.get("model", ""))
+        return int(budget) if budget else None
+
+    def get_context_builder(self, prompt: Prompt) -> ContextBuilder | None:
+        """Get the history context builder. Override to plug in another strategy."""
+        budget = self.get_context_budget(prompt)
+        return TokenBudgetWindow(budget) if budget else None
+
+    def build_context(self, state: BaseState, prompt: Prompt) -> list[AnyMessage]:
+        history = resolve_history(state.messages, state.llm_context)
+
+        builder = self.get_context_builder(prompt)
+        if builder is None:
+            return history
+        return builder.build(history)
+
+    def get_summarizer(
+        self, config: SummarizationConfig
+    ) -> ConversationSummarizer | None:
+        """Get the post-run history summarizer, or None when it is disabled."""
+        if not config.enabled:
+            return None
+        return ConversationSummarizer(config, lambda: self.get_summary_model(config))
+
+    def get_summary_model(self, config: SummarizationConfig) -> BaseChatModel:
+        cfg = {"model": config.model or self.get_default_model(), "temperature": 0}
+        return self._model_cache.get_or_create(cfg, lambda: self.create_model(cfg))
 
     def is_emergency_stop_needed(self, state: BaseState, response: AIMessage) -> bool:
         """Check if emergency stop is needed. Override for custom emergency stop logic."""
@@ -121,37 +342,315 @@ class Graph(ABC):
     def _with_tools(model: Any, tools: list[Any] | None = None) -> Any:
         return model.bind_tools(tools) if tools else model
 
-    async def call_model(
-        self, state: BaseState, config: RunnableConfig
-    ) -> ModelResponse:
-        """Base implementation of call_model. Can be overridden if needed."""
-        prompt = self._prompt_provider.get_prompt(
-            self.get_prompt_name(), self.get_prompt_label(), self.get_prompt_fallback()
+    def get_chain(self, prompt: Prompt) -> Chain:
+        """Get the cached chain for this prompt version, model config and tool set."""
+        tools = self.get_tools()
+        return self._chain_cache.get_or_create(
+            chain_cache_key(prompt, tools, self.is_prompt_cache_layout()),
+            lambda: self.build_chain(prompt, tools),
         )
 
-        model = self._with_tools(self.get_model(prompt), self.get_tools())
+    def build_chain(self, prompt: Prompt, tools: list[Any]) -> Chain:
+        model = self._with_tools(self.get_model(prompt), tools)
 
         template = ChatPromptTemplate.from_messages(
             [
                 ("system", prompt.content),
                 MessagesPlaceholder("history"),
             ]
-        ).partial(**self.get_prompt_placeholders())
+        )
+        if self.is_prompt_cache_layout():
+            # Volatile placeholders are bound to a constant so the system prompt
+            # stays byte-stable; their values arrive in a trailing message.
+            template = (template + MessagesPlaceholder("volatile_context")).partial(
+                **dict.fromkeys(
+                    self.get_volatile_placeholders(), VOLATILE_PLACEHOLDER_NOTE
+                )
+            )
         template.metadata = prompt.metadata
 
-        chain = template | model
+        return cast(Chain, template | model)
 
-        response = cast(
-            AIMessage,
-            await chain.ainvoke(
-                {
-                    "history": state.llm_context
-                    if state.llm_context is not None
-                    else state.messages
-                },
-                config=config,
-            ),
+    def get_response_cache_ttl(self) -> float:
+        """Seconds to keep model responses for identical requests, 0 to disable."""
+        return float(self._custom_params.get("response_cache_ttl", 0))
+
+    def get_semantic_cache_threshold(self) -> float | None:
+        """Cosine similarity a cached single-turn answer needs, None to disable.
+
+        Off unless the agent sets ``semantic_cache_threshold``; answers must not
+        depend on the user, and time-dependent ones need a time granularity.
+        """
+        threshold = self._custom_params.get("semantic_cache_threshold")
+        return float(threshold) if threshold else None
+
+    def get_semantic_cache_text(self, history: list[AnyMessage]) -> str | None:
+        """The user message to match semantically, only for single-turn requests."""
+        if len(history) != 1 or not isinstance(history[0], HumanMessage):
+            return None
+        content = history[0].content
+        return content if isinstance(content, str) else None
+
+    def get_cache_inputs(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Prompt inputs that identify a request to the response caches.
+
+        Volatile placeholders are kept only when ``system_time_granularity``
+        rounds the time, so cached answers expire with the time the model saw;
+        otherwise they would make every request unique and are left out, and
+        only the cache TTL bounds how stale a replayed answer gets.
+        """
+        if float(self._custom_params.get("system_time_granularity", 0)) > 0:
+            return inputs
+        volatile = {*self.get_volatile_placeholders(), "volatile_context"}
+        return {k: v for k, v in inputs.items() if k not in volatile}
+
+    async def invoke_chain(
+        self, prompt: Prompt, inputs: dict[str, Any], config: RunnableConfig
+    ) -> AIMessage:
+        """Invoke the prompt chain, answering from the response caches when they
+        are enabled and the run does not bypass them: first requests identical to
+        an earlier one, then single-turn requests similar to an earlier one.
+        """
+        chain = self.get_chain(prompt)
+        ttl = self.get_response_cache_ttl()
+        exact = self._response_cache if ttl > 0 else None
+        threshold = self.get_semantic_cache_threshold()
+        question = (
+            self.get_semantic_cache_text(inputs["history"])
+            if self._semantic_cache is not None and threshold is not None
+            else None
+        )
+        if exact is None and question is None:
+            return await self.call_chain(prompt, chain, inputs, config)
+
+        model = str(prompt.config.get("model", ""))
+        if config.get("configurable", {}).get("response_cache_bypass"):
+            RESPONSE_CACHE_REQUESTS.labels(model=model, result="bypass").inc()
+            return await self.call_chain(prompt, chain, inputs, config)
+
+        cache_inputs = self.get_cache_inputs(inputs)
+        tools = self.get_tools()
+        key = response_cache_key(prompt.content, cache_inputs, tools, prompt.config)
+        if exact is not None:
+            cached = await exact.get(key)
+            RESPONSE_CACHE_REQUESTS.labels(
+                model=model, result="miss" if cached is None else "hit"
+            ).inc()
+            if cached is not None:
+                return await self._replay(cached, inputs, config)
+
+        namespace = response_cache_key(
+            prompt.content,
+            {k: v for k, v in cache_inputs.items() if k != "history"},
+            tools,
+            prompt.config,
+        )
+        if question is not None and threshold is not None:
+            assert self._semantic_cache is not None
+            hit = self._semantic_cache.lookup(
+                namespace, question, threshold, agent=self.graph_name
+            )
+            if hit is not None:
+                return await self._replay(hit.message, inputs, config)
+
+        response = await self.call_chain(prompt, chain, inputs, config)
+        if exact is not None:
+            await exact.set(key, response, ttl)
+        if question is not None and not response.tool_calls:
+            assert self._semantic_cache is not None
+            self._semantic_cache.store(namespace, question, response)
+        return response
+
+    def get_hedge_delay(self) -> float | None:
+        """Seconds to wait for a first token before hedging, None to never hedge."""
+        delay_ms = self._custom_params.get("hedge_delay_ms")
+        return float(delay_ms) / 1000 if delay_ms else None
+
+    def get_hedge_max_ratio(self) -> float:
+        """Largest share of model calls that may send a hedge request."""
+        return float(self._custom_params.get("hedge_max_ratio", 0.1))
+
+    @staticmethod
+    def with_model(prompt: Prompt, model: str) -> Prompt:
+        return prompt.model_copy(update={"config": {**prompt.config, "model": model}})
+
+    def get_fallback_models(self, prompt: Prompt) -> list[str]:
+        """Models to use, in order, while the prompt model's circuit is open.
+
+        Read from the prompt config's ``fallback_models`` list, or its single
+        ``fallback_model``.
+        """
+        fallbacks = prompt.config.get("fallback_models")
+        if fallbacks is None:
+            fallback = prompt.config.get("fallback_model")
+            fallbacks = [fallback] if fallback else []
+        return [str(model) for model in fallbacks]
+
+    async def call_chain(
+        self,
+        prompt: Prompt,
+        chain: Chain,
+        inputs: dict[str, Any],
+        config: RunnableConfig,
+    ) -> AIMessage:
+        """Call the first model in the fallback chain whose circuit is not open.
+
+        Provider failures (timeouts, connection errors, 429 and 5xx) and slow
+        calls feed that model's circuit breaker; other errors are re-raised
+        without touching it. When every circuit is open the call fails at once
+        instead of waiting for a timeout.
+        """
+        preferred = str(prompt.config.get("model", ""))
+        models = [preferred, *self.get_fallback_models(prompt)]
+        model = next(
+            (m for m in models if self._circuit_breakers.get(m).try_acquire()), None
+        )
+        if model is None:
+            raise CircuitOpenError(models)
+        if model != preferred:
+            FALLBACK_CALLS.labels(model=preferred, fallback=model).inc()
+            prompt = self.with_model(prompt, model)
+            chain = self.get_chain(prompt)
+
+        breaker = self._circuit_breakers.get(model)
+        prompt_tokens = self.estimate_prompt_tokens(prompt, inputs)
+        try:
+            reservation = await self._rate_limiter.acquire(
+                model, prompt_tokens + self.get_call_max_tokens(prompt)
+            )
+        except BaseException:
+            breaker.release()
+            raise
+
+        call = ModelCall(breaker, reservation, prompt_tokens)
+        try:
+            return await self.invoke_hedged(prompt, chain, inputs, config, call)
+        finally:
+            call.release()
+
+    def try_admit(self, prompt: Prompt, inputs: dict[str, Any]) -> ModelCall | None:
+        """Admit a request to the prompt's model only if its circuit and rate
+        limits let it through right away.
+        """
+        model = str(prompt.config.get("model", ""))
+        breaker = self._circuit_breakers.get(model)
+        if not breaker.try_acquire():
+            return None
+        prompt_tokens = self.estimate_prompt_tokens(prompt, inputs)
+        reservation = self._rate_limiter.try_acquire(
+            model, prompt_tokens + self.get_call_max_tokens(prompt)
+        )
+        if reservation is None:
+            breaker.release()
+            return None
+        return ModelCall(breaker, reservation, prompt_tokens)
+
+    def estimate_prompt_tokens(self, prompt: Prompt, inputs: dict[str, Any]) -> int:
+        """Tokens of the rendered prompt; a call reserves these plus its
+        ``max_tokens`` against the rate limits.
+        """
+        messages = [
+            SystemMessage(content=prompt.content),
+            *inputs.get("history", []),
+            *inputs.get("volatile_context", []),
+        ]
+        return sum(shared_token_counter.count(message) for message in messages)
+
+    def get_call_max_tokens(self, prompt: Prompt) -> int:
+        return int(prompt.config.get("max_tokens") or self.get_max_tokens())
+
+    async def invoke_hedged(
+        self,
+        prompt: Prompt,
+        chain: Chain,
+        inputs: dict[str, Any],
+        config: RunnableConfig,
+        call: ModelCall,
+    ) -> AIMessage:
+        """Call the model, hedging slow first tokens when a hedge delay is set.
+
+        The hedge goes to the prompt config's ``fallback_model`` or, without one,
+        to the same model, and only when that model's circuit and rate limits
+        admit it without waiting. Both requests stream privately; the winner is
+        relayed so clients only see its tokens.
+        """
+        delay = self.get_hedge_delay()
+        if delay is None:
+            try:
+                response = cast(AIMessage, await chain.ainvoke(inputs, config=config))
+            except Exception as e:
+                call.failed(e)
+                raise
+            call.succeeded(response)
+            return response
+
+        fallback = prompt.config.get("fallback_model")
+        hedge_prompt = self.with_model(prompt, fallback) if fallback else prompt
+        hedge_chain = self.get_chain(hedge_prompt) if fallback else chain
+        private = merge_configs(config, RunnableConfig(tags=[TAG_NOSTREAM]))
+        hedge_calls: list[ModelCall] = []
+
+        def hedge() -> AsyncIterator[AIMessageChunk] | None:
+            hedge_call = self.try_admit(hedge_prompt, inputs)
+            if hedge_call is None:
+                return None
+            hedge_calls.append(hedge_call)
+            return _tracked(hedge_chain.astream(inputs, config=private), hedge_call)
+
+        try:
+            head, stream = await hedged_stream(
+                lambda: _tracked(chain.astream(inputs, config=private), call),
+                hedge,
+                delay,
+                self._hedge_budgets.get(self.graph_name, self.get_hedge_max_ratio()),
+                agent=self.graph_name,
+            )
+            return await relay(head, stream, inputs["history"], config)
+        finally:
+            for hedge_call in hedge_calls:
+                hedge_call.release()
+
+    @staticmethod
+    async def _replay(
+        message: AIMessage, inputs: dict[str, Any], config: RunnableConfig
+    ) -> AIMessage:
+        replay = ReplayChatModel(message=message)
+        return cast(AIMessage, await replay.ainvoke(inputs["history"], config=config))
+
+    def get_prompt_inputs(self) -> dict[str, Any]:
+        placeholders = self.get_prompt_placeholders()
+        if not self.is_prompt_cache_layout():
+            return placeholders
+
+        volatile = self.get_volatile_placeholders()
+        return {
+            **{k: v for k, v in placeholders.items() if k not in volatile},
+            "volatile_context": [
+                SystemMessage(
+                    content=self.format_volatile_context(
+                        {k: v for k, v in placeholders.items() if k in volatile}
+                    )
+                )
+            ],
+        }
+
+    async def call_model(
+        self, state: BaseState, config: RunnableConfig
+    ) -> ModelResponse:
+        """Base implementation of call_model. Can be overridden if needed."""
+        prompt = self._prompt_provider.get_prompt(
+            self.get_prompt_name(), self.get_prompt_label(), self.get_prompt_fallback()
+        )
+
+        response = await self.invoke_chain(
+            prompt,
+            {
+                **self.get_prompt_inputs(),
+                "history": self.build_context(state, prompt),
+            },
+            config,
         )
+        record_usage(str(prompt.config.get("model", "")), response)
 
         if self.is_emergency_stop_needed(state, response):
             response = self.create_emergency_response(response)
@@ -161,7 +660,6 @@ class Graph(ABC):
         return {
             "messages": [response],
             "message_trace_map": [
-                *state.message_trace_map,
                 {
                     "id": response.id,
                     "trace_id": metadata.get("trace_id"),
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
 from typing import Any
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
@@ -14,9 +14,11 @@ from langfuse.langchain import CallbackHandler
 from langgraph.graph.state import CompiledStateGraph
 
 from app.agent.interfaces import AgentInstance
+from app.agent.langgraph.context import ConversationSummarizer
 from app.agent.langgraph.utils import to_chat_message
-from app.agent.services.events import EndEvent, ErrorEvent
+from app.agent.services.events import EndEvent, ErrorEvent, EventEncoder
 from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.stream_options import StreamOptions
 from app.agent.services.stream_processor import StreamProcessor
 from app.bootstrap.config import AppConfig
 from app.models import Thread, User
@@ -32,19 +34,42 @@ class LangGraphAgentInstance(AgentInstance):
         graph: CompiledStateGraph[Any, Any, Any],
         tracing_client: Langfuse,
         config: AppConfig | None = None,
+        stream_processor: StreamProcessor | None = None,
+        summarizer: ConversationSummarizer | None = None,
     ):
         super().__init__(agent_id, config or AppConfig())
         self.graph = graph
         self._tracing_client = tracing_client
-        self.stream_processor = StreamProcessor()
+        self.stream_processor = stream_processor or StreamProcessor()
+        self.encoder = EventEncoder()
+        self.summarizer = summarizer
 
-    async def stream_response(  # type: ignore[override]
-        self, message: str, thread: Thread, user: User
-    ) -> AsyncGenerator[dict[str, Any]]:
+    @property
+    def summarize_after(self) -> float | None:
+        return self.summarizer.debounce if self.summarizer else None
+
+    async def summarize_history(self, thread: Thread, user: User) -> None:
+        if self.summarizer is None:
+            return
+
+        await self.summarizer.summarize(
+            self.graph,
+            RunnableConfig(configurable={"thread_id": thread.id, "user_id": user.id}),
+        )
+
+    async def stream_events(
+        self,
+        message: str,
+        thread: Thread,
+        user: User,
+        run_id: UUID | None = None,
+        options: StreamOptions | None = None,
+    ) -> AsyncGenerator[BaseEvent]:
         with self._tracing_client.start_as_current_span(
             name=self.graph.name, input=message
         ) as span:
-            run_id = uuid4()
+            run_id = run_id or uuid4()
+            options = options or StreamOptions()
 
             thread.status = ThreadStatus.busy
             thread.updated_at = datetime.now(UTC)
@@ -57,6 +82,7 @@ class LangGraphAgentInstance(AgentInstance):
                 configurable={
                     "thread_id": thread.id,
                     "user_id": user.id,
+                    "response_cache_bypass": options.bypass_response_cache,
                 },
                 metadata={
                     "langfuse_session_id": str(thread.id),
@@ -78,27 +104,29 @@ class LangGraphAgentInstance(AgentInstance):
                         "status": thread.status.value if thread.status else None,
                     },
                     source="stream",
-                ).model_dump()
+                )
 
                 stream = self.graph.astream(
-                    inputs, stream_mode=["updates", "messages", "custom"], config=config
+                    inputs,
+                    stream_mode=options.stream_modes(),  # type: ignore[arg-type]
+                    config=config,
                 )
                 async for event in self.stream_processor.process_stream(
                     stream,  # type: ignore[arg-type]
                     run_id,
                     span,
+                    options,
                 ):
                     thread.status = ThreadStatus.idle
-                    yield event.model_dump()
+                    yield event
+            except asyncio.CancelledError:
+                thread.status = ThreadStatus.interrupted
+                raise
             except Exception as e:
                 thread.status = ThreadStatus.error
-                yield ErrorEvent(
-                    data=json.dumps({"run_id": str(run_id), "content": str(e)})
-                ).model_dump()
+                yield ErrorEvent.from_data({"run_id": str(run_id), "content": str(e)})
 
-    async def load_history(  # type: ignore[override]
-        self, thread: Thread, user: User
-    ) -> AsyncGenerator[dict[str, Any]]:
+    async def load_history(self, thread: Thread, user: User) -> AsyncGenerator[bytes]:
         try:
             state_snapshot = await self.graph.aget_state(
                 config=RunnableConfig(
@@ -113,22 +141,22 @@ class LangGraphAgentInstance(AgentInstance):
 
             messages = state_snapshot.values.get("messages", [])
             if not messages:
-                yield EndEvent(data=json.dumps({"status": "completed"})).model_dump()
+                yield self.encoder.encode(EndEvent.from_data({"status": "completed"}))
                 return
 
             for m in messages:
                 chat_msg = to_chat_message(m, trace_id=trace_by_id.get(m.id))
 
-                event = BaseEvent.from_payload(
-                    event=chat_msg.type, payload=chat_msg.model_dump(), source="history"
+                event = BaseEvent.from_model(
+                    event=chat_msg.type, model=chat_msg, source="history"
                 )
 
-                yield event.model_dump()
+                yield self.encoder.encode(event)
 
-            yield EndEvent(data=json.dumps({"status": "completed"})).model_dump()
+            yield self.encoder.encode(EndEvent.from_data({"status": "completed"}))
 
         except Exception as e:
             logger.error(f"Error loading history: {e}")
-            yield ErrorEvent(
-                data=json.dumps({"content": f"Error loading history: {str(e)}"})
-            ).model_dump()
+            yield self.encoder.encode(
+                ErrorEvent.from_data({"content": f"Error loading history: {str(e)}"})
+            )
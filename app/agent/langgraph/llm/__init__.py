@@ -0,0 +1,19 @@
+from .chain_cache import ChainCache
+from .circuit_breaker import CircuitBreakers
+from .hedging import HedgeBudgets
+from .model_cache import ModelCache
+from .rate_limiter import LLMRateLimiter
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticResponseCache
+from .transport import LLMTransport
+
+__all__ = [
+    "ChainCache",
+    "CircuitBreakers",
+    "HedgeBudgets",
+    "LLMRateLimiter",
+    "LLMTransport",
+    "ModelCache",
+    "ResponseCache",
+    "SemanticResponseCache",
+]
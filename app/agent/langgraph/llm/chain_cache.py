@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any
+
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from prometheus_client import Counter
+
+from app.agent.langgraph.llm.model_cache import model_cache_key
+from app.agent.prompt import Prompt
+
+CHAIN_CACHE_HITS = Counter(
+    "agent_chain_cache_hits_total",
+    "Model calls served by a cached prompt chain",
+)
+CHAIN_CACHE_MISSES = Counter(
+    "agent_chain_cache_misses_total",
+    "Model calls that had to build a prompt chain",
+)
+
+Chain = Runnable[dict[str, Any], Any]
+
+
+# Canonical schema JSON per live tool object, keyed by id and dropped with the tool.
+_SCHEMAS: dict[int, tuple[weakref.ref[Any], str]] = {}
+
+
+def _forget_schema(key: int, ref: weakref.ref[Any]) -> None:
+    entry = _SCHEMAS.get(key)
+    if entry is not None and entry[0] is ref:
+        del _SCHEMAS[key]
+
+
+def tool_schema(tool: Any) -> str:
+    """The tool's schema as bound to the model, as canonical JSON; converted
+    once per tool object.
+    """
+    entry = _SCHEMAS.get(id(tool))
+    if entry is not None and entry[0]() is tool:
+        return entry[1]
+    schema = json.dumps(convert_to_openai_tool(tool), sort_keys=True, default=str)
+    key = id(tool)
+    try:
+        ref = weakref.ref(tool, functools.partial(_forget_schema, key))
+    except TypeError:  # dict specs and other objects without weak references
+        return schema
+    _SCHEMAS[key] = (ref, schema)
+    return schema
+
+
+def tools_fingerprint(tools: Sequence[Any]) -> str:
+    """Identify a tool set by the schemas bound to the model, so tools rebuilt
+    per call share a chain and a changed schema never reuses a stale one.
+    """
+    encoded = "\n".join(tool_schema(tool) for tool in tools)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def chain_cache_key(
+    prompt: Prompt, tools: Sequence[Any], layout: Hashable = None
+) -> tuple[Hashable, ...]:
+    content = hashlib.sha256(prompt.content.encode("utf-8")).hexdigest()
+    metadata = json.dumps(prompt.metadata, sort_keys=True, default=str)
+    return (
+        content,
+        metadata,
+        model_cache_key(prompt.config),
+        tools_fingerprint(tools),
+        layout,
+    )
+
+
+class ChainCache:
+    """Process-wide LRU of ready-to-invoke ``template | model`` chains."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._chains: OrderedDict[tuple[Hashable, ...], Chain] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def get_or_create(
+        self, key: tuple[Hashable, ...], factory: Callable[[], Chain]
+    ) -> Chain:
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is not None:
+                self._chains.move_to_end(key)
+                CHAIN_CACHE_HITS.inc()
+                return chain
+
+            CHAIN_CACHE_MISSES.inc()
+            chain = factory()
+            if self.maxsize > 0:
+                self._chains[key] = chain
+                while len(self._chains) > self.maxsize:
+                    self._chains.popitem(last=False)
+            return chain
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chains.clear()
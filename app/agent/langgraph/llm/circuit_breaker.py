@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE = Gauge(
+    "agent_llm_circuit_state",
+    "Circuit breaker state per model: 0 closed, 1 half-open, 2 open",
+    ["model"],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "agent_llm_circuit_transitions_total",
+    "Circuit breaker state changes per model",
+    ["model", "state"],
+)
+FALLBACK_CALLS = Counter(
+    "agent_llm_fallback_calls_total",
+    "Model calls routed to a fallback because the preferred model's circuit was open",
+    ["model", "fallback"],
+)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, models: list[str]):
+        super().__init__(f"All model circuits are open: {', '.join(models)}")
+        self.models = models
+
+
+# Provider SDK errors (OpenAI, Anthropic) that carry no HTTP status.
+_TRANSIENT_ERRORS = {"APITimeoutError", "APIConnectionError"}
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether *error* says the provider is unhealthy: a timeout, a connection
+    error, or a 429 or 5xx response. Anything else, such as a bad request or a
+    context-length error, is a problem with the call and leaves the circuit alone.
+    """
+    if isinstance(error, TimeoutError | ConnectionError | httpx.TransportError):
+        return True
+    status = error_status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+def error_status_code(error: BaseException) -> int | None:
+    """The HTTP status of a provider SDK or httpx status error, if it has one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+class CircuitBreaker:
+    """Tracks the outcome of recent calls to one model.
+
+    A call is bad when it fails or takes longer than ``slow_call_seconds``. The
+    circuit opens after ``consecutive_failures`` bad calls in a row, or when at
+    least ``min_calls`` of the last ``window`` calls were seen and the bad share
+    reaches ``failure_rate``. After ``open_seconds`` a single probe call is let
+    through; it closes the circuit on success and reopens it otherwise.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 60.0,
+        window: int = 20,
+        min_calls: int = 5,
+        consecutive_failures: int = 3,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._streak = 0
+        self._probing = False
+        CIRCUIT_STATE.labels(model=name).set(0)
+
+    @property
+    def bad_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def try_acquire(self) -> bool:
+        """Whether a call may go to this model now; a half-open circuit admits
+        one probe at a time, which must be ended with ``record`` or ``release``.
+        """
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release(self) -> None:
+        """End a call without an outcome, e.g. when the run was cancelled."""
+        self._probing = False
+
+    def record(self, success: bool, latency: float) -> None:
+        bad = not success or latency > self.slow_call_seconds
+        if self.state is CircuitState.HALF_OPEN:
+            self._probing = False
+            self._transition(CircuitState.OPEN if bad else CircuitState.CLOSED)
+            return
+
+        self._outcomes.append(bad)
+        self._streak = self._streak + 1 if bad else 0
+        if self.state is CircuitState.CLOSED and (
+            self._streak >= self.consecutive_failures
+            or (
+                len(self._outcomes) >= self.min_calls
+                and self.bad_rate >= self.failure_rate
+            )
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is self.state:
+            return
+        logger.warning(f"Circuit for model '{self.name}' is now {state.value}")
+        self.state = state
+        if state is CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+        if state is CircuitState.CLOSED:
+            self._outcomes.clear()
+            self._streak = 0
+        CIRCUIT_STATE.labels(model=self.name).set(_STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(model=self.name, state=state.value).inc()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "bad_rate": round(self.bad_rate, 3),
+            "calls": len(self._outcomes),
+        }
+
+
+class CircuitBreakers:
+    """Process-wide circuit breakers, one per model, created on first use."""
+
+    def __init__(self, **settings: Any):
+        self._settings = settings
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(model, **self._settings)
+        return breaker
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: b.snapshot() for name, b in sorted(self._breakers.items())}
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from typing import cast
+
+from langchain_core.callbacks import AsyncCallbackManager
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+)
+from langchain_core.outputs import ChatGenerationChunk, LLMResult
+from langchain_core.runnables import RunnableConfig
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+HEDGED_REQUESTS = Counter(
+    "agent_llm_hedged_requests_total",
+    "Model calls that outlived the hedge delay, by agent and outcome: "
+    "won/lost for the hedge request, skipped when the hedge budget was spent "
+    "or the hedge model could not take the request",
+    ["agent", "outcome"],
+)
+
+Stream = AsyncIterator[AIMessageChunk]
+# The chunks read up to the first token, and the rest of the stream.
+FirstChunk = tuple[list[AIMessageChunk], Stream]
+
+
+class HedgeBudget:
+    """Caps hedge requests to ``max_ratio`` of the calls in the last ``window``
+    seconds, bounding the extra provider cost hedging can cause.
+    """
+
+    def __init__(self, max_ratio: float, window: float = 60.0):
+        self.max_ratio = max_ratio
+        self.window = window
+        self._calls: deque[float] = deque()
+        self._hedges: deque[float] = deque()
+
+    def record_call(self) -> None:
+        self._calls.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        cutoff = time.monotonic() - self.window
+        for events in (self._calls, self._hedges):
+            while events and events[0] < cutoff:
+                events.popleft()
+        if len(self._hedges) >= self.max_ratio * len(self._calls):
+            return False
+        self._hedges.append(time.monotonic())
+        return True
+
+
+class HedgeBudgets:
+    """Process-wide hedge budgets, one per agent."""
+
+    def __init__(self) -> None:
+        self._budgets: dict[str, HedgeBudget] = {}
+
+    def get(self, agent: str, max_ratio: float) -> HedgeBudget:
+        budget = self._budgets.get(agent)
+        if budget is None or budget.max_ratio != max_ratio:
+            budget = self._budgets[agent] = HedgeBudget(max_ratio)
+        return budget
+
+
+def _has_output(chunk: AIMessageChunk) -> bool:
+    return bool(chunk.content or chunk.tool_call_chunks)
+
+
+async def _first_chunk(stream: Stream) -> FirstChunk:
+    # Role-only and metadata deltas can arrive long before the first token.
+    head: list[AIMessageChunk] = []
+    async for chunk in stream:
+        head.append(chunk)
+        if _has_output(chunk):
+            break
+    return head, stream
+
+
+async def _close(stream: Stream) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _discard(task: asyncio.Task[FirstChunk]) -> None:
+    if not task.done():
+        task.cancel()
+    with contextlib.suppress(BaseException):
+        _, stream = await task
+        await _close(stream)
+
+
+async def hedged_stream(
+    primary: Callable[[], Stream],
+    hedge: Callable[[], Stream | None],
+    delay: float,
+    budget: HedgeBudget,
+    agent: str = "",
+) -> FirstChunk:
+    """Start *primary*; if it has not produced a token after *delay* seconds and
+    the budget allows, start *hedge* too, which may return None to decline.
+    Return the chunks up to the first token (content or tool call data) of
+    whichever answers first together with the rest of its stream; the other is
+    cancelled.
+    """
+    budget.record_call()
+    tasks = [asyncio.create_task(_first_chunk(primary()))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        hedge_stream = None if done or not budget.try_acquire() else hedge()
+        if hedge_stream is None:
+            if not done:
+                HEDGED_REQUESTS.labels(agent=agent, outcome="skipped").inc()
+            return await tasks[0]
+
+        tasks.append(asyncio.create_task(_first_chunk(hedge_stream)))
+        pending: set[asyncio.Task[FirstChunk]] = set(tasks)
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # On a tie the primary wins; a failed request leaves the other running.
+            winner = next(
+                (t for t in tasks if t in done and t.exception() is None), None
+            )
+            for task in done:
+                if task.exception() is not None:
+                    logger.warning(f"Hedged model request failed: {task.exception()}")
+        if winner is None:
+            return await tasks[0]
+
+        HEDGED_REQUESTS.labels(
+            agent=agent, outcome="won" if winner is tasks[1] else "lost"
+        ).inc()
+        for task in tasks:
+            if task is not winner:
+                await _discard(task)
+        return winner.result()
+    except asyncio.CancelledError:
+        for task in tasks:
+            await _discard(task)
+        raise
+
+
+async def relay(
+    head: list[AIMessageChunk],
+    source: Stream,
+    messages: list[BaseMessage],
+    config: RunnableConfig,
+) -> AIMessage:
+    """Re-emit an already started stream through the callbacks in *config*, as
+    a chat model run would, so the winner of a hedged call streams to clients
+    like a direct model call. Returns the merged message.
+    """
+    callback_manager = AsyncCallbackManager.configure(
+        config.get("callbacks"),
+        inheritable_tags=config.get("tags"),
+        inheritable_metadata=config.get("metadata"),
+    )
+    (run_manager,) = await callback_manager.on_chat_model_start(
+        {"name": "hedge-relay"},
+        [messages],
+        name=config.get("run_name"),
+        batch_size=1,
+    )
+
+    generation: ChatGenerationChunk | None = None
+    try:
+        async for message in _chained(head, source):
+            if message.id is None:
+                message.id = f"run-{run_manager.run_id}"
+            chunk = ChatGenerationChunk(message=message)
+            await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            generation = chunk if generation is None else generation + chunk
+    except BaseException as e:
+        await run_manager.on_llm_error(e)
+        raise
+    finally:
+        await _close(source)
+
+    if generation is None:
+        generation = ChatGenerationChunk(message=AIMessageChunk(content=""))
+    await run_manager.on_llm_end(LLMResult(generations=[[generation]]))
+    return cast(AIMessage, message_chunk_to_message(generation.message))
+
+
+async def _chained(head: list[AIMessageChunk], source: Stream) -> Stream:
+    for chunk in head:
+        yield chunk
+    async for chunk in source:
+        yield chunk
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_HITS = Counter(
+    "agent_model_cache_hits_total",
+    "Chat model lookups served from the model cache",
+    ["provider"],
+)
+MODEL_CACHE_MISSES = Counter(
+    "agent_model_cache_misses_total",
+    "Chat model lookups that initialized a new client",
+    ["provider"],
+)
+MODEL_CACHE_SIZE = Gauge(
+    "agent_model_cache_size",
+    "Chat model clients held in the model cache",
+)
+
+_KNOWN_KEYS = ("model", "temperature", "max_tokens")
+
+
+def model_cache_key(cfg: dict[str, Any]) -> tuple[Hashable, ...]:
+    """Key a prompt model config by model settings plus any other config values."""
+    extras = tuple(
+        sorted(
+            (key, json.dumps(value, sort_keys=True, default=str))
+            for key, value in cfg.items()
+            if key not in _KNOWN_KEYS
+        )
+    )
+    return (
+        cfg.get("model", ""),
+        cfg.get("temperature"),
+        cfg.get("max_tokens"),
+        extras,
+    )
+
+
+class ModelCache:
+    """Process-wide LRU of initialized chat model clients.
+
+    Each owner (e.g. a prompt name, label and model) remembers the key it last
+    used, so when its prompt config changes the previous client is dropped
+    straight away instead of waiting to age out.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._models: OrderedDict[tuple[Hashable, ...], BaseChatModel] = OrderedDict()
+        self._owners: dict[str, tuple[Hashable, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get_or_create(
+        self,
+        cfg: dict[str, Any],
+        factory: Callable[[], BaseChatModel],
+        owner: str | None = None,
+    ) -> BaseChatModel:
+        key = model_cache_key(cfg)
+        provider = str(cfg.get("model", "")).split("/", 1)[0]
+
+        with self._lock:
+            if owner is not None:
+                self._track_owner(owner, key)
+
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                MODEL_CACHE_HITS.labels(provider=provider).inc()
+                return model
+
+            MODEL_CACHE_MISSES.labels(provider=provider).inc()
+            model = factory()
+            if self.maxsize > 0:
+                self._models[key] = model
+                while len(self._models) > self.maxsize:
+                    self._models.popitem(last=False)
+            MODEL_CACHE_SIZE.set(len(self._models))
+            return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._owners.clear()
+            MODEL_CACHE_SIZE.set(0)
+
+    def _track_owner(self, owner: str, key: tuple[Hashable, ...]) -> None:
+        previous = self._owners.get(owner)
+        self._owners[owner] = key
+        if previous is None or previous == key:
+            return
+        if previous not in self._owners.values():
+            logger.info(f"Prompt config of '{owner}' changed, dropping cached model")
+            self._models.pop(previous, None)
+            MODEL_CACHE_SIZE.set(len(self._models))
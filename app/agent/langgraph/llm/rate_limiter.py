@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+from prometheus_client import Gauge, Histogram
+
+from app.agent.langgraph.llm.circuit_breaker import error_status_code
+
+RATE_LIMIT_WAIT = Histogram(
+    "agent_llm_rate_limit_wait_seconds",
+    "Time model calls queued for request and token budget, per limit",
+    ["limit"],
+)
+RATE_LIMIT_UTILIZATION = Gauge(
+    "agent_llm_rate_limit_utilization",
+    "Share of the per-minute budget currently spent, per limit and budget",
+    ["limit", "budget"],
+)
+
+
+def is_unprocessed(error: BaseException) -> bool:
+    """Whether *error* means the provider never processed the request, so none
+    of its tokens were spent: it could not be sent, or it was rejected with a 4xx.
+    A timeout or 5xx may come after the model already generated tokens.
+    """
+    for cause in (error, error.__cause__):
+        if isinstance(
+            cause,
+            ConnectionRefusedError
+            | httpx.ConnectError
+            | httpx.ConnectTimeout
+            | httpx.PoolTimeout,
+        ):
+            return True
+    status = error_status_code(error)
+    return status is not None and 400 <= status < 500
+
+
+class MinuteBudget:
+    """Token bucket holding one minute's worth of a budget, refilled continuously.
+
+    The level may go negative when a call used more than it reserved; later
+    calls then wait until the debt is paid back.
+    """
+
+    def __init__(self, limit: str, budget: str, per_minute: float):
+        self.limit = limit
+        self.budget = budget
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        # A call larger than the whole budget waits for a full bucket, not forever.
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def adjust(self, amount: float) -> None:
+        """Spend *amount*, or give it back when negative."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+        RATE_LIMIT_UTILIZATION.labels(limit=self.limit, budget=self.budget).set(
+            max(1 - self.level / self.capacity, 0.0)
+        )
+
+
+class Reservation:
+    def __init__(self, tokens: list[MinuteBudget], estimate: int):
+        self._tokens = tokens
+        self._estimate = estimate
+
+    def settle(self, used: int) -> None:
+        """Replace the estimated token spend with what the call actually used."""
+        for budget in self._tokens:
+            budget.adjust(used - self._estimate)
+        self._tokens = []
+
+
+class LLMRateLimiter:
+    """Requests- and tokens-per-minute budgets per provider and per model.
+
+    ``limits`` maps a provider (``openai``) or a model (``openai/gpt-4o``) to
+    ``{"rpm": ..., "tpm": ...}``; a call is charged against both its provider's
+    and its model's limits. Calls waiting for the same limit are admitted in
+    arrival order.
+    """
+
+    def __init__(self, limits: dict[str, dict[str, int]] | None = None):
+        self._budgets: dict[str, list[MinuteBudget]] = {}
+        for limit, values in (limits or {}).items():
+            self._budgets[limit] = [
+                MinuteBudget(limit, budget, values[key])
+                for key, budget in (("rpm", "requests"), ("tpm", "tokens"))
+                if values.get(key)
+            ]
+        self._queues = {limit: asyncio.Lock() for limit in self._budgets}
+
+    def _limits(self, model: str) -> list[str]:
+        provider = model.split("/", 1)[0]
+        return [
+            limit
+            for limit in dict.fromkeys((provider, model))
+            if self._budgets.get(limit)
+        ]
+
+    async def acquire(self, model: str, tokens: int) -> Reservation:
+        """Wait until *model* has budget for one call of about *tokens* tokens."""
+        charged: list[MinuteBudget] = []
+        try:
+            for limit in self._limits(model):
+                budgets = self._budgets[limit]
+                started = time.monotonic()
+                async with self._queues[limit]:
+                    while True:
+                        wait = max(
+                            b.wait_time(self._amount(b, tokens)) for b in budgets
+                        )
+                        if wait <= 0:
+                            break
+                        await asyncio.sleep(wait)
+                    for budget in budgets:
+                        budget.adjust(self._amount(budget, tokens))
+                charged.extend(budgets)
+                RATE_LIMIT_WAIT.labels(limit=limit).observe(time.monotonic() - started)
+        except BaseException:
+            # Cancelled while queued for a later limit: give back the earlier ones.
+            for budget in charged:
+                budget.adjust(-self._amount(budget, tokens))
+            raise
+        return Reservation([b for b in charged if b.budget == "tokens"], tokens)
+
+    def try_acquire(self, model: str, tokens: int) -> Reservation | None:
+        """Reserve budget for one call only if no limit would make it wait."""
+        limits = self._limits(model)
+        for limit in limits:
+            if self._queues[limit].locked() or any(
+                b.wait_time(self._amount(b, tokens)) > 0 for b in self._budgets[limit]
+            ):
+                return None
+        budgets = [b for limit in limits for b in self._budgets[limit]]
+        for budget in budgets:
+            budget.adjust(self._amount(budget, tokens))
+        return Reservation([b for b in budgets if b.budget == "tokens"], tokens)
+
+    @staticmethod
+    def _amount(budget: MinuteBudget, tokens: int) -> int:
+        return tokens if budget.budget == "tokens" else 1
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from prometheus_client import Counter
+
+from app.agent.langgraph.llm.chain_cache import tools_fingerprint
+from app.bootstrap.config import AppConfig
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "agent_llm_response_cache_requests_total",
+    "Model calls looked up in the response cache, by model and result",
+    ["model", "result"],
+)
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def _canonical_message(message: BaseMessage) -> dict[str, Any]:
+    # Ids and response metadata differ between otherwise identical requests.
+    return {
+        "type": message.type,
+        "name": message.name,
+        "content": message.content,
+        "tool_calls": getattr(message, "tool_calls", None),
+        "tool_call_id": getattr(message, "tool_call_id", None),
+    }
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return _canonical_message(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def response_cache_key(
+    prompt: str,
+    inputs: dict[str, Any],
+    tools: Sequence[Any],
+    model_config: dict[str, Any],
+) -> str:
+    """Hash everything that determines the rendered request sent to the model:
+    the prompt template, the values it is rendered with, tool schemas and model
+    parameters.
+    """
+    payload = {
+        "prompt": prompt,
+        "inputs": _canonical(inputs),
+        "tools": tools_fingerprint(tools),
+        "model": model_config,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Store of model responses for byte-identical requests."""
+
+    @abstractmethod
+    async def get(self, key: str) -> AIMessage | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, message: AIMessage, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+class InMemoryResponseCache(ResponseCache):
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, AIMessage]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> AIMessage | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, message = entry
+        if expires <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return message
+
+    async def set(self, key: str, message: AIMessage, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.time() + ttl, message)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class DiskResponseCache(ResponseCache):
+    """One JSON file per response, shared by every worker using the directory.
+
+    A file's mtime is set to its expiry time. Every ``sweep_every`` writes,
+    expired files are deleted and, past ``max_entries``, those expiring soonest.
+    """
+
+    def __init__(
+        self, directory: str | Path, max_entries: int = 10_000, sweep_every: int = 100
+    ):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.sweep_every = max(sweep_every, 1)
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    async def get(self, key: str) -> AIMessage | None:
+        return await asyncio.to_thread(self._read, self._path(key))
+
+    async def set(self, key: str, message: AIMessage, ttl: float) -> None:
+        entry = {"expires": time.time() + ttl, "message": message_to_dict(message)}
+        await asyncio.to_thread(self._write, self._path(key), entry)
+        self._writes += 1
+        if self._writes % self.sweep_every == 0:
+            await asyncio.to_thread(self._sweep)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    @staticmethod
+    def _read(path: Path) -> AIMessage | None:
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry["expires"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        message = messages_from_dict([entry["message"]])[0]
+        return message if isinstance(message, AIMessage) else None
+
+    @staticmethod
+    def _write(path: Path, entry: dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.utime(tmp, (entry["expires"], entry["expires"]))
+        os.replace(tmp, path)
+
+    def _sweep(self) -> None:
+        now = time.time()
+        live: list[tuple[float, Path]] = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                expires = path.stat().st_mtime
+            except OSError:
+                continue
+            if expires <= now:
+                path.unlink(missing_ok=True)
+            else:
+                live.append((expires, path))
+        if len(live) > self.max_entries:
+            live.sort()
+            for _, path in live[: len(live) - self.max_entries]:
+                path.unlink(missing_ok=True)
+
+    def _clear(self) -> None:
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+
+def create_response_cache(config: AppConfig) -> ResponseCache:
+    if config.response_cache_backend == "disk":
+        return DiskResponseCache(config.response_cache_dir, config.response_cache_size)
+    return InMemoryResponseCache(config.response_cache_size)
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that answers with a cached message.
+
+    When the caller streams, the content is re-emitted word by word through the
+    regular callbacks, so clients see the same token events as for a live call.
+    Usage metadata is dropped since no tokens were spent.
+    """
+
+    message: AIMessage
+
+    @property
+    def _llm_type(self) -> str:
+        return "response-cache-replay"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._replayed())])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for chunk in self._chunks():
+            if run_manager and isinstance(chunk.message.content, str):
+                run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for chunk in self._chunks():
+            if run_manager and isinstance(chunk.message.content, str):
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    def _replayed(self) -> AIMessage:
+        return self.message.model_copy(update={"id": None, "usage_metadata": None})
+
+    def _chunks(self) -> Iterator[ChatGenerationChunk]:
+        message = self.message
+        content = message.content
+        pieces: list[str | list[str | dict[Any, Any]]] = (
+            _TOKEN.findall(content) if isinstance(content, str) else [content]
+        )
+        for piece in pieces[:-1]:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=pieces[-1] if pieces else "",
+                additional_kwargs=message.additional_kwargs,
+                response_metadata=message.response_metadata,
+                tool_call_chunks=[
+                    {
+                        "name": call["name"],
+                        "args": json.dumps(call["args"]),
+                        "id": call["id"],
+                        "index": index,
+                        "type": "tool_call_chunk",
+                    }
+                    for index, call in enumerate(message.tool_calls)
+                ],
+            )
+        )
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import pairwise
+from pathlib import Path
+from typing import Any, Protocol
+from uuid import uuid4
+
+import numpy as np
+import numpy.typing as npt
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_REQUESTS = Counter(
+    "agent_llm_semantic_cache_requests_total",
+    "Single-turn model calls looked up in the semantic cache, by agent and result",
+    ["agent", "result"],
+)
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    "agent_llm_semantic_cache_similarity",
+    "Best cosine similarity found per semantic cache lookup",
+    ["agent", "result"],
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.925, 0.95, 0.975, 0.99, 1.0),
+)
+
+Vectors = npt.NDArray[np.float32]
+
+_WORD = re.compile(r"\w+")
+
+# Words that rarely change what a question asks; every other word must match.
+_FILLER = frozenset(
+    "a an the is are s what which of to in on for me please tell can could would "
+    "you i do does about".split()
+)
+_DIGIT = re.compile(r"\d")
+
+
+def question_key(text: str) -> str:
+    """The content words of *text*, ignoring case, punctuation, order and filler."""
+    return " ".join(sorted(set(_WORD.findall(text.lower())) - _FILLER))
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _same_word(a: str, b: str) -> bool:
+    # Inflections and typos share most trigrams ("capital"/"capitals" 0.8);
+    # different names do not ("kyiv"/"lviv" 0.25). Numbers must match exactly.
+    if a == b:
+        return True
+    if _DIGIT.search(a) or _DIGIT.search(b):
+        return False
+    x, y = _trigrams(a), _trigrams(b)
+    return 2 * len(x & y) / (len(x) + len(y)) > 0.5
+
+
+def same_question(a: str, b: str) -> bool:
+    """Whether two question keys have the same content words, allowing for
+    inflections and typos.
+
+    Hashed embeddings score one-word swaps ("weather in Kyiv" / "weather in
+    Lviv") as near-identical, so a similar question is only served when every
+    content word of each has a counterpart in the other. Rephrasings that add,
+    drop or replace a content word are not matched.
+    """
+    words_a, words_b = a.split(), b.split()
+    return all(any(_same_word(w, v) for v in words_b) for w in words_a) and all(
+        any(_same_word(w, v) for v in words_a) for w in words_b
+    )
+
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> Vectors:
+        """Return one L2-normalized row per text."""
+        ...
+
+
+class HashingEmbedder:
+    """Local embedder hashing word unigrams, bigrams and character trigrams
+    into a fixed number of signed buckets. Needs no model or network.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    @staticmethod
+    def features(text: str) -> list[str]:
+        words = _WORD.findall(text.lower())
+        features = [*words, *(f"{a} {b}" for a, b in pairwise(words))]
+        for word in words:
+            padded = f" {word} "
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> Vectors:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+@dataclass(slots=True)
+class SemanticEntry:
+    namespace: str
+    text: str
+    key: str
+    message: AIMessage
+    created_at: float
+    used_at: float
+    hits: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "namespace": self.namespace,
+            "text": self.text,
+            "key": self.key,
+            "message": message_to_dict(self.message),
+            "created_at": self.created_at,
+            "used_at": self.used_at,
+            "hits": self.hits,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SemanticEntry:
+        message = messages_from_dict([data["message"]])[0]
+        assert isinstance(message, AIMessage)
+        return cls(
+            namespace=data["namespace"],
+            text=data["text"],
+            key=data["key"],
+            message=message,
+            created_at=data["created_at"],
+            used_at=data["used_at"],
+            hits=data["hits"],
+        )
+
+
+@dataclass(slots=True)
+class SemanticHit:
+    message: AIMessage
+    similarity: float
+    text: str
+
+
+class SemanticResponseCache:
+    """Answers for single-turn requests, found by cosine similarity of the
+    user message and served only when :func:`same_question` confirms it.
+
+    Vectors live in one ``capacity x dim`` float32 matrix searched with a single
+    matrix product; per-row namespace ids and timestamps are numpy arrays too,
+    so masking and picking a row to replace are vector operations. When full,
+    the least recently used entry is replaced; entries older than ``ttl``
+    seconds are never returned.
+
+    With a ``directory``, ``save`` writes the matrix to a new ``.npy`` file and
+    then atomically replaces ``entries.json``, which names that file, so rows
+    and entries always come from the same snapshot; on restart the file is
+    memory-mapped copy-on-write. Every ``save_every`` stores a snapshot is also
+    written in a worker thread, so a crash loses at most that many entries.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        directory: str | Path | None = None,
+        embedder: Embedder | None = None,
+        ttl: float = 86_400.0,
+        save_every: int = 100,
+    ):
+        self.capacity = capacity
+        self.embedder = HashingEmbedder() if embedder is None else embedder
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self.save_every = save_every
+        self._entries: list[SemanticEntry | None] = [None] * capacity
+        self._vectors: Vectors = np.zeros(
+            (capacity, self.embedder.dim), dtype=np.float32
+        )
+        self._namespace_ids: dict[str, int] = {}
+        self._row_namespaces = np.full(capacity, -1, dtype=np.int32)
+        self._created_at = np.zeros(capacity, dtype=np.float64)
+        self._used_at = np.zeros(capacity, dtype=np.float64)
+        self._vectors_file: str | None = None
+        self._unsaved = 0
+        self._saving: asyncio.Future[None] | None = None
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._row_namespaces >= 0))
+
+    @property
+    def _index_path(self) -> Path | None:
+        return self.directory / "entries.json" if self.directory else None
+
+    def _load(self) -> None:
+        path = self._index_path
+        if path is None or not path.exists():
+            return
+        try:
+            index = json.loads(path.read_text())
+            vectors: Vectors = np.load(path.parent / index["vectors"], mmap_mode="c")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read semantic cache at {path.parent}: {e}")
+            return
+        if vectors.shape != self._vectors.shape or vectors.dtype != np.float32:
+            logger.warning(
+                f"Semantic cache at {path.parent} has shape {vectors.shape}, "
+                f"expected {self._vectors.shape}; starting empty"
+            )
+            return
+
+        self._vectors = vectors
+        self._vectors_file = index["vectors"]
+        for row, data in index["rows"].items():
+            if int(row) < self.capacity:
+                self._set_entry(int(row), SemanticEntry.from_dict(data))
+
+    def save(self) -> None:
+        """Write the cache to ``directory`` now, e.g. on shutdown."""
+        if self._index_path is not None:
+            self._write(*self._snapshot())
+
+    def _save_in_background(self) -> None:
+        if self._saving is not None and not self._saving.done():
+            return
+        snapshot = self._snapshot()
+        loop = asyncio.get_running_loop()
+        self._saving = loop.run_in_executor(None, self._write, *snapshot)
+        self._saving.add_done_callback(self._saved)
+
+    @staticmethod
+    def _saved(future: asyncio.Future[None]) -> None:
+        if not future.cancelled() and (e := future.exception()) is not None:
+            logger.warning(f"Could not save semantic cache: {e}")
+
+    def _snapshot(self) -> tuple[Vectors, dict[str, Any]]:
+        self._unsaved = 0
+        rows = {
+            str(row): entry.to_dict()
+            for row, entry in enumerate(self._entries)
+            if entry is not None
+        }
+        return np.array(self._vectors), rows
+
+    def _write(self, vectors: Vectors, rows: dict[str, Any]) -> None:
+        path = self._index_path
+        assert path is not None
+        with self._write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            name = f"vectors-{uuid4().hex}.npy"
+            self._write_atomic(path.parent / name, lambda f: np.save(f, vectors))
+
+            index = {"vectors": name, "rows": rows}
+            self._write_atomic(path, lambda f: f.write(json.dumps(index).encode()))
+
+            previous, self._vectors_file = self._vectors_file, name
+            if previous is not None:
+                (path.parent / previous).unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Any) -> None:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def search(
+        self, queries: Vectors, namespace: str
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        """Best matching row and its similarity for every query vector; rows
+        from other namespaces or past their TTL score -1.
+        """
+        scores: npt.NDArray[np.float32] = queries @ self._vectors.T
+        stale = (self._row_namespaces != self._namespace_ids.get(namespace, -1)) | (
+            self._created_at < time.time() - self.ttl
+        )
+        scores[:, stale] = -1.0
+        best = scores.argmax(axis=1)
+        return best, scores[np.arange(len(queries)), best]
+
+    def lookup(
+        self, namespace: str, text: str, threshold: float, agent: str = ""
+    ) -> SemanticHit | None:
+        if self.capacity <= 0:
+            return None
+        rows, similarities = self.search(self.embedder.embed([text]), namespace)
+        row, similarity = int(rows[0]), float(similarities[0])
+        entry = self._entries[row]
+
+        if entry is None or similarity < threshold:
+            result = "miss"
+        elif not same_question(entry.key, question_key(text)):
+            result = "rejected"
+        else:
+            result = "hit"
+            entry.hits += 1
+            entry.used_at = self._used_at[row] = time.time()
+        SEMANTIC_CACHE_REQUESTS.labels(agent=agent, result=result).inc()
+        SEMANTIC_CACHE_SIMILARITY.labels(agent=agent, result=result).observe(
+            max(similarity, 0.0)
+        )
+        if entry is None or result != "hit":
+            return None
+        return SemanticHit(entry.message, similarity, entry.text)
+
+    def store(self, namespace: str, text: str, message: AIMessage) -> None:
+        if self.capacity <= 0:
+            return
+        row = self._free_row()
+        now = time.time()
+        self._vectors[row] = self.embedder.embed([text])[0]
+        self._set_entry(
+            row, SemanticEntry(namespace, text, question_key(text), message, now, now)
+        )
+        self._unsaved += 1
+        if self.directory is not None and self._unsaved >= self.save_every:
+            self._save_in_background()
+
+    def _set_entry(self, row: int, entry: SemanticEntry) -> None:
+        self._entries[row] = entry
+        namespace = self._namespace_ids.setdefault(
+            entry.namespace, len(self._namespace_ids)
+        )
+        self._row_namespaces[row] = namespace
+        self._created_at[row] = entry.created_at
+        self._used_at[row] = entry.used_at
+
+    def _free_row(self) -> int:
+        free = (self._row_namespaces < 0) | (self._created_at < time.time() - self.ttl)
+        if free.any():
+            return int(free.argmax())
+        return int(self._used_at.argmin())
+
+    def clear(self) -> None:
+        self._entries = [None] * self.capacity
+        self._vectors[:] = 0.0
+        self._namespace_ids.clear()
+        self._row_namespaces[:] = -1
+        self._created_at[:] = 0.0
+        self._used_at[:] = 0.0
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import httpx
+from prometheus_client import Gauge, Histogram
+
+from app.bootstrap.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT_REQUESTS = Gauge(
+    "agent_llm_http_in_flight_requests",
+    "LLM provider requests holding a pooled connection",
+    ["provider"],
+)
+POOL_SATURATION = Gauge(
+    "agent_llm_http_pool_saturation",
+    "Share of the per-provider connection cap currently in use",
+    ["provider"],
+)
+CONNECT_TIME = Histogram(
+    "agent_llm_http_connect_seconds",
+    "Time to open a new connection (TCP and TLS) to an LLM provider",
+    ["provider"],
+)
+
+# Providers whose LangChain chat model accepts ``http_client``/``http_async_client``.
+HTTPX_PROVIDERS = frozenset({"openai", "azure_openai", "deepseek", "xai", "groq"})
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class ProviderTransport(httpx.AsyncBaseTransport):
+    """Pooled transport for one provider that reports pool usage and connect time.
+
+    A request counts as in flight until its response body is closed, which for
+    streamed completions is when the stream ends.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_connections: int,
+        transport: httpx.AsyncBaseTransport | None = None,
+        **kwargs: Any,
+    ):
+        self.provider = provider
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self._transport = transport or httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = self._connect_timer(request.url.scheme)
+        self._acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def _acquire(self) -> None:
+        self.in_flight += 1
+        self._report()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._report()
+
+    def _report(self) -> None:
+        IN_FLIGHT_REQUESTS.labels(provider=self.provider).set(self.in_flight)
+        POOL_SATURATION.labels(provider=self.provider).set(
+            self.in_flight / self.max_connections
+        )
+
+    def _connect_timer(
+        self, scheme: str
+    ) -> Callable[[str, dict[str, Any]], Awaitable[None]]:
+        done_event = (
+            "connection.start_tls.complete"
+            if scheme == "https"
+            else "connection.connect_tcp.complete"
+        )
+        started: float | None = None
+
+        async def trace(event: str, info: dict[str, Any]) -> None:
+            nonlocal started
+            if event == "connection.connect_tcp.started":
+                started = time.perf_counter()
+            elif event == done_event and started is not None:
+                CONNECT_TIME.labels(provider=self.provider).observe(
+                    time.perf_counter() - started
+                )
+
+        return trace
+
+
+class LLMTransport:
+    """Application-owned HTTP clients shared by every chat model of a provider.
+
+    Each provider gets its own connection pool and cap; within it httpx keeps
+    keep-alive connections per upstream host. HTTP/2 is used when enabled and the
+    optional ``h2`` package is installed.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.timeout = httpx.Timeout(
+            config.llm_read_timeout,
+            connect=config.llm_connect_timeout,
+            pool=config.llm_pool_timeout,
+        )
+        self.limits = httpx.Limits(
+            max_connections=config.llm_max_connections,
+            max_keepalive_connections=config.llm_max_keepalive_connections,
+            keepalive_expiry=config.llm_keepalive_expiry,
+        )
+        self.http2 = config.llm_http2 and self._h2_available()
+        self._async_clients: dict[str, httpx.AsyncClient] = {}
+        self._sync_clients: dict[str, httpx.Client] = {}
+
+    @staticmethod
+    def _h2_available() -> bool:
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("LLM_HTTP2 is enabled but 'h2' is not installed")
+            return False
+        return True
+
+    def async_client(self, provider: str) -> httpx.AsyncClient:
+        client = self._async_clients.get(provider)
+        if client is None:
+            transport = ProviderTransport(
+                provider,
+                self.limits.max_connections or 1,
+                http2=self.http2,
+                limits=self.limits,
+            )
+            client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            self._async_clients[provider] = client
+        return client
+
+    def sync_client(self, provider: str) -> httpx.Client:
+        client = self._sync_clients.get(provider)
+        if client is None:
+            client = httpx.Client(
+                http2=self.http2, limits=self.limits, timeout=self.timeout
+            )
+            self._sync_clients[provider] = client
+        return client
+
+    def model_kwargs(self, provider: str) -> dict[str, Any]:
+        """Keyword arguments that make a provider's chat model use shared clients.
+
+        The timeout is passed too: the provider SDK sets its own timeout on each
+        request, which would otherwise override the clients' default.
+        """
+        if provider not in HTTPX_PROVIDERS:
+            return {}
+        return {
+            "http_client": self.sync_client(provider),
+            "http_async_client": self.async_client(provider),
+            "timeout": self.timeout,
+        }
+
+    async def aclose(self) -> None:
+        for async_client in self._async_clients.values():
+            await async_client.aclose()
+        for sync_client in self._sync_clients.values():
+            sync_client.close()
+        self._async_clients.clear()
+        self._sync_clients.clear()
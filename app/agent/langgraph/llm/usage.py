@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from langchain_core.messages import AIMessage
+from prometheus_client import Counter
+
+INPUT_TOKENS = Counter(
+    "agent_llm_input_tokens_total",
+    "Prompt tokens sent to LLM providers, split by provider prompt-cache hits",
+    ["model", "cache"],
+)
+
+
+def record_usage(model: str, message: AIMessage) -> None:
+    """Count cached and uncached input tokens from a response's usage metadata."""
+    usage = message.usage_metadata
+    if not usage:
+        return
+
+    cached = usage.get("input_token_details", {}).get("cache_read", 0) or 0
+    INPUT_TOKENS.labels(model=model, cache="hit").inc(cached)
+    INPUT_TOKENS.labels(model=model, cache="miss").inc(
+        max(usage["input_tokens"] - cached, 0)
+    )
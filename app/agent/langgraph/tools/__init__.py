@@ -0,0 +1,5 @@
+from .cache import ToolResultCache
+from .executor import ToolExecutor
+from .pools import ExecutionPolicy, ToolPools
+
+__all__ = ["ExecutionPolicy", "ToolExecutor", "ToolPools", "ToolResultCache"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from langchain_core.tools import BaseTool
+from prometheus_client import Counter
+
+TOOL_CACHE_REQUESTS = Counter(
+    "agent_tool_cache_requests_total",
+    "Memoized tool calls by tool and result (hit, miss or shared in-flight call)",
+    ["tool", "result"],
+)
+
+CacheKey = tuple[str, str]
+
+
+def get_cache_ttl(tool: BaseTool, default: float = 0.0) -> float:
+    """Read the result TTL a tool declares, via a ``cache_ttl`` attribute or
+    ``metadata["cache_ttl"]``; a TTL of 0 opts the tool out of memoization.
+    """
+    declared = getattr(tool, "cache_ttl", None)
+    if declared is None and tool.metadata:
+        declared = tool.metadata.get("cache_ttl")
+    return float(default if declared is None else declared)
+
+
+def tool_cache_key(name: str, args: dict[str, Any]) -> CacheKey:
+    return name, json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """Process-wide LRU of tool results keyed by tool name and canonical args.
+
+    Entries expire after the TTL given per call. Concurrent calls with the same
+    key share one execution; if that execution is cancelled, the next waiter
+    runs the tool itself.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._results: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[CacheKey, asyncio.Future[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get_or_run(
+        self,
+        name: str,
+        args: dict[str, Any],
+        ttl: float,
+        run: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda _: True,
+    ) -> Any:
+        key = tool_cache_key(name, args)
+        while True:
+            entry = self._results.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > time.monotonic():
+                    self._results.move_to_end(key)
+                    TOOL_CACHE_REQUESTS.labels(tool=name, result="hit").inc()
+                    return result
+                del self._results[key]
+
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            try:
+                result = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                continue
+            TOOL_CACHE_REQUESTS.labels(tool=name, result="shared").inc()
+            return result
+
+        TOOL_CACHE_REQUESTS.labels(tool=name, result="miss").inc()
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; nobody else needs to
+            raise
+        finally:
+            del self._pending[key]
+
+        future.set_result(result)
+        if cacheable(result):
+            self._store(key, result, ttl)
+        return result
+
+    def _store(self, key: CacheKey, result: Any, ttl: float) -> None:
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        self._results[key] = (time.monotonic() + ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        self._results.clear()
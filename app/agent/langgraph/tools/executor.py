@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langchain_core.tools import tool as create_tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.prebuilt import ToolNode
+from langgraph.store.base import BaseStore
+from langgraph.types import Command
+from prometheus_client import Histogram
+
+from app.agent.langgraph.base_state import BaseState
+from app.agent.langgraph.tools.cache import ToolResultCache, get_cache_ttl
+from app.agent.langgraph.tools.pools import (
+    ExecutionPolicy,
+    ToolPools,
+    get_execution_policy,
+)
+
+logger = logging.getLogger(__name__)
+
+TOOL_LATENCY = Histogram(
+    "agent_tool_latency_seconds",
+    "Tool call latency by tool and outcome",
+    ["tool", "status"],
+)
+TOOL_QUEUE_WAIT = Histogram(
+    "agent_tool_queue_wait_seconds",
+    "Time a tool call waited for a free concurrency slot",
+    ["tool"],
+)
+
+
+def _has_injected_args(tool: BaseTool) -> bool:
+    """Whether the tool takes arguments hidden from the model's tool schema."""
+    exposed = convert_to_openai_tool(tool)["function"]["parameters"]["properties"]
+    return bool(set(tool.get_input_schema().model_fields) - set(exposed))
+
+
+class ToolExecutor:
+    """Graph node that runs the tool calls of the last AI message concurrently.
+
+    Each tool has its own concurrency limit and every call its own timeout; a
+    call that fails or times out becomes an error ``ToolMessage`` while the
+    other calls still return their results. Tools run on the event loop or on
+    ``pools`` according to their execution policy, and tools with a cache TTL
+    are memoized in ``cache``.
+
+    Like ``ToolNode``, ``InjectedState``, ``InjectedStore`` and
+    ``InjectedToolCallId`` arguments are filled in, and tools may return a
+    ``Command``. Tools with injected arguments are never memoized and cannot
+    run in the process pool.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool | Callable[..., Any]],
+        timeout: float = 30.0,
+        max_concurrency: int = 4,
+        timeouts: dict[str, float] | None = None,
+        concurrency: dict[str, int] | None = None,
+        pools: ToolPools | None = None,
+        cache: ToolResultCache | None = None,
+        cache_ttl: float = 0.0,
+    ):
+        self.tools = {
+            t.name: t
+            for t in (
+                tool if isinstance(tool, BaseTool) else create_tool(tool)
+                for tool in tools
+            )
+        }
+        self.pools = ToolPools() if pools is None else pools
+        self.policies = {
+            name: get_execution_policy(tool) for name, tool in self.tools.items()
+        }
+        self._injector = ToolNode(list(self.tools.values()))
+        self._injected = {
+            name for name, tool in self.tools.items() if _has_injected_args(tool)
+        }
+        for name in self._injected:
+            if self.policies[name] is ExecutionPolicy.PROCESS:
+                raise ValueError(
+                    f"Tool '{name}' takes injected arguments and cannot run in "
+                    f"the process pool"
+                )
+        self.cache = ToolResultCache() if cache is None else cache
+        self.cache_ttls = {
+            name: 0.0 if name in self._injected else get_cache_ttl(tool, cache_ttl)
+            for name, tool in self.tools.items()
+        }
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self._semaphores = {
+            name: asyncio.Semaphore((concurrency or {}).get(name, max_concurrency))
+            for name in self.tools
+        }
+
+    async def __call__(
+        self,
+        state: BaseState,
+        config: RunnableConfig,
+        store: BaseStore | None = None,
+    ) -> (
+        dict[str, list[ToolMessage]] | list[Command[Any] | dict[str, list[ToolMessage]]]
+    ):
+        message = state.messages[-1] if state.messages else None
+        if not isinstance(message, AIMessage) or not message.tool_calls:
+            return {"messages": []}
+
+        results = await asyncio.gather(
+            *(
+                self.run_call(self._inject(call, state, store), config)
+                for call in message.tool_calls
+            )
+        )
+        messages = [r for r in results if isinstance(r, ToolMessage)]
+        commands = [r for r in results if isinstance(r, Command)]
+        if not commands:
+            return {"messages": messages}
+        return [*commands, {"messages": messages}] if messages else [*commands]
+
+    def _inject(
+        self, call: ToolCall, state: BaseState, store: BaseStore | None
+    ) -> ToolCall:
+        if call["name"] not in self._injected:
+            return call
+        return self._injector.inject_tool_args(call, state, store)
+
+    async def run_call(
+        self, call: ToolCall, config: RunnableConfig
+    ) -> ToolMessage | Command[Any]:
+        name = call["name"]
+        tool = self.tools.get(name)
+        if tool is None:
+            return self._error(call, f"Error: tool '{name}' is not available.")
+
+        timeout = self.timeouts.get(name, self.timeout)
+        started = time.perf_counter()
+
+        async def invoke() -> Any:
+            nonlocal started
+            queued = started
+            # The timeout and latency cover the call itself, not the wait for a
+            # free slot.
+            async with self._semaphores[name]:
+                started = time.perf_counter()
+                TOOL_QUEUE_WAIT.labels(tool=name).observe(started - queued)
+                return await asyncio.wait_for(
+                    self.pools.run(
+                        tool, {**call, "type": "tool_call"}, config, self.policies[name]
+                    ),
+                    timeout,
+                )
+
+        ttl = self.cache_ttls[name]
+        status = "success"
+        try:
+            result = (
+                await self.cache.get_or_run(
+                    name, call["args"], ttl, invoke, self._is_cacheable
+                )
+                if ttl > 0
+                else await invoke()
+            )
+        except TimeoutError:
+            status = "timeout"
+            logger.warning(f"Tool '{name}' timed out after {timeout}s")
+            return self._error(
+                call, f"Error: tool '{name}' timed out after {timeout}s."
+            )
+        except Exception as e:
+            status = "error"
+            logger.error(f"Tool '{name}' failed: {e}")
+            return self._error(call, f"Error: {e!r}")
+        finally:
+            TOOL_LATENCY.labels(tool=name, status=status).observe(
+                time.perf_counter() - started
+            )
+
+        if isinstance(result, Command):
+            return result
+        if isinstance(result, ToolMessage):
+            if ttl > 0:
+                # Cached messages are shared between calls; add_messages assigns
+                # ids in place, so every call gets its own copy.
+                return result.model_copy(
+                    update={"id": None, "tool_call_id": call["id"] or ""}
+                )
+            return result
+        return ToolMessage(
+            content=str(result), name=name, tool_call_id=call["id"] or ""
+        )
+
+    @staticmethod
+    def _is_cacheable(result: Any) -> bool:
+        if isinstance(result, Command):
+            return False
+        return not (isinstance(result, ToolMessage) and result.status == "error")
+
+    @staticmethod
+    def _error(call: ToolCall, content: str) -> ToolMessage:
+        return ToolMessage(
+            content=content,
+            name=call["name"],
+            tool_call_id=call["id"] or "",
+            status="error",
+        )
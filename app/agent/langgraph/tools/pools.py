@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any
+
+from langchain_core.tools import BaseTool
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+POOL_QUEUE_DEPTH = Gauge(
+    "agent_tool_pool_queue_depth",
+    "Tool calls waiting for a free worker",
+    ["pool"],
+)
+POOL_ACTIVE = Gauge(
+    "agent_tool_pool_active",
+    "Tool calls currently running on a worker",
+    ["pool"],
+)
+
+
+class ExecutionPolicy(str, Enum):
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def get_execution_policy(tool: BaseTool) -> ExecutionPolicy:
+    """Read the policy a tool declares, via an ``execution_policy`` attribute or
+    ``metadata["execution_policy"]``.
+
+    Tools that declare nothing run on the event loop when they have an async
+    implementation and on the thread pool otherwise.
+    """
+    declared = getattr(tool, "execution_policy", None)
+    if declared is None and tool.metadata:
+        declared = tool.metadata.get("execution_policy")
+    if declared is not None:
+        return ExecutionPolicy(declared)
+
+    if hasattr(tool, "coroutine"):
+        # Function-backed tools always override _arun; only a coroutine counts.
+        has_async = tool.coroutine is not None
+    else:
+        has_async = type(tool)._arun is not BaseTool._arun
+    return ExecutionPolicy.ASYNC if has_async else ExecutionPolicy.THREAD
+
+
+def _invoke(tool: BaseTool, tool_input: dict[str, Any]) -> Any:
+    return tool.invoke(tool_input)
+
+
+class _Pool:
+    def __init__(self, name: str, workers: int, factory: Callable[[int], Executor]):
+        self.name = name
+        self.workers = workers
+        self._factory = factory
+        self._executor: Executor | None = None
+        self.in_flight = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory(self.workers)
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> asyncio.Future[Any]:
+        loop = asyncio.get_running_loop()
+        future: Future[Any] = self.executor.submit(fn, *args)
+        self._track(1)
+        # The call may finish on a worker thread; count it done on the loop.
+        future.add_done_callback(lambda _: self._done(loop))
+        return asyncio.wrap_future(future, loop=loop)
+
+    def _done(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._track, -1)
+        except RuntimeError:  # the loop is already closed
+            pass
+
+    def _track(self, delta: int) -> None:
+        self.in_flight += delta
+        POOL_QUEUE_DEPTH.labels(pool=self.name).set(
+            max(self.in_flight - self.workers, 0)
+        )
+        POOL_ACTIVE.labels(pool=self.name).set(min(self.in_flight, self.workers))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ToolPools:
+    """Bounded thread and process pools that blocking or CPU-bound tools run on.
+
+    Cancelling a call removes it from the queue if it has not started yet; a call
+    that is already running finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, thread_workers: int = 8, process_workers: int = 2):
+        self.threads = _Pool(
+            "thread", thread_workers, lambda n: ThreadPoolExecutor(n, "tool")
+        )
+        # Forking a process that already runs threads can deadlock the child.
+        self.processes = _Pool(
+            "process",
+            process_workers,
+            lambda n: ProcessPoolExecutor(
+                n, mp_context=multiprocessing.get_context("forkserver")
+            ),
+        )
+
+    async def run(
+        self,
+        tool: BaseTool,
+        tool_input: dict[str, Any],
+        config: Any,
+        policy: ExecutionPolicy,
+    ) -> Any:
+        if policy is ExecutionPolicy.ASYNC:
+            return await tool.ainvoke(tool_input, config)
+
+        if policy is ExecutionPolicy.THREAD:
+            context = contextvars.copy_context()
+            return await self.threads.submit(
+                context.run, tool.invoke, tool_input, config
+            )
+
+        # Callbacks and the stream writer cannot cross the process boundary, so
+        # process tools get their arguments only.
+        return await self.processes.submit(_invoke, tool, tool_input["args"])
+
+    def shutdown(self) -> None:
+        self.threads.shutdown()
+        self.processes.shutdown()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Callable
+from contextlib import suppress
+from typing import Any
+
+from app.agent.models import CustomUIMessage, Token
+from app.agent.services.events import TokenEvent
+
+FLUSH_TICK = object()
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class TokenBuffer:
+    """Accumulates streamed token text until a time or size window is exceeded."""
+
+    def __init__(self, max_delay: float = 0.0, max_bytes: int = 0):
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self._parts: list[str] = []
+        self._size = 0
+        self._started_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_delay > 0 or self.max_bytes > 0
+
+    @property
+    def deadline_enabled(self) -> bool:
+        return self.max_delay > 0
+
+    @property
+    def deadline(self) -> float | None:
+        if self._started_at is None or self.max_delay <= 0:
+            return None
+        return self._started_at + self.max_delay
+
+    def add(self, text: str) -> None:
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._parts.append(text)
+        self._size += len(text.encode("utf-8"))
+
+    def is_full(self) -> bool:
+        return self.max_bytes > 0 and self._size >= self.max_bytes
+
+    def flush(self, run_id: str) -> TokenEvent | None:
+        if not self._parts:
+            return None
+
+        content = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        self._started_at = None
+
+        token = Token(run_id=run_id, content=content)
+        return TokenEvent.from_data(token)
+
+
+class UIBuffer:
+    """Keeps only the latest pending ``CustomUIMessage`` per component id."""
+
+    def __init__(self, max_delay: float = 0.0):
+        self.max_delay = max_delay
+        self._pending: dict[str, CustomUIMessage] = {}
+        self._started_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_delay > 0
+
+    @property
+    def deadline(self) -> float | None:
+        if self._started_at is None or self.max_delay <= 0:
+            return None
+        return self._started_at + self.max_delay
+
+    def add(self, message: CustomUIMessage) -> None:
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._pending[message.id] = message
+
+    def flush(self) -> list[CustomUIMessage]:
+        messages = list(self._pending.values())
+        self._pending.clear()
+        self._started_at = None
+        return messages
+
+
+def earliest_deadline(*deadlines: float | None) -> float | None:
+    return min((d for d in deadlines if d is not None), default=None)
+
+
+async def with_flush_ticks(
+    stream: AsyncIterable[Any],
+    next_deadline: Callable[[], float | None],
+) -> AsyncGenerator[Any]:
+    """Re-yield *stream* items, yielding ``FLUSH_TICK`` whenever a deadline passes.
+
+    The upstream iterator is driven by a single producer task, so waiting with a
+    timeout never cancels the underlying generator mid-step.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=1)
+
+    async def pump() -> None:
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:  # noqa: BLE001
+            await queue.put(_Failure(exc))
+        else:
+            await queue.put(_DONE)
+
+    producer = asyncio.create_task(pump())
+    try:
+        while True:
+            deadline = next_deadline()
+            if deadline is None:
+                item = await queue.get()
+            else:
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(), max(deadline - time.monotonic(), 0)
+                    )
+                except TimeoutError:
+                    yield FLUSH_TICK
+                    continue
+
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
@@ -1,3 +1,4 @@
+from .encoder import EventEncoder
 from .end_event import EndEvent
 from .error_event import ErrorEvent
 from .token_event import TokenEvent
@@ -6,4 +7,5 @@ __all__ = [
     "TokenEvent",
     "ErrorEvent",
     "EndEvent",
+    "EventEncoder",
 ]
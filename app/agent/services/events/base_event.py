@@ -1,12 +1,14 @@
-import json
-from typing import Any
+from typing import Any, Self
 
+import orjson
 from pydantic import BaseModel, Field
 
+from .encoder import dumps
+
 
 class BaseEvent(BaseModel):
     event: str = Field(..., description="The type of event")
-    data: str = Field(..., description="The data of the event")
+    data: bytes = Field(..., description="The JSON-encoded data of the event")
 
     @classmethod
     def from_payload(
@@ -14,4 +16,21 @@ class BaseEvent(BaseModel):
     ) -> "BaseEvent":
         if source:
             payload["source"] = source
-        return cls(event=event, data=json.dumps(payload))
+        return cls(event=event, data=dumps(payload))
+
+    @classmethod
+    def from_model(
+        cls, event: str, model: BaseModel, source: str | None = None
+    ) -> "BaseEvent":
+        """Serialize *model* straight to JSON, appending ``source`` to the
+        encoded object instead of going through an intermediate dict.
+        """
+        data = dumps(model)
+        if source:
+            field = b'"source":' + orjson.dumps(source)
+            data = data[:-1] + (b"," if data != b"{}" else b"") + field + b"}"
+        return cls(event=event, data=data)
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any] | BaseModel) -> Self:
+        return cls(data=dumps(data))  # type: ignore[call-arg]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import orjson
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from .base_event import BaseEvent
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a payload to JSON bytes in a single pass."""
+    if isinstance(payload, BaseModel):
+        return payload.__pydantic_serializer__.to_json(payload)
+    return orjson.dumps(payload)
+
+
+class EventEncoder:
+    """Frames events as ready-to-send Server-Sent Events bytes.
+
+    The event data is already JSON bytes, so framing is a single join without
+    re-serializing the payload or building intermediate dicts.
+    """
+
+    def __init__(self, sep: bytes = b"\r\n"):
+        self._sep = sep
+
+    def encode(self, event: BaseEvent, event_id: str | None = None) -> bytes:
+        sep = self._sep
+        parts: list[bytes] = []
+        if event_id is not None:
+            parts += [b"id: ", event_id.encode(), sep]
+        parts += [b"event: ", event.event.encode(), sep]
+
+        data = event.data
+        if b"\n" in data or b"\r" in data:
+            for line in data.splitlines():
+                parts += [b"data: ", line, sep]
+        else:
+            parts += [b"data: ", data, sep]
+
+        parts.append(sep)
+        return b"".join(parts)
@@ -5,7 +5,7 @@ from .base_event import BaseEvent
 
 class EndEvent(BaseEvent):
     event: str = "stream_end"
-    data: str = Field(
+    data: bytes = Field(
         ...,
         description="The end of the stream event, typically a string indicating the end of the stream.",
     )
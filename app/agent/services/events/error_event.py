@@ -5,7 +5,7 @@ from .base_event import BaseEvent
 
 class ErrorEvent(BaseEvent):
     event: str = "error"
-    data: str = Field(
+    data: bytes = Field(
         ...,
         description="The error message, typically a string representation of the error encountered.",
     )
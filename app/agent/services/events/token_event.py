@@ -5,7 +5,7 @@ from .base_event import BaseEvent
 
 class TokenEvent(BaseEvent):
     event: str = "token"
-    data: str = Field(
+    data: bytes = Field(
         ...,
         description="The token content, typically a string representation of the token.",
     )
@@ -0,0 +1,514 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from enum import Enum
+from uuid import UUID, uuid4
+
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.agent.interfaces import AgentInstance
+from app.agent.services.events import EndEvent, ErrorEvent, EventEncoder, TokenEvent
+from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.stream_options import StreamOptions
+from app.bootstrap.config import AppConfig
+from app.models import Thread, User
+from app.models.thread import ThreadStatus
+from app.services.thread_service import ThreadService
+
+logger = logging.getLogger(__name__)
+
+TOKEN_EVENT = "token"
+
+QUEUE_DEPTH = Gauge(
+    "agent_run_subscriber_queue_depth",
+    "Frames waiting to be sent to SSE subscribers",
+)
+DROPPED_EVENTS = Counter(
+    "agent_run_dropped_events_total",
+    "Token frames dropped or merged for slow SSE subscribers",
+    ["policy"],
+)
+SLOW_CONSUMER_DISCONNECTS = Counter(
+    "agent_run_slow_consumer_disconnects_total",
+    "SSE subscribers disconnected for falling behind",
+)
+BACKPRESSURE_WAIT = Histogram(
+    "agent_run_backpressure_wait_seconds",
+    "Time a run waited for a slow SSE subscriber",
+)
+
+
+class RunStatus(str, Enum):
+    running = "running"
+    completed = "completed"
+    error = "error"
+    interrupted = "interrupted"
+
+
+class RunNotFoundError(LookupError):
+    pass
+
+
+def format_event_id(run_id: UUID, seq: int) -> str:
+    return f"{run_id}:{seq}"
+
+
+def parse_event_id(event_id: str | None) -> tuple[UUID, int] | None:
+    """Parse a ``Last-Event-ID`` value produced by :func:`format_event_id`."""
+    if not event_id:
+        return None
+    run_part, _, seq_part = event_id.strip().rpartition(":")
+    try:
+        return UUID(run_part), int(seq_part)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class RunFrame:
+    seq: int
+    event: BaseEvent
+    frame: bytes
+    created_at: float
+
+    @property
+    def is_token(self) -> bool:
+        return self.event.event == TOKEN_EVENT
+
+
+class SlowConsumerPolicy(str, Enum):
+    block = "block"
+    drop_tokens = "drop_tokens"
+    coalesce_tokens = "coalesce_tokens"
+    disconnect = "disconnect"
+
+
+class RunEventBuffer:
+    """Ring buffer of the most recent frames of a run, bounded by size and age."""
+
+    def __init__(self, run_id: UUID, maxlen: int, ttl: float, encoder: EventEncoder):
+        self._run_id = run_id
+        self._frames: deque[RunFrame] = deque(maxlen=maxlen)
+        self._ttl = ttl
+        self._encoder = encoder
+        self.last_seq = 0
+
+    def append(self, event: BaseEvent) -> RunFrame:
+        """Encode *event* under the next sequence number and keep it for replay."""
+        self.last_seq += 1
+        frame = self.encode(event, self.last_seq)
+
+        self._frames.append(frame)
+        self._trim(frame.created_at)
+        return frame
+
+    def encode(self, event: BaseEvent, seq: int) -> RunFrame:
+        event_id = format_event_id(self._run_id, seq)
+        return RunFrame(
+            seq, event, self._encoder.encode(event, event_id), time.monotonic()
+        )
+
+    def since(self, seq: int) -> list[RunFrame]:
+        self._trim(time.monotonic())
+        return [frame for frame in self._frames if frame.seq > seq]
+
+    def _trim(self, now: float) -> None:
+        while self._frames and now - self._frames[0].created_at > self._ttl:
+            self._frames.popleft()
+
+
+class RunSubscriber:
+    """Queue of SSE frames delivered to a single client.
+
+    Once ``maxsize`` frames are waiting, *policy* decides what happens to the next
+    one: wait for the client (and hold up the run), drop or merge token frames
+    while still delivering structural events, or disconnect the client.
+
+    Merged tokens are held as the text of one pending frame, released before the
+    next structural event. Structural events may overrun ``maxsize`` up to twice
+    its value; a client further behind is disconnected and can resume with
+    ``Last-Event-ID``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: SlowConsumerPolicy,
+        buffer: RunEventBuffer,
+    ):
+        self._maxsize = maxsize
+        self._policy = policy
+        self._buffer = buffer
+        self._queue: asyncio.Queue[RunFrame | None] = asyncio.Queue()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._held: RunFrame | None = None
+        self._held_text: list[str] = []
+        self.closed = False
+        self.depth = 0
+        self.dropped = 0
+
+    async def publish(self, frame: RunFrame) -> bool:
+        if self.closed:
+            return False
+
+        if self.depth >= self._maxsize:
+            match self._policy:
+                case SlowConsumerPolicy.block:
+                    if not await self._wait_for_space():
+                        return False
+                case SlowConsumerPolicy.drop_tokens if frame.is_token:
+                    self.dropped += 1
+                    DROPPED_EVENTS.labels(policy=self._policy.value).inc()
+                    return True
+                case SlowConsumerPolicy.coalesce_tokens if frame.is_token:
+                    self._hold_token(frame)
+                    return True
+                case _ if (
+                    self._policy is SlowConsumerPolicy.disconnect
+                    or self.depth >= 2 * self._maxsize
+                ):
+                    SLOW_CONSUMER_DISCONNECTS.inc()
+                    self.close()
+                    return False
+
+        self._release_held_tokens()
+        self._put(frame)
+        return True
+
+    def close(self, final: RunFrame | None = None) -> None:
+        if not self.closed:
+            self._release_held_tokens()
+            if final is not None:
+                self._put(final)
+            self.closed = True
+            self._queue.put_nowait(None)
+            self._space.set()
+
+    async def frames(self) -> AsyncGenerator[bytes]:
+        try:
+            while (frame := await self._queue.get()) is not None:
+                self.depth -= 1
+                QUEUE_DEPTH.dec()
+                if self.depth < self._maxsize:
+                    self._space.set()
+                yield frame.frame
+        finally:
+            QUEUE_DEPTH.dec(self.depth)
+            self.depth = 0
+
+    def _put(self, frame: RunFrame) -> None:
+        self._queue.put_nowait(frame)
+        self.depth += 1
+        QUEUE_DEPTH.inc()
+        if self.depth >= self._maxsize:
+            self._space.clear()
+
+    async def _wait_for_space(self) -> bool:
+        started = time.perf_counter()
+        while self.depth >= self._maxsize and not self.closed:
+            await self._space.wait()
+        BACKPRESSURE_WAIT.observe(time.perf_counter() - started)
+        return not self.closed
+
+    def _hold_token(self, frame: RunFrame) -> None:
+        if self._held is not None:
+            DROPPED_EVENTS.labels(policy=self._policy.value).inc()
+        self._held = frame
+        self._held_text.append(orjson.loads(frame.event.data).get("content", ""))
+
+    def _release_held_tokens(self) -> None:
+        if self._held is None:
+            return
+
+        held, self._held = self._held, None
+        payload = orjson.loads(held.event.data)
+        payload["content"] = "".join(self._held_text)
+        self._held_text = []
+        self._put(self._buffer.encode(TokenEvent.from_data(payload), held.seq))
+
+
+@dataclass
+class ActiveRun:
+    id: UUID
+    thread_id: UUID
+    agent_id: str
+    user_id: str
+    buffer: RunEventBuffer
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    status: RunStatus = RunStatus.running
+    task: asyncio.Task[None] | None = None
+    subscribers: set[RunSubscriber] = field(default_factory=set)
+    finished_at: float | None = None
+    cancel_on_disconnect: bool = False
+    abandon_timer: asyncio.TimerHandle | None = None
+
+
+class RunManager:
+    """Owns agent runs as background tasks and fans their events out to subscribers.
+
+    A run keeps going when its client disconnects, and any number of clients can
+    attach to it while it is active. Recent frames are kept per run, including for
+    ``run_buffer_ttl`` seconds after it finishes, so a client reconnecting with
+    ``Last-Event-ID`` gets the frames it missed replayed.
+
+    Runs started with ``cancel_on_disconnect`` are cancelled once their last
+    subscriber has been gone for ``run_disconnect_grace`` seconds; cancellation
+    propagates through ``graph.astream`` into tool calls and model requests.
+
+    After a run completes, agents that support it get their thread summarized in
+    the background once the thread has been quiet for ``agent.summarize_after``
+    seconds; a new run on the thread postpones it, or cancels a summary that is
+    already running.
+    """
+
+    def __init__(self, config: AppConfig, thread_service: ThreadService):
+        self._thread_service = thread_service
+        self._disconnect_grace = config.run_disconnect_grace
+        self._queue_size = config.run_queue_size
+        self._policy = SlowConsumerPolicy(config.run_slow_consumer_policy)
+        self._buffer_size = config.run_buffer_size
+        self._buffer_ttl = config.run_buffer_ttl
+        self._encoder = EventEncoder()
+        self._runs: dict[UUID, ActiveRun] = {}
+        self._summary_timers: dict[UUID, asyncio.TimerHandle] = {}
+        self._summaries: dict[UUID, asyncio.Task[None]] = {}
+        self._background: set[asyncio.Task[None]] = set()
+
+    def start(
+        self,
+        agent: AgentInstance,
+        message: str,
+        thread: Thread,
+        user: User,
+        cancel_on_disconnect: bool = False,
+        options: StreamOptions | None = None,
+    ) -> ActiveRun:
+        run_id = uuid4()
+        run = ActiveRun(
+            id=run_id,
+            thread_id=thread.id,
+            agent_id=agent.agent_id,
+            user_id=str(user.id),
+            buffer=RunEventBuffer(
+                run_id, self._buffer_size, self._buffer_ttl, self._encoder
+            ),
+            cancel_on_disconnect=cancel_on_disconnect,
+        )
+        self._evict_expired()
+        self._cancel_summary(thread.id)
+        self._runs[run.id] = run
+        run.task = asyncio.create_task(
+            self._execute(run, agent, message, thread, user, options),
+            name=f"run-{run.id}",
+        )
+        logger.debug(f"Started run {run.id} on thread {thread.id}")
+        return run
+
+    def get(self, run_id: UUID) -> ActiveRun:
+        self._evict_expired()
+        run = self._runs.get(run_id)
+        if run is None:
+            raise RunNotFoundError(f"Run '{run_id}' not found")
+        return run
+
+    def list_runs(self, user_id: str | None = None) -> list[ActiveRun]:
+        return [
+            run
+            for run in self._runs.values()
+            if run.status is RunStatus.running
+            and (user_id is None or run.user_id == user_id)
+        ]
+
+    def subscribe(
+        self, run_id: UUID, last_seq: int | None = None
+    ) -> AsyncGenerator[bytes]:
+        """Attach to a run, replaying buffered frames newer than *last_seq* first."""
+        run = self.get(run_id)
+        replay = run.buffer.since(last_seq) if last_seq is not None else []
+
+        if run.status is not RunStatus.running:
+            return self._deliver(run, replay, None)
+
+        if run.abandon_timer is not None:
+            run.abandon_timer.cancel()
+            run.abandon_timer = None
+
+        subscriber = RunSubscriber(self._queue_size, self._policy, run.buffer)
+        run.subscribers.add(subscriber)
+        return self._deliver(run, replay, subscriber)
+
+    async def cancel(self, run_id: UUID) -> ActiveRun:
+        """Cancel a running run and wait for it to unwind."""
+        run = self.get(run_id)
+        if run.task is not None and not run.task.done():
+            logger.debug(f"Cancelling run {run.id}")
+            run.task.cancel()
+            await asyncio.wait({run.task})
+        return run
+
+    async def _deliver(
+        self, run: ActiveRun, replay: list[RunFrame], subscriber: RunSubscriber | None
+    ) -> AsyncGenerator[bytes]:
+        try:
+            for replayed in replay:
+                yield replayed.frame
+            if subscriber is not None:
+                async for frame in subscriber.frames():
+                    yield frame
+        finally:
+            if subscriber is not None:
+                # Closing wakes a run blocked on this subscriber's queue.
+                subscriber.close()
+                run.subscribers.discard(subscriber)
+                self._on_unsubscribe(run)
+
+    def _on_unsubscribe(self, run: ActiveRun) -> None:
+        if (
+            not run.cancel_on_disconnect
+            or run.subscribers
+            or run.status is not RunStatus.running
+            or run.abandon_timer is not None
+        ):
+            return
+
+        def cancel_abandoned() -> None:
+            run.abandon_timer = None
+            if not run.subscribers and run.task is not None:
+                logger.debug(f"Cancelling run {run.id}: all clients disconnected")
+                run.task.cancel()
+
+        run.abandon_timer = asyncio.get_running_loop().call_later(
+            self._disconnect_grace, cancel_abandoned
+        )
+
+    async def _execute(
+        self,
+        run: ActiveRun,
+        agent: AgentInstance,
+        message: str,
+        thread: Thread,
+        user: User,
+        options: StreamOptions | None,
+    ) -> None:
+        final: RunFrame | None = None
+        try:
+            last: BaseEvent | None = None
+            async for event in agent.stream_events(
+                message, thread, user, run_id=run.id, options=options
+            ):
+                await self._publish(run, event)
+                last = event
+            # Agents report a failed stream with a trailing error event.
+            if isinstance(last, ErrorEvent):
+                final = self._fail(run, thread)
+            else:
+                run.status = RunStatus.completed
+                self._schedule_summary(agent, thread, user)
+        except asyncio.CancelledError:
+            run.status = RunStatus.interrupted
+            thread.status = ThreadStatus.interrupted
+            final = run.buffer.append(
+                EndEvent.from_data({"run_id": str(run.id), "status": "interrupted"})
+            )
+            raise
+        except Exception as e:
+            logger.error(f"Run {run.id} failed: {e}")
+            final = self._fail(run, thread)
+        finally:
+            for subscriber in list(run.subscribers):
+                subscriber.close(final)
+            run.finished_at = time.monotonic()
+            await self._save_thread(thread)
+
+    @staticmethod
+    def _fail(run: ActiveRun, thread: Thread) -> RunFrame:
+        run.status = RunStatus.error
+        thread.status = ThreadStatus.error
+        return run.buffer.append(
+            EndEvent.from_data({"run_id": str(run.id), "status": "error"})
+        )
+
+    def _schedule_summary(
+        self, agent: AgentInstance, thread: Thread, user: User
+    ) -> None:
+        delay = agent.summarize_after
+        if delay is None:
+            return
+
+        def start() -> None:
+            self._summary_timers.pop(thread.id, None)
+            task = asyncio.create_task(
+                self._summarize(agent, thread, user), name=f"summarize-{thread.id}"
+            )
+            self._summaries[thread.id] = task
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            task.add_done_callback(lambda _: self._forget_summary(thread.id, task))
+
+        self._cancel_summary(thread.id)
+        self._summary_timers[thread.id] = asyncio.get_running_loop().call_later(
+            delay, start
+        )
+
+    def _cancel_summary(self, thread_id: UUID) -> None:
+        timer = self._summary_timers.pop(thread_id, None)
+        if timer is not None:
+            timer.cancel()
+        task = self._summaries.pop(thread_id, None)
+        if task is not None:
+            logger.debug(f"Cancelling running summary of thread {thread_id}")
+            task.cancel()
+
+    def _forget_summary(self, thread_id: UUID, task: asyncio.Task[None]) -> None:
+        if self._summaries.get(thread_id) is task:
+            del self._summaries[thread_id]
+
+    async def _summarize(
+        self, agent: AgentInstance, thread: Thread, user: User
+    ) -> None:
+        try:
+            await agent.summarize_history(thread, user)
+        except Exception as e:
+            logger.error(f"Failed to summarize thread {thread.id}: {e}")
+
+    async def _save_thread(self, thread: Thread) -> None:
+        try:
+            await self._thread_service.update_thread(thread)
+        except Exception as e:
+            logger.error(f"Failed to save status of thread {thread.id}: {e}")
+
+    async def _publish(self, run: ActiveRun, event: BaseEvent) -> None:
+        frame = run.buffer.append(event)
+        for subscriber in list(run.subscribers):
+            if not await subscriber.publish(frame):
+                logger.warning(f"Dropping slow subscriber of run {run.id}")
+                run.subscribers.discard(subscriber)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            run_id
+            for run_id, run in self._runs.items()
+            if run.finished_at is not None and now - run.finished_at > self._buffer_ttl
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+
+    async def shutdown(self) -> None:
+        for timer in self._summary_timers.values():
+            timer.cancel()
+        self._summary_timers.clear()
+
+        tasks = [run.task for run in self._runs.values() if run.task is not None]
+        tasks.extend(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
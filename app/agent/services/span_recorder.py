@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from langfuse._client.span import LangfuseSpan
+
+logger = logging.getLogger(__name__)
+
+
+class SpanOutputRecorder:
+    """Buffers span output and pushes it to the tracing client off the event loop.
+
+    Output is pushed at most once per ``interval`` while streaming and once more
+    on ``close()``; the SDK call itself runs in a worker thread.
+    """
+
+    def __init__(self, span: LangfuseSpan, interval: float = 1.0):
+        self.span = span
+        self.interval = interval
+        self._messages: list[Any] = []
+        self._dirty = False
+        self._last_push = time.monotonic()
+        self._pending: asyncio.Task[None] | None = None
+
+    def record(self, messages: list[Any]) -> None:
+        self._messages.extend(messages)
+        self._dirty = True
+
+        if self._pending is not None and not self._pending.done():
+            return
+        if time.monotonic() - self._last_push >= self.interval:
+            self._pending = asyncio.create_task(self._push())
+
+    async def close(self) -> None:
+        if self._pending is not None:
+            await self._pending
+            self._pending = None
+        if self._dirty:
+            await self._push()
+
+    async def _push(self) -> None:
+        output = list(self._messages)
+        self._dirty = False
+        self._last_push = time.monotonic()
+        try:
+            await asyncio.to_thread(self.span.update, output=output)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Failed to update span output: {exc}")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+from app.agent.models import MessageType
+
+
+class StreamProfile(str, Enum):
+    FULL = "full"
+    TOKENS = "tokens"
+    MESSAGES = "messages"
+
+
+_PROFILE_EXCLUDES: dict[StreamProfile, frozenset[str]] = {
+    StreamProfile.FULL: frozenset(),
+    StreamProfile.TOKENS: frozenset({"ai_message"}),
+    StreamProfile.MESSAGES: frozenset({"token"}),
+}
+
+
+class StreamOptions(BaseModel):
+    """What a client wants streamed for a run.
+
+    ``tokens`` streams AI answers token by token only, ``messages`` sends each
+    answer once as a complete ``ai_message`` and ``full`` sends both. Lifecycle
+    events (``thread``, ``stream_end``, ``error``) are always sent.
+    ``bypass_response_cache`` makes the run call the model even when the agent
+    has a cached response for an identical request.
+    """
+
+    profile: StreamProfile = StreamProfile.FULL
+    event_types: frozenset[MessageType] | None = Field(default=None)
+    bypass_response_cache: bool = False
+
+    def wants(self, event_type: str) -> bool:
+        if event_type in _PROFILE_EXCLUDES[self.profile]:
+            return False
+        return self.event_types is None or event_type in self.event_types
+
+    def stream_modes(self) -> list[str]:
+        modes = []
+        if any(self.wants(t) for t in ("ai_message", "tool_call", "tool_result")):
+            modes.append("updates")
+        if self.wants("token"):
+            modes.append("messages")
+        if self.wants("ui"):
+            modes.append("custom")
+        return modes or ["updates"]
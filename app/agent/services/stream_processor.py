@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import inspect
-import json
 import logging
-from collections.abc import AsyncGenerator, Callable, Iterable
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Callable, Iterable
 from enum import Enum
 from typing import Any
 from uuid import UUID
 
-from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+)
+from langchain_core.messages import (
+    HumanMessage as LHumanMessage,
+)
 from langfuse._client.span import LangfuseSpan
 
 from app.agent.langgraph.utils import (
@@ -17,9 +25,18 @@ from app.agent.langgraph.utils import (
     to_chat_message,
 )
 from app.agent.models import AIMessage as CustomAIMessage
-from app.agent.models import HumanMessage, Token
+from app.agent.models import CustomUIMessage, HumanMessage, Token
+from app.agent.services.coalescing import (
+    FLUSH_TICK,
+    TokenBuffer,
+    UIBuffer,
+    earliest_deadline,
+    with_flush_ticks,
+)
 from app.agent.services.events import EndEvent, ErrorEvent, TokenEvent
 from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.span_recorder import SpanOutputRecorder
+from app.agent.services.stream_options import StreamOptions
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +51,29 @@ class StreamProcessor:
     _ai_signature = inspect.signature(AIMessage)
     _ai_valid_keys = set(_ai_signature.parameters)
 
+    def __init__(
+        self,
+        token_flush_interval: float = 0.0,
+        token_flush_max_bytes: int = 0,
+        span_flush_interval: float = 1.0,
+        ui_flush_interval: float = 0.0,
+    ):
+        self._token_flush_interval = token_flush_interval
+        self._token_flush_max_bytes = token_flush_max_bytes
+        self._span_flush_interval = span_flush_interval
+        self._ui_flush_interval = ui_flush_interval
+
+    @classmethod
+    def from_params(cls, params: dict[str, Any]) -> StreamProcessor:
+        """Build a processor from agent ``custom_params``."""
+        return cls(
+            token_flush_interval=float(params.get("token_flush_interval_ms", 0)) / 1000,
+            token_flush_max_bytes=int(params.get("token_flush_max_bytes", 0)),
+            span_flush_interval=float(params.get("span_flush_interval_ms", 1000))
+            / 1000,
+            ui_flush_interval=float(params.get("ui_flush_interval_ms", 0)) / 1000,
+        )
+
     @staticmethod
     def _create_ai_message(parts: dict[str, Any]) -> AIMessage:
         filtered = {
@@ -53,11 +93,27 @@ class StreamProcessor:
     def _wrap_as_list(event: Any) -> list[Any]:
         return [event]
 
+    @staticmethod
+    def _event_type(message: Any) -> str | None:
+        """Predict the chat event type of a message without converting it."""
+        if isinstance(message, AIMessage):
+            return "tool_call" if message.tool_calls else "ai_message"
+        if isinstance(message, ToolMessage):
+            return "tool_result"
+        if isinstance(message, LHumanMessage):
+            return "human_message"
+        if isinstance(message, CustomUIMessage):
+            return "ui"
+        if isinstance(message, BaseMessage):
+            return "ai_message"
+        return None
+
     def _messages_to_events(
         self,
         messages: list[Any],
         run_id: UUID,
         span: LangfuseSpan | None,
+        options: StreamOptions | None = None,
     ) -> list[BaseEvent]:
         consolidated: list[Any] = []
         current: dict[str, Any] = {}
@@ -79,6 +135,11 @@ class StreamProcessor:
 
         events: list[BaseEvent] = []
         for message in consolidated:
+            if options is not None:
+                event_type = self._event_type(message)
+                if event_type is not None and not options.wants(event_type):
+                    continue
+
             try:
                 chat = to_chat_message(message)
                 chat.run_id = str(run_id)
@@ -93,25 +154,16 @@ class StreamProcessor:
                     chat.trace_id = span.trace_id
 
                 events.append(
-                    BaseEvent.from_payload(
-                        event=chat.type,
-                        payload=chat.model_dump(),
-                        source="stream",
-                    )
+                    BaseEvent.from_model(event=chat.type, model=chat, source="stream")
                 )
             except Exception as exc:  # noqa: BLE001
                 logger.exception("Failed to parse message: %s", exc)
-                events.append(
-                    ErrorEvent(data=json.dumps({"content": "Unexpected error"}))
-                )
+                events.append(ErrorEvent.from_data({"content": "Unexpected error"}))
 
         return events
 
     @staticmethod
-    def _token_event(
-        event: tuple[AIMessageChunk, dict[str, Any]],
-        run_id: UUID,
-    ) -> TokenEvent | None:
+    def _token_text(event: tuple[AIMessageChunk, dict[str, Any]]) -> str | None:
         msg, metadata = event
         if not isinstance(msg, AIMessageChunk) or "skip_stream" in metadata.get(
             "tags", []
@@ -122,17 +174,45 @@ class StreamProcessor:
         if not content:
             return None
 
+        return concat_text(content)
+
+    @staticmethod
+    def _token_event(
+        event: tuple[AIMessageChunk, dict[str, Any]],
+        run_id: UUID,
+    ) -> TokenEvent | None:
+        text = StreamProcessor._token_text(event)
+        if text is None:
+            return None
+
         token = Token(
             run_id=str(run_id),
-            content=concat_text(content),
+            content=text,
         )
-        return TokenEvent(data=token.model_dump_json())
+        return TokenEvent.from_data(token)
+
+    def _ui_events(
+        self,
+        ui: UIBuffer,
+        run_id: UUID,
+        span: LangfuseSpan | None,
+        options: StreamOptions | None,
+        recorder: SpanOutputRecorder | None,
+    ) -> list[BaseEvent]:
+        messages = ui.flush()
+        if not messages:
+            return []
+
+        if recorder:
+            recorder.record(messages)
+        return self._messages_to_events(messages, run_id, span, options)
 
     async def process_stream(
         self,
         stream: AsyncGenerator[tuple[str, Any]],
         run_id: UUID,
         span: LangfuseSpan | None = None,
+        options: StreamOptions | None = None,
     ) -> AsyncGenerator[BaseEvent]:
         strategy: dict[StreamMode, Callable[[Any], Iterable[list[Any]]]] = {
             StreamMode.UPDATES: lambda payload: [self._flatten_updates(payload)],
@@ -140,28 +220,90 @@ class StreamProcessor:
             StreamMode.MESSAGES: lambda _: [],
         }
 
-        async for mode_str, payload in stream:
-            try:
-                mode = StreamMode(mode_str)
-            except ValueError:
-                logger.warning("Unknown stream mode '%s' – skipping", mode_str)
-                continue
+        tokens = TokenBuffer(self._token_flush_interval, self._token_flush_max_bytes)
+        ui = UIBuffer(self._ui_flush_interval)
+        items: AsyncIterable[Any] = (
+            with_flush_ticks(
+                stream, lambda: earliest_deadline(tokens.deadline, ui.deadline)
+            )
+            if tokens.deadline_enabled or ui.enabled
+            else stream
+        )
 
-            if mode is StreamMode.MESSAGES:
-                token = self._token_event(payload, run_id)
-                if token:
-                    yield token
-                continue
+        recorder = SpanOutputRecorder(span, self._span_flush_interval) if span else None
+        try:
+            async for item in items:
+                if item is FLUSH_TICK:
+                    now = time.monotonic()
+                    if (deadline := tokens.deadline) is not None and deadline <= now:
+                        if pending := tokens.flush(str(run_id)):
+                            yield pending
+                    if (deadline := ui.deadline) is not None and deadline <= now:
+                        for evt in self._ui_events(ui, run_id, span, options, recorder):
+                            yield evt
+                    continue
 
-            for messages in strategy[mode](payload):
-                if not messages:
+                mode_str, payload = item
+                try:
+                    mode = StreamMode(mode_str)
+                except ValueError:
+                    logger.warning("Unknown stream mode '%s' – skipping", mode_str)
                     continue
 
-                events = self._messages_to_events(messages, run_id, span)
-                if span:
-                    span.update(output=messages)
+                if mode is StreamMode.MESSAGES:
+                    if options is not None and not options.wants("token"):
+                        continue
 
-                for evt in events:
+                    if not tokens.enabled:
+                        token = self._token_event(payload, run_id)
+                        if token:
+                            yield token
+                        continue
+
+                    text = self._token_text(payload)
+                    if text:
+                        tokens.add(text)
+                    if tokens.is_full() and (pending := tokens.flush(str(run_id))):
+                        yield pending
+                    continue
+
+                if (
+                    mode is StreamMode.CUSTOM
+                    and ui.enabled
+                    and isinstance(payload, CustomUIMessage)
+                ):
+                    if options is None or options.wants("ui"):
+                        if pending := tokens.flush(str(run_id)):
+                            yield pending
+                        ui.add(payload)
+                    continue
+
+                if pending := tokens.flush(str(run_id)):
+                    yield pending
+                for evt in self._ui_events(ui, run_id, span, options, recorder):
                     yield evt
 
-        yield EndEvent(data=json.dumps({"run_id": str(run_id), "status": "completed"}))
+                for messages in strategy[mode](payload):
+                    if not messages:
+                        continue
+
+                    events = self._messages_to_events(messages, run_id, span, options)
+                    if recorder:
+                        recorder.record(messages)
+
+                    for evt in events:
+                        yield evt
+
+            if pending := tokens.flush(str(run_id)):
+                yield pending
+            for evt in self._ui_events(ui, run_id, span, options, recorder):
+                yield evt
+        except Exception:
+            if pending := tokens.flush(str(run_id)):
+                yield pending
+            raise
+        finally:
+            if recorder:
+                await recorder.close()
+
+        yield EndEvent.from_data({"run_id": str(run_id), "status": "completed"})
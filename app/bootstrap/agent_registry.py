@@ -12,6 +12,9 @@ def register_agents() -> None:
             custom_params={
                 "max_iterations": 10,
                 "temperature": 0.7,
+                "token_flush_interval_ms": 30,
+                "token_flush_max_bytes": 1024,
+                "ui_flush_interval_ms": 100,
             },
         ),
     )
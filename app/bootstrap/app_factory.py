@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
 from asgi_correlation_id import CorrelationIdMiddleware
@@ -16,14 +18,23 @@ from .config import AppConfig
 
 
 def create_app(config: AppConfig) -> FastAPI:
-    Container()
+    container = Container()
     register_agents()
 
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        yield
+        await container.run_manager().shutdown()
+        await container.llm_transport().aclose()
+        container.tool_pools().shutdown()
+        container.semantic_cache().save()
+
     app = FastAPI(
         title="Raw LangGraph",
         description="A test application",
         version="0.0.1",
         debug=config.debug,
+        lifespan=lifespan,
     )
 
     cors_config = CORSConfig(
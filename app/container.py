@@ -33,6 +33,7 @@ class Container(containers.DeclarativeContainer):
         modules=[
             "app.http.routes.thread_routes",
             "app.http.routes.runs_routes",
+            "app.http.routes.health_routes",
             "app.http.middleware",
             "app.http.controllers",
             "app.agent.factory",
@@ -89,12 +90,77 @@ class Container(containers.DeclarativeContainer):
         langfuse_client=langfuse_client,
     )
 
+    model_cache: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.ModelCache",
+        maxsize=config.provided.model_cache_size,
+    )
+
+    chain_cache: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.ChainCache",
+        maxsize=config.provided.chain_cache_size,
+    )
+
+    llm_transport: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.LLMTransport",
+        config=config,
+    )
+
+    response_cache: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.response_cache.create_response_cache",
+        config=config,
+    )
+
+    semantic_cache: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.SemanticResponseCache",
+        capacity=config.provided.semantic_cache_size,
+        directory=config.provided.semantic_cache_dir,
+        ttl=config.provided.semantic_cache_ttl,
+        save_every=config.provided.semantic_cache_save_every,
+    )
+
+    hedge_budgets: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.HedgeBudgets",
+    )
+
+    circuit_breakers: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.CircuitBreakers",
+        failure_rate=config.provided.llm_breaker_failure_rate,
+        slow_call_seconds=config.provided.llm_breaker_slow_call_seconds,
+        open_seconds=config.provided.llm_breaker_open_seconds,
+    )
+
+    rate_limiter: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.llm.LLMRateLimiter",
+        limits=config.provided.llm_rate_limits,
+    )
+
+    tool_pools: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.tools.ToolPools",
+        thread_workers=config.provided.tool_thread_workers,
+        process_workers=config.provided.tool_process_workers,
+    )
+
+    tool_cache: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.langgraph.tools.ToolResultCache",
+        maxsize=config.provided.tool_cache_size,
+    )
+
     agent_factory: providers.Singleton[Any] = providers.Singleton(
         "app.agent.factory.AgentFactory",
         global_config=config,
         langfuse_client=langfuse_client,
         checkpointer_resolver=checkpointer_resolver,
         prompt_provider_resolver=prompt_provider_resolver,
+        model_cache=model_cache,
+        llm_transport=llm_transport,
+        chain_cache=chain_cache,
+        response_cache=response_cache,
+        semantic_cache=semantic_cache,
+        hedge_budgets=hedge_budgets,
+        circuit_breakers=circuit_breakers,
+        rate_limiter=rate_limiter,
+        tool_pools=tool_pools,
+        tool_cache=tool_cache,
     )
 
     agent_service: providers.Singleton[Any] = providers.Singleton(
@@ -102,10 +168,17 @@ class Container(containers.DeclarativeContainer):
         langfuse_client=langfuse_client,
     )
 
+    run_manager: providers.Singleton[Any] = providers.Singleton(
+        "app.agent.services.run_manager.RunManager",
+        config=config,
+        thread_service=thread_service,
+    )
+
     thread_controller: providers.Singleton[Any] = providers.Singleton(
         "app.http.controllers.ThreadController",
         config=config,
         agent_factory=agent_factory,
         agent_service=agent_service,
         thread_service=thread_service,
+        run_manager=run_manager,
     )
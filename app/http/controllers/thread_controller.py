@@ -8,6 +8,13 @@ from sse_starlette.sse import EventSourceResponse
 from app.agent.factory import AgentFactory
 from app.agent.interfaces import AgentInstance
 from app.agent.services import AgentService
+from app.agent.services.run_manager import (
+    ActiveRun,
+    RunManager,
+    RunNotFoundError,
+    parse_event_id,
+)
+from app.agent.services.stream_options import StreamOptions
 from app.bootstrap.agent_registry import validate_agent_id
 from app.bootstrap.config import AppConfig
 from app.http.requests import FeedbackRequest
@@ -25,11 +32,13 @@ class ThreadController:
         agent_factory: AgentFactory,
         agent_service: AgentService,
         thread_service: ThreadService,
+        run_manager: RunManager,
     ):
         self.config = config
         self._agent_factory = agent_factory
         self._agent_service = agent_service
         self._thread_service = thread_service
+        self._run_manager = run_manager
         self._agent_instances: dict[str, AgentInstance] = {}
 
     async def _get_agent_instance(self, agent_id: str) -> AgentInstance:
@@ -43,14 +52,16 @@ class ThreadController:
 
         return agent_instance
 
-    async def stream(
+    async def start_run(
         self,
         agent_id: str | None,
         query: dict[str, Any] | list[Any] | str | float | bool | None,
         thread_id: UUID | None,
         metadata: dict[str, Any] | None,
         user: User,
-    ) -> EventSourceResponse:
+        cancel_on_disconnect: bool = False,
+        options: StreamOptions | None = None,
+    ) -> ActiveRun:
         try:
             effective_agent_id = validate_agent_id(agent_id)
         except ValueError as e:
@@ -80,20 +91,78 @@ class ThreadController:
             agent_instance = await self._get_agent_instance(thread.agent_id)
             logger.debug(f"Received chat request: {str(query)[:50]}...")
 
-            return EventSourceResponse(
-                agent_instance.stream_response(str(query), thread, user),  # type: ignore[arg-type]
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                },
+            return self._run_manager.start(
+                agent_instance,
+                str(query),
+                thread,
+                user,
+                cancel_on_disconnect=cancel_on_disconnect,
+                options=options,
             )
         except Exception as e:
             logger.error(f"Error processing thread request: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error") from e
 
+    async def stream(
+        self,
+        agent_id: str | None,
+        query: dict[str, Any] | list[Any] | str | float | bool | None,
+        thread_id: UUID | None,
+        metadata: dict[str, Any] | None,
+        user: User,
+        last_event_id: str | None = None,
+        options: StreamOptions | None = None,
+    ) -> EventSourceResponse:
+        resume = parse_event_id(last_event_id)
+        if resume is not None:
+            return await self.attach(resume[0], user, last_event_id)
+
+        run = await self.start_run(
+            agent_id,
+            query,
+            thread_id,
+            metadata,
+            user,
+            cancel_on_disconnect=True,
+            options=options,
+        )
+        return await self.attach(run.id, user)
+
+    async def attach(
+        self, run_id: UUID, user: User, last_event_id: str | None = None
+    ) -> EventSourceResponse:
+        run = self.get_run(run_id, user)
+        resume = parse_event_id(last_event_id)
+        last_seq = resume[1] if resume is not None and resume[0] == run.id else None
+        return EventSourceResponse(
+            self._run_manager.subscribe(run.id, last_seq),
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type, Authorization",
+            },
+        )
+
+    def get_run(self, run_id: UUID, user: User) -> ActiveRun:
+        try:
+            run = self._run_manager.get(run_id)
+        except RunNotFoundError as e:
+            raise HTTPException(status_code=404, detail="Run not found") from e
+        if run.user_id != str(user.id):
+            raise HTTPException(
+                status_code=403, detail="Forbidden: You do not have access to this run."
+            )
+        return run
+
+    async def cancel_run(self, run_id: UUID, user: User) -> ActiveRun:
+        run = self.get_run(run_id, user)
+        return await self._run_manager.cancel(run.id)
+
+    def list_runs(self, user: User) -> list[ActiveRun]:
+        return self._run_manager.list_runs(str(user.id))
+
     async def get_thread_history(
         self,
         thread: Thread,
@@ -102,7 +171,7 @@ class ThreadController:
         try:
             agent_instance = await self._get_agent_instance(thread.agent_id)
             return EventSourceResponse(
-                agent_instance.load_history(thread, user),  # type: ignore[arg-type]
+                agent_instance.load_history(thread, user),
                 headers={
                     "Cache-Control": "no-cache",
                     "Connection": "keep-alive",
@@ -3,6 +3,9 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.agent.models import MessageType
+from app.agent.services.stream_options import StreamOptions, StreamProfile
+
 
 class Content(BaseModel):
     text: str
@@ -49,3 +52,27 @@ class Run(BaseModel):
         description="The agent ID to run. If not provided will use the default agent for this service.",
         title="Agent Id",
     )
+    stream_profile: StreamProfile = Field(
+        StreamProfile.FULL,
+        description="How AI answers are streamed: token by token (tokens), as complete messages (messages) or both (full).",
+        title="Stream Profile",
+    )
+    event_types: list[MessageType] | None = Field(
+        None,
+        description="Only stream these event types. Lifecycle events are always sent.",
+        title="Event Types",
+        examples=[["token", "tool_call", "tool_result"]],
+    )
+
+    bypass_response_cache: bool = Field(
+        False,
+        description="Call the model even if the agent has a cached response for an identical request.",
+        title="Bypass Response Cache",
+    )
+
+    def stream_options(self) -> StreamOptions:
+        return StreamOptions(
+            profile=self.stream_profile,
+            event_types=frozenset(self.event_types) if self.event_types else None,
+            bypass_response_cache=self.bypass_response_cache,
+        )
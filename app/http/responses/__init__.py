@@ -1,5 +1,7 @@
 from .error_response import ErrorResponse
+from .run_response import RunResponse
 
 __all__ = [
     "ErrorResponse",
+    "RunResponse",
 ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.agent.services.run_manager import ActiveRun, RunStatus
+
+
+class RunResponse(BaseModel):
+    run_id: UUID = Field(description="The ID of the run.")
+    thread_id: UUID = Field(description="The ID of the thread the run belongs to.")
+    agent_id: str = Field(description="The ID of the agent executing the run.")
+    status: RunStatus = Field(description="Current status of the run.")
+    created_at: datetime = Field(description="When the run was started.")
+    subscribers: int = Field(description="Number of clients attached to the run.")
+
+    @classmethod
+    def from_run(cls, run: ActiveRun) -> "RunResponse":
+        return cls(
+            run_id=run.id,
+            thread_id=run.thread_id,
+            agent_id=run.agent_id,
+            status=run.status,
+            created_at=run.created_at,
+            subscribers=len(run.subscribers),
+        )
@@ -1,7 +1,12 @@
 import logging
 from datetime import datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends
+
+from app.agent.langgraph.llm import CircuitBreakers
+from app.container import Container
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +23,25 @@ async def health_check() -> dict[str, str]:
 
 
 @health_router.get("/detailed")
-async def detailed_health_check() -> dict[str, str | dict[str, str]]:
+@inject
+async def detailed_health_check(
+    circuit_breakers: Annotated[
+        CircuitBreakers, Depends(Provide[Container.circuit_breakers])
+    ],
+) -> dict[str, Any]:
     try:
+        circuits = circuit_breakers.snapshot()
+        degraded = any(c["state"] != "closed" for c in circuits.values())
         return {
-            "status": "healthy",
+            "status": "degraded" if degraded else "healthy",
             "timestamp": datetime.utcnow().isoformat(),
             "service": "enterprise-chat-api",
             "components": {
                 "chat_service": "healthy",
                 "agent": "healthy",
+                "llm": "degraded" if degraded else "healthy",
             },
+            "llm_circuits": circuits,
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -1,13 +1,15 @@
 from typing import Annotated
+from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sse_starlette import EventSourceResponse
 
 from app.container import Container
 from app.http.controllers import ThreadController
 from app.http.middleware.auth import get_current_user
 from app.http.requests import Run
+from app.http.responses import ErrorResponse, RunResponse
 from app.models import User
 
 runs_router = APIRouter(tags=["runs"])
@@ -21,7 +23,77 @@ async def run_stream(
         ThreadController, Depends(Provide[Container.thread_controller])
     ],
     user: User = Depends(get_current_user),  # noqa: B008
+    last_event_id: Annotated[str | None, Header(alias="Last-Event-ID")] = None,
 ) -> EventSourceResponse:
     return await thread_controller.stream(
-        request.agent_id, request.input, request.thread_id, request.metadata or {}, user
+        request.agent_id,
+        request.input,
+        request.thread_id,
+        request.metadata or {},
+        user,
+        last_event_id,
+        request.stream_options(),
     )
+
+
+@runs_router.post("/runs", status_code=202)
+@inject
+async def create_run(
+    request: Run,
+    thread_controller: Annotated[
+        ThreadController, Depends(Provide[Container.thread_controller])
+    ],
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> RunResponse:
+    run = await thread_controller.start_run(
+        request.agent_id,
+        request.input,
+        request.thread_id,
+        request.metadata or {},
+        user,
+        options=request.stream_options(),
+    )
+    return RunResponse.from_run(run)
+
+
+@runs_router.get("/runs")
+@inject
+async def list_runs(
+    thread_controller: Annotated[
+        ThreadController, Depends(Provide[Container.thread_controller])
+    ],
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> list[RunResponse]:
+    return [RunResponse.from_run(run) for run in thread_controller.list_runs(user)]
+
+
+@runs_router.get(
+    "/runs/{run_id}/stream",
+    responses={"404": {"model": ErrorResponse}, "403": {"model": ErrorResponse}},
+)
+@inject
+async def join_run_stream(
+    run_id: UUID,
+    thread_controller: Annotated[
+        ThreadController, Depends(Provide[Container.thread_controller])
+    ],
+    user: User = Depends(get_current_user),  # noqa: B008
+    last_event_id: Annotated[str | None, Header(alias="Last-Event-ID")] = None,
+) -> EventSourceResponse:
+    return await thread_controller.attach(run_id, user, last_event_id)
+
+
+@runs_router.post(
+    "/runs/{run_id}/cancel",
+    responses={"404": {"model": ErrorResponse}, "403": {"model": ErrorResponse}},
+)
+@inject
+async def cancel_run(
+    run_id: UUID,
+    thread_controller: Annotated[
+        ThreadController, Depends(Provide[Container.thread_controller])
+    ],
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> RunResponse:
+    run = await thread_controller.cancel_run(run_id, user)
+    return RunResponse.from_run(run)
@@ -0,0 +1,82 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+from app.agent.langgraph import Graph
+from app.agent.langgraph.base_state import BaseState
+from app.agent.langgraph.llm import ChainCache, ModelCache
+from app.agent.prompt import Prompt
+
+MODEL = "openai/gpt-4o-mini"
+
+
+class StaticGraph(Graph):
+    """A single ``call_model`` node answering with a fixed prompt."""
+
+    @property
+    def graph_name(self) -> str:
+        return "static"
+
+    def build_graph(self):
+        graph = StateGraph(BaseState)
+        graph.add_node("call_model", self.call_model)
+        graph.add_edge(START, "call_model")
+        graph.add_edge("call_model", END)
+        return graph.compile()
+
+
+@pytest.fixture
+def make_graph() -> Callable[..., StaticGraph]:
+    """Build a ``StaticGraph`` whose models come from *models*: one model for
+    every config, or a dict keyed by the config's ``model``. Extra keyword
+    arguments are passed on as services and custom params.
+    """
+
+    def make(
+        models: BaseChatModel | dict[str, BaseChatModel],
+        prompt: Prompt | None = None,
+        **params: Any,
+    ) -> StaticGraph:
+        graph = StaticGraph(
+            checkpointer=Mock(),
+            prompt_provider=Mock(),
+            model_cache=ModelCache(),
+            chain_cache=ChainCache(),
+            **params,
+        )
+        graph.create_model = Mock(
+            side_effect=lambda cfg: (
+                models[cfg["model"]] if isinstance(models, dict) else models
+            )
+        )
+        graph._prompt_provider.get_prompt.return_value = prompt or Prompt(
+            content="Be brief.", config={"model": MODEL}
+        )
+        return graph
+
+    return make
+
+
+@pytest.fixture
+def ask() -> Callable[..., Awaitable[AIMessage]]:
+    """Run one ``call_model`` step on *messages* (a single "hi" by default) and
+    return the model's answer.
+    """
+
+    async def ask(
+        graph: Graph,
+        *messages: BaseMessage,
+        configurable: dict[str, Any] | None = None,
+    ) -> AIMessage:
+        state = BaseState(
+            messages=list(messages) or [HumanMessage(id="h1", content="hi")]
+        )
+        result = await graph.call_model(state, {"configurable": configurable or {}})
+        return result["messages"][0]
+
+    return ask
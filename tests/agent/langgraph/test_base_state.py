@@ -0,0 +1,57 @@
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, StateGraph
+
+from app.agent.langgraph.base_state import BaseState, State, merge_trace_map
+
+
+def entry(message_id, trace_id="t"):
+    return {"id": message_id, "trace_id": trace_id}
+
+
+class TestMergeTraceMap:
+    def test_appends_new_entries(self):
+        assert merge_trace_map([entry("a")], [entry("b")]) == [entry("a"), entry("b")]
+
+    def test_replaces_entries_with_known_ids(self):
+        merged = merge_trace_map([entry("a"), entry("b")], [entry("a", "t2")])
+
+        assert merged == [entry("a", "t2"), entry("b")]
+
+    def test_legacy_full_map_writes_do_not_duplicate(self):
+        existing = [entry("a"), entry("b")]
+
+        assert merge_trace_map(existing, [*existing, entry("c")]) == [
+            entry("a"),
+            entry("b"),
+            entry("c"),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_single_entry_writes_accumulate_in_checkpoints():
+    writes = []
+
+    def call_model(state: State):
+        message = AIMessage(id=f"ai_{len(state.message_trace_map)}", content="ok")
+        update = {"messages": [message], "message_trace_map": [entry(message.id)]}
+        writes.append(update["message_trace_map"])
+        return update
+
+    builder = StateGraph(state_schema=State, input_schema=BaseState)
+    builder.add_node("call_model", call_model)
+    builder.add_edge(START, "call_model")
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "1"}}
+
+    for _ in range(3):
+        await graph.ainvoke({"messages": [("user", "hi")]}, config)
+
+    state = await graph.aget_state(config)
+    assert [e["id"] for e in state.values["message_trace_map"]] == [
+        "ai_0",
+        "ai_1",
+        "ai_2",
+    ]
+    assert all(len(w) == 1 for w in writes)
@@ -0,0 +1,159 @@
+import httpx
+import openai
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+from app.agent.langgraph.llm import CircuitBreakers
+from app.agent.langgraph.llm.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    is_provider_failure,
+)
+from app.agent.prompt import Prompt
+
+
+class FailingModel(FakeListChatModel):
+    calls: int = 0
+
+    async def _agenerate(self, *args, **kwargs):
+        self.calls += 1
+        raise TimeoutError("provider timed out")
+
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(status):
+    response = httpx.Response(status, request=REQUEST)
+    return openai.APIStatusError("provider error", response=response, body=None)
+
+
+class RejectedModel(FakeListChatModel):
+    calls: int = 0
+
+    async def _agenerate(self, *args, **kwargs):
+        self.calls += 1
+        raise openai.BadRequestError(
+            "context length exceeded",
+            response=httpx.Response(400, request=REQUEST),
+            body=None,
+        )
+
+
+PROMPT = Prompt(
+    content="Be brief.",
+    config={"model": "openai/primary", "fallback_models": ["other/fallback"]},
+)
+
+
+class TestCircuitBreaker:
+    def test_trips_on_consecutive_failures_and_probes_after_cooldown(self):
+        breaker = CircuitBreaker("m", consecutive_failures=2, open_seconds=0)
+        for _ in range(2):
+            assert breaker.try_acquire()
+            breaker.record(False, 0.1)
+        assert breaker.state is CircuitState.OPEN
+
+        assert breaker.try_acquire()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.try_acquire()
+
+        breaker.record(True, 0.1)
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_failed_probe_reopens_and_cancelled_probe_frees_the_slot(self):
+        breaker = CircuitBreaker("m", consecutive_failures=1, open_seconds=0)
+        breaker.record(False, 0.1)
+
+        assert breaker.try_acquire()
+        breaker.release()
+        assert breaker.try_acquire()
+        breaker.record(False, 0.1)
+
+        assert breaker.state is CircuitState.OPEN
+
+    def test_slow_calls_count_towards_failure_rate(self):
+        breaker = CircuitBreaker(
+            "m", slow_call_seconds=1, min_calls=4, consecutive_failures=10
+        )
+        for latency in (5, 0.1, 5, 0.1):
+            breaker.record(True, latency)
+
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.snapshot() == {"state": "open", "bad_rate": 0.5, "calls": 4}
+
+
+@pytest.mark.parametrize(
+    "error, counted",
+    [
+        (TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (httpx.ConnectTimeout("slow"), True),
+        (openai.APIConnectionError(request=REQUEST), True),
+        (openai.APITimeoutError(request=REQUEST), True),
+        (status_error(429), True),
+        (status_error(503), True),
+        (status_error(400), False),
+        (status_error(404), False),
+        (ValueError("bad tool schema"), False),
+    ],
+)
+def test_only_provider_failures_count(error, counted):
+    assert is_provider_failure(error) is counted
+
+
+class TestGraphFallback:
+    @pytest.mark.asyncio
+    async def test_open_circuit_routes_to_fallback_model(self, make_graph, ask):
+        primary = FailingModel(responses=[])
+        fallback = FakeListChatModel(responses=["from fallback"])
+        breakers = CircuitBreakers(consecutive_failures=2, open_seconds=60)
+        graph = make_graph(
+            {"openai/primary": primary, "other/fallback": fallback},
+            PROMPT,
+            circuit_breakers=breakers,
+        )
+
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await ask(graph)
+        answer = await ask(graph)
+
+        assert isinstance(answer, AIMessage) and answer.content == "from fallback"
+        assert primary.calls == 2
+        assert breakers.snapshot()["openai/primary"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_when_every_circuit_is_open(self, make_graph, ask):
+        breakers = CircuitBreakers(consecutive_failures=1, open_seconds=60)
+        for model in ("openai/primary", "other/fallback"):
+            breakers.get(model).record(False, 0.1)
+        primary = FailingModel(responses=[])
+        graph = make_graph(
+            {"openai/primary": primary}, PROMPT, circuit_breakers=breakers
+        )
+
+        with pytest.raises(CircuitOpenError):
+            await ask(graph)
+        assert primary.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_request_errors_do_not_open_the_circuit(self, make_graph, ask):
+        primary = RejectedModel(responses=[])
+        breakers = CircuitBreakers(consecutive_failures=1, open_seconds=60)
+        graph = make_graph(
+            {"openai/primary": primary}, PROMPT, circuit_breakers=breakers
+        )
+
+        for _ in range(2):
+            with pytest.raises(openai.BadRequestError):
+                await ask(graph)
+
+        assert primary.calls == 2
+        assert breakers.snapshot()["openai/primary"] == {
+            "state": "closed",
+            "bad_rate": 0.0,
+            "calls": 0,
+        }
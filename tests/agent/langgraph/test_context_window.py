@@ -0,0 +1,68 @@
+from unittest.mock import Mock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.agent.langgraph.context import TokenBudgetWindow, TokenCounter
+
+
+def counter(tokens=10):
+    return TokenCounter(count=Mock(return_value=tokens))
+
+
+def tool_turn(i):
+    return [
+        HumanMessage(id=f"h{i}", content=f"question {i}"),
+        AIMessage(
+            id=f"a{i}",
+            content="",
+            tool_calls=[
+                {"id": f"c{i}a", "name": "get_weather", "args": {}},
+                {"id": f"c{i}b", "name": "get_weather", "args": {}},
+            ],
+        ),
+        ToolMessage(id=f"t{i}a", tool_call_id=f"c{i}a", content="sunny"),
+        ToolMessage(id=f"t{i}b", tool_call_id=f"c{i}b", content="rainy"),
+        AIMessage(id=f"r{i}", content=f"answer {i}"),
+    ]
+
+
+class TestTokenBudgetWindow:
+    def test_keeps_everything_within_budget(self):
+        messages = tool_turn(1)
+
+        assert TokenBudgetWindow(1000, counter()).build(messages) == messages
+
+    def test_keeps_latest_messages_and_system_prompt(self):
+        system = SystemMessage(id="s", content="rules")
+        messages = [system, *tool_turn(1), *tool_turn(2)]
+
+        window = TokenBudgetWindow(30, counter()).build(messages)
+
+        assert [m.id for m in window] == ["s", "r2"]
+
+    def test_tool_calls_and_results_stay_together(self):
+        messages = tool_turn(1)
+
+        window = TokenBudgetWindow(35, counter()).build(messages)
+
+        assert [m.id for m in window] == ["r1"]
+        window = TokenBudgetWindow(40, counter()).build(messages)
+        assert [m.id for m in window] == ["a1", "t1a", "t1b", "r1"]
+
+    def test_latest_message_is_kept_even_over_budget(self):
+        messages = tool_turn(1)
+
+        window = TokenBudgetWindow(1, counter()).build(messages)
+
+        assert [m.id for m in window] == ["r1"]
+
+    def test_each_message_is_counted_once_across_turns(self):
+        tokens = counter()
+        window = TokenBudgetWindow(10_000, tokens)
+        history = []
+
+        for i in range(5):
+            history.extend(tool_turn(i))
+            window.build(history)
+
+        assert tokens._count.call_count == len(history)
@@ -0,0 +1,224 @@
+from itertools import count
+from unittest.mock import Mock, patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import StructuredTool
+
+from app.agent.langgraph import Graph
+from app.agent.langgraph.base_state import BaseState
+from app.agent.langgraph.llm import ChainCache, ModelCache
+from app.agent.langgraph.llm import chain_cache as chain_cache_module
+from app.agent.langgraph.llm.chain_cache import chain_cache_key
+from app.agent.langgraph.llm.usage import INPUT_TOKENS
+from app.agent.prompt import Prompt
+
+
+class RecordingModel(FakeMessagesListChatModel):
+    prompts: list = []
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        self.prompts.append(messages)
+        return await super()._agenerate(messages, *args, **kwargs)
+
+
+class SimpleGraph(Graph):
+    ticks = count()
+
+    @property
+    def graph_name(self) -> str:
+        return "simple"
+
+    def build_graph(self):
+        raise NotImplementedError
+
+    def get_prompt_placeholders(self) -> dict[str, str]:
+        return {"system_time": str(next(self.ticks))}
+
+
+def prompt(content="Now: {system_time}", temperature=0.5):
+    return Prompt(
+        content=content,
+        config={"model": "openai/gpt-4o-mini", "temperature": temperature},
+    )
+
+
+@pytest.fixture
+def model():
+    return RecordingModel(
+        responses=[AIMessage(id=f"ai_{i}", content="ok") for i in range(10)],
+        prompts=[],
+    )
+
+
+def make_graph(model, **params):
+    graph = SimpleGraph(
+        checkpointer=Mock(),
+        prompt_provider=Mock(),
+        model_cache=ModelCache(),
+        chain_cache=ChainCache(),
+        **params,
+    )
+    graph.create_model = Mock(return_value=model)
+    return graph
+
+
+@pytest.fixture
+def graph(model):
+    return make_graph(model)
+
+
+async def call(graph):
+    state = BaseState(messages=[HumanMessage(content="hi")])
+    return await graph.call_model(state, {"metadata": {"trace_id": "t"}})
+
+
+class TestGraphChainCache:
+    @pytest.mark.asyncio
+    async def test_chain_is_built_once_and_placeholders_applied_per_call(
+        self, graph, model
+    ):
+        graph._prompt_provider.get_prompt.return_value = prompt()
+
+        await call(graph)
+        result = await call(graph)
+
+        assert result["message_trace_map"] == [{"id": "ai_1", "trace_id": "t"}]
+        graph.create_model.assert_called_once()
+        assert len(graph._chain_cache) == 1
+        system_prompts = [messages[0].content for messages in model.prompts]
+        assert system_prompts[0] != system_prompts[1]
+        assert all(p.startswith("Now: ") for p in system_prompts)
+
+    @pytest.mark.asyncio
+    async def test_new_prompt_version_builds_new_chain(self, graph):
+        graph._prompt_provider.get_prompt.side_effect = [
+            prompt(),
+            prompt(content="v2 {system_time}"),
+            prompt(content="v2 {system_time}", temperature=0.1),
+        ]
+
+        for _ in range(3):
+            await call(graph)
+
+        assert len(graph._chain_cache) == 3
+
+    def test_switching_to_a_fallback_model_keeps_both_clients(self, graph):
+        primary = prompt()
+        fallback = graph.with_model(primary, "openai/gpt-4o")
+        graph.create_model = Mock(side_effect=lambda cfg: Mock())
+
+        first = graph.get_model(primary)
+        graph.get_model(fallback)
+
+        assert graph.get_model(primary) is first
+        assert graph.create_model.call_count == 2
+
+        graph.get_model(prompt(temperature=0.1))
+        assert len(graph._model_cache) == 2
+
+    def test_chain_key_follows_tool_schemas_not_tool_objects(self):
+        def lookup(city: str) -> str:
+            """Look up a city."""
+            return city
+
+        def make_tool(description="Look up a city."):
+            return StructuredTool.from_function(lookup, description=description)
+
+        key = chain_cache_key(prompt(), [make_tool()])
+
+        assert chain_cache_key(prompt(), [make_tool()]) == key
+        assert chain_cache_key(prompt(), [make_tool("Find a city.")]) != key
+
+    def test_tool_schemas_are_converted_once_per_tool(self):
+        def lookup(city: str) -> str:
+            """Look up a city."""
+            return city
+
+        tool = StructuredTool.from_function(lookup)
+        convert = Mock(wraps=chain_cache_module.convert_to_openai_tool)
+
+        with patch.object(chain_cache_module, "convert_to_openai_tool", convert):
+            for _ in range(3):
+                chain_cache_key(prompt(), [tool])
+
+        assert convert.call_count == 1
+
+
+class TestPromptCacheLayout:
+    @pytest.mark.asyncio
+    async def test_system_prompt_is_stable_and_volatile_values_trail(self, model):
+        graph = make_graph(model, prompt_cache_layout=True)
+        graph._prompt_provider.get_prompt.return_value = prompt()
+
+        await call(graph)
+        await call(graph)
+
+        first, second = model.prompts
+        assert first[0].content == second[0].content
+        assert "{system_time}" not in first[0].content
+        assert isinstance(first[-1], SystemMessage)
+        assert first[-1].content.startswith("system_time: ")
+        assert first[-1].content != second[-1].content
+
+    def test_system_time_is_rounded_to_granularity(self, model):
+        graph = make_graph(model, system_time_granularity=3600)
+
+        assert graph.get_system_time().timestamp() % 3600 == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_input_tokens_are_counted(self, graph, model):
+        graph._prompt_provider.get_prompt.return_value = prompt()
+        model.responses = [
+            AIMessage(
+                content="ok",
+                usage_metadata={
+                    "input_tokens": 1000,
+                    "output_tokens": 5,
+                    "total_tokens": 1005,
+                    "input_token_details": {"cache_read": 768},
+                },
+            )
+        ]
+        hits = INPUT_TOKENS.labels(model="openai/gpt-4o-mini", cache="hit")
+        misses = INPUT_TOKENS.labels(model="openai/gpt-4o-mini", cache="miss")
+        before = hits._value.get(), misses._value.get()
+
+        await call(graph)
+
+        assert hits._value.get() - before[0] == 768
+        assert misses._value.get() - before[1] == 232
+
+
+def test_injected_empty_caches_are_used(model):
+    model_cache, chain_cache = ModelCache(), ChainCache()
+
+    graph = SimpleGraph(
+        checkpointer=Mock(),
+        prompt_provider=Mock(),
+        model_cache=model_cache,
+        chain_cache=chain_cache,
+    )
+
+    assert graph._model_cache is model_cache
+    assert graph._chain_cache is chain_cache
+
+
+@pytest.mark.asyncio
+async def test_history_is_windowed_to_the_model_budget(model):
+    graph = make_graph(
+        model, context_token_budget={"openai/gpt-4o-mini": 1, "openai/gpt-4o": 9999}
+    )
+    graph._prompt_provider.get_prompt.return_value = prompt()
+    state = BaseState(
+        messages=[
+            HumanMessage(id="h1", content="first"),
+            AIMessage(id="a1", content="reply"),
+            HumanMessage(id="h2", content="second"),
+        ]
+    )
+
+    await graph.call_model(state, {})
+
+    assert [m.content for m in model.prompts[0][1:]] == ["second"]
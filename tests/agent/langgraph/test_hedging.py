@@ -0,0 +1,183 @@
+import asyncio
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import agenerate_from_stream
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+from app.agent.langgraph.llm import CircuitBreakers, LLMRateLimiter
+from app.agent.langgraph.llm.hedging import HedgeBudget, hedged_stream
+from app.agent.prompt import Prompt
+
+
+class SlowModel(BaseChatModel):
+    answer: str
+    delay: float
+    cancelled: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow"
+
+    def _generate(self, *args: Any, **kwargs: Any):
+        raise NotImplementedError
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(self.answer)
+            raise
+        for word in self.answer.split():
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await agenerate_from_stream(
+            self._astream(messages, stop, run_manager, **kwargs)
+        )
+
+
+PROMPT = Prompt(
+    content="Be brief.",
+    config={"model": "openai/primary", "fallback_model": "openai/fallback"},
+)
+
+
+@pytest.fixture
+def hedged_graph(make_graph):
+    def make(models, **params):
+        return make_graph(models, PROMPT, hedge_delay_ms=20, **params)
+
+    return make
+
+
+async def words(*chunks, delay=0.0, role_delta=False):
+    if role_delta:
+        yield AIMessageChunk(content="")
+    await asyncio.sleep(delay)
+    for chunk in chunks:
+        yield AIMessageChunk(content=chunk)
+
+
+def test_budget_caps_hedges_to_ratio_of_calls():
+    budget = HedgeBudget(max_ratio=0.25)
+    granted = []
+    for _ in range(8):
+        budget.record_call()
+        granted.append(budget.try_acquire())
+
+    assert granted.count(True) == 2
+
+
+class TestHedgedStream:
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        hedge = Mock()
+
+        head, rest = await hedged_stream(
+            lambda: words("a", "b"), hedge, 0.05, HedgeBudget(1.0)
+        )
+
+        assert [c.content for c in head] == ["a"]
+        assert [c.content async for c in rest] == ["b"]
+        hedge.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge(self):
+        head, rest = await hedged_stream(
+            lambda: words("slow", delay=1),
+            lambda: words("fast", "hedge"),
+            0.01,
+            HedgeBudget(1.0),
+        )
+
+        assert [c.content for c in head] == ["fast"]
+        assert [c.content async for c in rest] == ["hedge"]
+
+    @pytest.mark.asyncio
+    async def test_role_delta_is_not_a_first_token(self):
+        head, rest = await hedged_stream(
+            lambda: words("slow", delay=1, role_delta=True),
+            lambda: words("fast", "hedge"),
+            0.01,
+            HedgeBudget(1.0),
+        )
+
+        assert [c.content for c in head] == ["fast"]
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_waits_for_primary(self):
+        budget = HedgeBudget(0.0)
+        hedge = Mock()
+
+        head, _ = await hedged_stream(
+            lambda: words("slow", delay=0.05), hedge, 0.01, budget
+        )
+
+        assert [c.content for c in head] == ["slow"]
+        hedge.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_graph_streams_only_the_winning_model(hedged_graph):
+    models = {
+        "openai/primary": SlowModel(answer="primary", delay=1),
+        "openai/fallback": SlowModel(answer="fallback answer", delay=0),
+    }
+    graph = hedged_graph(models).build_graph()
+
+    tokens = []
+    final = None
+    async for mode, event in graph.astream(
+        {"messages": [HumanMessage(content="hi")]}, stream_mode=["messages", "values"]
+    ):
+        if mode == "messages":
+            tokens.append(event[0].content)
+        else:
+            final = event
+
+    assert "".join(tokens) == "fallback answer "
+    assert final["messages"][-1].content == "fallback answer "
+    assert models["openai/primary"].cancelled == ["primary"]
+
+
+def slow_primary_models():
+    return {
+        "openai/primary": SlowModel(answer="primary", delay=0.1),
+        "openai/fallback": SlowModel(answer="fallback", delay=0),
+    }
+
+
+class TestHedgeAdmission:
+    @pytest.mark.asyncio
+    async def test_hedge_outcome_feeds_the_hedge_model_breaker(self, hedged_graph, ask):
+        breakers = CircuitBreakers()
+        graph = hedged_graph(slow_primary_models(), circuit_breakers=breakers)
+
+        assert (await ask(graph)).content == "fallback "
+
+        snapshot = breakers.snapshot()
+        assert snapshot["openai/fallback"]["calls"] == 1
+        assert snapshot["openai/primary"]["calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_open_hedge_circuit_skips_the_hedge(self, hedged_graph, ask):
+        breakers = CircuitBreakers(consecutive_failures=1)
+        breakers.get("openai/fallback").record(False, 0.1)
+        graph = hedged_graph(slow_primary_models(), circuit_breakers=breakers)
+
+        assert (await ask(graph)).content == "primary "
+
+    @pytest.mark.asyncio
+    async def test_spent_rate_limit_skips_the_hedge(self, hedged_graph, ask):
+        limiter = LLMRateLimiter({"openai/fallback": {"rpm": 1}})
+        await limiter.acquire("openai/fallback", 10)
+        graph = hedged_graph(slow_primary_models(), rate_limiter=limiter)
+
+        assert (await ask(graph)).content == "primary "
@@ -0,0 +1,114 @@
+import httpx
+import pytest
+from langchain.chat_models import init_chat_model
+
+from app.agent.langgraph.llm import LLMTransport
+from app.agent.langgraph.llm.transport import POOL_SATURATION, ProviderTransport
+from app.bootstrap.config import AppConfig
+
+
+def saturation(provider):
+    return POOL_SATURATION.labels(provider=provider)._value.get()
+
+
+class TestProviderTransport:
+    @pytest.mark.asyncio
+    async def test_request_holds_connection_until_body_is_closed(self):
+        upstream = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b"data: {}\n\n")
+        )
+        transport = ProviderTransport("test", max_connections=4, transport=upstream)
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("POST", "https://llm.test/v1/chat") as response:
+                assert transport.in_flight == 1
+                assert saturation("test") == 0.25
+                assert [chunk async for chunk in response.aiter_bytes()]
+
+        assert transport.in_flight == 0
+        assert saturation("test") == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_request_releases_connection(self):
+        def fail(request):
+            raise httpx.ConnectTimeout("timeout", request=request)
+
+        transport = ProviderTransport(
+            "test", max_connections=4, transport=httpx.MockTransport(fail)
+        )
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectTimeout):
+                await client.get("https://llm.test/v1/models")
+
+        assert transport.in_flight == 0
+
+
+class TestLLMTransport:
+    @pytest.mark.asyncio
+    async def test_models_of_a_provider_share_clients(self):
+        transport = LLMTransport(AppConfig(llm_connect_timeout=2, llm_read_timeout=30))
+
+        first = transport.model_kwargs("openai")
+        second = transport.model_kwargs("openai")
+
+        assert first["http_async_client"] is second["http_async_client"]
+        assert first["http_client"] is second["http_client"]
+        assert first["http_async_client"].timeout.connect == 2
+        assert first["http_async_client"].timeout.read == 30
+        assert transport.model_kwargs("anthropic") == {}
+
+        await transport.aclose()
+
+        assert first["http_async_client"].is_closed
+        assert first["http_client"].is_closed
+
+    @pytest.mark.asyncio
+    async def test_model_requests_use_the_configured_timeout(self):
+        transport = LLMTransport(
+            AppConfig(llm_connect_timeout=2, llm_read_timeout=30, llm_pool_timeout=5)
+        )
+        timeouts = []
+
+        def respond(request):
+            timeouts.append(request.extensions["timeout"])
+            return httpx.Response(
+                200,
+                json={
+                    "id": "chatcmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "gpt-4o-mini",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "ok"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                },
+            )
+
+        transport.async_client("openai")._transport._transport = httpx.MockTransport(
+            respond
+        )
+        model = init_chat_model(
+            "gpt-4o-mini",
+            model_provider="openai",
+            api_key="test",
+            max_retries=0,
+            **transport.model_kwargs("openai"),
+        )
+
+        await model.ainvoke("hi")
+
+        assert timeouts == [{"connect": 2, "read": 30, "write": 30, "pool": 5}]
+        await transport.aclose()
+
+    def test_http2_requires_optional_h2_package(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.agent.langgraph.llm.transport.importlib.util.find_spec",
+            lambda name: None,
+        )
+
+        assert LLMTransport(AppConfig(llm_http2=True)).http2 is False
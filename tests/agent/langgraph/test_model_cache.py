@@ -0,0 +1,76 @@
+from unittest.mock import Mock
+
+from app.agent.langgraph.llm import ModelCache
+from app.agent.langgraph.llm.model_cache import MODEL_CACHE_HITS, MODEL_CACHE_MISSES
+
+
+def cfg(**overrides):
+    return {
+        "model": "openai/gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 1024,
+        **overrides,
+    }
+
+
+def counter(metric, provider="openai"):
+    return metric.labels(provider=provider)._value.get()
+
+
+class TestModelCache:
+    def test_reuses_model_for_same_config(self):
+        cache = ModelCache()
+        factory = Mock(side_effect=lambda: Mock())
+        hits, misses = counter(MODEL_CACHE_HITS), counter(MODEL_CACHE_MISSES)
+
+        first = cache.get_or_create(cfg(), factory)
+        second = cache.get_or_create(cfg(), factory)
+
+        assert first is second
+        factory.assert_called_once()
+        assert counter(MODEL_CACHE_HITS) == hits + 1
+        assert counter(MODEL_CACHE_MISSES) == misses + 1
+
+    def test_any_config_value_is_part_of_the_key(self):
+        cache = ModelCache()
+        factory = Mock(side_effect=lambda: Mock())
+
+        base = cache.get_or_create(cfg(), factory)
+
+        assert cache.get_or_create(cfg(temperature=0.1), factory) is not base
+        assert cache.get_or_create(cfg(top_p=0.9), factory) is not base
+        assert factory.call_count == 3
+
+    def test_evicts_least_recently_used(self):
+        cache = ModelCache(maxsize=2)
+        factory = Mock(side_effect=lambda: Mock())
+
+        a = cache.get_or_create(cfg(temperature=0.1), factory)
+        cache.get_or_create(cfg(temperature=0.2), factory)
+        cache.get_or_create(cfg(temperature=0.1), factory)
+        cache.get_or_create(cfg(temperature=0.3), factory)
+
+        assert len(cache) == 2
+        assert cache.get_or_create(cfg(temperature=0.1), factory) is a
+        assert factory.call_count == 3
+
+    def test_changed_prompt_config_drops_previous_model(self):
+        cache = ModelCache()
+        factory = Mock(side_effect=lambda: Mock())
+
+        cache.get_or_create(cfg(), factory, owner="demo_agent:production")
+        cache.get_or_create(
+            cfg(temperature=0.1), factory, owner="demo_agent:production"
+        )
+
+        assert len(cache) == 1
+
+    def test_model_shared_by_another_owner_is_kept(self):
+        cache = ModelCache()
+        factory = Mock(side_effect=lambda: Mock())
+
+        shared = cache.get_or_create(cfg(), factory, owner="a:production")
+        cache.get_or_create(cfg(), factory, owner="b:production")
+        cache.get_or_create(cfg(temperature=0.1), factory, owner="a:production")
+
+        assert cache.get_or_create(cfg(), factory, owner="b:production") is shared
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import httpx
+import openai
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+from app.agent.langgraph.llm import LLMRateLimiter
+from app.agent.prompt import Prompt
+
+MODEL = "openai/gpt-4o-mini"
+
+
+def budget(limiter, limit, name):
+    return next(b for b in limiter._budgets[limit] if b.budget == name)
+
+
+async def timed(coro):
+    started = time.monotonic()
+    result = await coro
+    return result, time.monotonic() - started
+
+
+class TestLLMRateLimiter:
+    @pytest.mark.asyncio
+    async def test_waits_for_token_budget_to_refill(self):
+        limiter = LLMRateLimiter({"openai": {"tpm": 6000}})
+
+        _, first = await timed(limiter.acquire(MODEL, 6000))
+        _, second = await timed(limiter.acquire(MODEL, 30))
+
+        assert first < 0.05
+        assert 0.2 < second < 0.6
+
+    @pytest.mark.asyncio
+    async def test_settling_returns_unused_tokens(self):
+        limiter = LLMRateLimiter({"openai": {"tpm": 6000}})
+
+        reservation = await limiter.acquire(MODEL, 6000)
+        reservation.settle(100)
+        _, waited = await timed(limiter.acquire(MODEL, 3000))
+
+        assert waited < 0.05
+
+    @pytest.mark.asyncio
+    async def test_provider_and_model_limits_both_apply(self):
+        limiter = LLMRateLimiter(
+            {"openai": {"rpm": 100, "tpm": 10_000}, MODEL: {"rpm": 10}}
+        )
+
+        await limiter.acquire(MODEL, 500)
+        await limiter.acquire("openai/gpt-4o", 500)
+
+        assert budget(limiter, "openai", "requests").level == pytest.approx(98, abs=0.1)
+        assert budget(limiter, MODEL, "requests").level == pytest.approx(9, abs=0.1)
+        assert budget(limiter, "openai", "tokens").level == pytest.approx(9000, abs=5)
+
+    @pytest.mark.asyncio
+    async def test_waiting_calls_are_admitted_in_arrival_order(self):
+        limiter = LLMRateLimiter({"openai": {"tpm": 600}})
+        await limiter.acquire(MODEL, 600)
+        admitted = []
+
+        async def call(name, tokens):
+            await limiter.acquire(MODEL, tokens)
+            admitted.append(name)
+
+        large = asyncio.create_task(call("large", 2))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(call("small", 1))
+        await asyncio.gather(large, small)
+
+        assert admitted == ["large", "small"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_refunds_earlier_limits(self):
+        limiter = LLMRateLimiter(
+            {"openai": {"rpm": 100, "tpm": 600}, MODEL: {"rpm": 1}}
+        )
+        await limiter.acquire(MODEL, 100)
+
+        waiting = asyncio.create_task(limiter.acquire(MODEL, 300))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert budget(limiter, "openai", "tokens").level == pytest.approx(500, abs=2)
+        assert budget(limiter, "openai", "requests").level == pytest.approx(99, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_unlimited_models_do_not_wait(self):
+        limiter = LLMRateLimiter({"anthropic": {"rpm": 1}})
+
+        for _ in range(3):
+            _, waited = await timed(limiter.acquire(MODEL, 10_000))
+            assert waited < 0.05
+
+
+class FailingModel(FakeMessagesListChatModel):
+    error: Any = None
+
+    async def _agenerate(self, *args, **kwargs):
+        raise self.error
+
+
+PROMPT = Prompt(content="Be brief.", config={"model": MODEL, "max_tokens": 256})
+
+
+@pytest.fixture
+def limited_graph(make_graph):
+    def make(limiter, model):
+        return make_graph(model, PROMPT, rate_limiter=limiter)
+
+    return make
+
+
+class TestGraphReservations:
+    @pytest.mark.asyncio
+    async def test_reserves_estimate_and_settles_actual_usage(self, limited_graph, ask):
+        limiter = LLMRateLimiter({MODEL: {"tpm": 6000}})
+        limiter.acquire = Mock(wraps=limiter.acquire)
+        response = AIMessage(
+            content="ok",
+            usage_metadata={"input_tokens": 10, "output_tokens": 2, "total_tokens": 12},
+        )
+
+        await ask(
+            limited_graph(limiter, FakeMessagesListChatModel(responses=[response]))
+        )
+
+        model, estimate = limiter.acquire.call_args.args
+        assert model == MODEL and estimate > 256
+        level = budget(limiter, MODEL, "tokens").level
+        assert level == pytest.approx(6000 - 12, abs=5)
+
+    @pytest.mark.asyncio
+    async def test_response_without_usage_settles_to_counted_tokens(
+        self, limited_graph, ask
+    ):
+        limiter = LLMRateLimiter({MODEL: {"tpm": 6000}})
+        model = FakeMessagesListChatModel(responses=[AIMessage(content="ok")])
+
+        await ask(limited_graph(limiter, model))
+
+        assert 6000 - 256 < budget(limiter, MODEL, "tokens").level < 6000
+
+    @pytest.mark.asyncio
+    async def test_rejected_call_refunds_its_reservation(self, limited_graph, ask):
+        limiter = LLMRateLimiter({MODEL: {"tpm": 6000}})
+        error = openai.RateLimitError(
+            "slow down",
+            response=httpx.Response(429, request=httpx.Request("POST", "https://x")),
+            body=None,
+        )
+
+        with pytest.raises(openai.RateLimitError):
+            await ask(limited_graph(limiter, FailingModel(responses=[], error=error)))
+
+        level = budget(limiter, MODEL, "tokens").level
+        assert level == pytest.approx(6000, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_keeps_its_reservation(self, limited_graph, ask):
+        limiter = LLMRateLimiter({MODEL: {"tpm": 6000}})
+        model = FailingModel(responses=[], error=TimeoutError("provider timed out"))
+
+        with pytest.raises(TimeoutError):
+            await ask(limited_graph(limiter, model))
+
+        assert budget(limiter, MODEL, "tokens").level < 6000 - 256
@@ -0,0 +1,141 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from app.agent.langgraph.llm.response_cache import (
+    DiskResponseCache,
+    InMemoryResponseCache,
+    ReplayChatModel,
+    response_cache_key,
+)
+from app.agent.prompt import Prompt
+
+PROMPT = Prompt(
+    content="Be brief. Now: {system_time}", config={"model": "openai/gpt-4o-mini"}
+)
+
+
+@tool
+def lookup(city: str) -> str:
+    """Look up a city."""
+    return city
+
+
+@pytest.fixture
+def cached_graph(make_graph):
+    def make(model, **params):
+        return make_graph(
+            model,
+            PROMPT,
+            response_cache=InMemoryResponseCache(),
+            response_cache_ttl=60,
+            **params,
+        )
+
+    return make
+
+
+def fake_model():
+    return FakeMessagesListChatModel(
+        responses=[
+            AIMessage(
+                id=f"ai_{i}",
+                content=f"answer {i}",
+                usage_metadata={
+                    "input_tokens": 10,
+                    "output_tokens": 2,
+                    "total_tokens": 12,
+                },
+            )
+            for i in range(3)
+        ]
+    )
+
+
+def test_key_ignores_message_ids_but_not_tools_or_model():
+    def key(message_id, tools=(), model="openai/gpt-4o-mini"):
+        inputs = {"history": [HumanMessage(id=message_id, content="hi")]}
+        return response_cache_key("Be brief.", inputs, tools, {"model": model})
+
+    assert key("a") == key("b")
+    assert key("a") != key("a", tools=[lookup])
+    assert key("a") != key("a", model="openai/gpt-4o")
+
+
+class TestGraphResponseCache:
+    @pytest.mark.asyncio
+    async def test_identical_request_is_replayed(self, cached_graph, ask):
+        graph = cached_graph(fake_model())
+
+        first = await ask(graph)
+        second = await ask(graph)
+
+        assert first.content == second.content == "answer 0"
+        assert second.id != first.id
+        assert second.usage_metadata is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("layout", [False, True])
+    async def test_current_time_does_not_split_the_key(self, cached_graph, ask, layout):
+        graph = cached_graph(fake_model(), prompt_cache_layout=layout)
+
+        first = await ask(graph)
+        second = await ask(graph)
+
+        assert first.content == second.content == "answer 0"
+
+    @pytest.mark.asyncio
+    async def test_bypass_and_disabled_cache_call_the_model(self, cached_graph, ask):
+        graph = cached_graph(fake_model())
+        await ask(graph)
+
+        bypassed = await ask(graph, configurable={"response_cache_bypass": True})
+        assert bypassed.content == "answer 1"
+
+        graph._custom_params["response_cache_ttl"] = 0
+        assert (await ask(graph)).content == "answer 2"
+
+
+@pytest.mark.asyncio
+async def test_replay_streams_tokens_and_tool_calls():
+    cached = AIMessage(
+        content="It is sunny in Kyiv.",
+        tool_calls=[{"name": "lookup", "args": {"city": "Kyiv"}, "id": "call_1"}],
+    )
+
+    chunks = [chunk async for chunk in ReplayChatModel(message=cached).astream([])]
+    merged = sum(chunks[1:], chunks[0])
+
+    assert [c.content for c in chunks] == ["It ", "is ", "sunny ", "in ", "Kyiv."]
+    assert merged.content == cached.content
+    assert merged.tool_calls == cached.tool_calls
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_round_trip_and_expiry(tmp_path):
+    cache = DiskResponseCache(tmp_path)
+    message = AIMessage(content="cached")
+
+    await cache.set("ab12", message, ttl=60)
+    await cache.set("cd34", message, ttl=-1)
+
+    assert (await cache.get("ab12")).content == "cached"
+    assert await cache.get("cd34") is None
+    assert await cache.get("missing") is None
+    assert not (tmp_path / "cd" / "cd34.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_sweep_bounds_entries(tmp_path):
+    cache = DiskResponseCache(tmp_path, max_entries=2, sweep_every=4)
+    message = AIMessage(content="cached")
+
+    await cache.set("aa00", message, ttl=-1)
+    for i, key in enumerate(["bb00", "cc00", "dd00"]):
+        await cache.set(key, message, ttl=60 + i)
+
+    assert sorted(p.name for p in tmp_path.glob("*/*.json")) == [
+        "cc00.json",
+        "dd00.json",
+    ]
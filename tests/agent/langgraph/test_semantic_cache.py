@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agent.langgraph.llm import SemanticResponseCache
+from app.agent.langgraph.llm.semantic_cache import (
+    HashingEmbedder,
+    question_key,
+    same_question,
+)
+from app.agent.prompt import Prompt
+
+QUESTION = "What is the capital of Ukraine?"
+PROMPT = Prompt(content="Now: {system_time}", config={"model": "openai/gpt-4o-mini"})
+
+
+@pytest.fixture
+def cached_graph(make_graph):
+    def make(cache, responses):
+        return make_graph(
+            FakeMessagesListChatModel(responses=responses),
+            PROMPT,
+            semantic_cache=cache,
+            semantic_cache_threshold=0.8,
+        )
+
+    return make
+
+
+def test_embedder_rows_are_normalized_and_similar_texts_score_high():
+    vectors = HashingEmbedder().embed(
+        [QUESTION, "what's the capital of ukraine", "Weather in Lisbon tomorrow"]
+    )
+
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert vectors[0] @ vectors[1] > 0.8
+    assert vectors[0] @ vectors[2] < 0.3
+
+
+def test_search_is_batched_and_scoped_to_namespace():
+    cache = SemanticResponseCache(capacity=4)
+    cache.store("a", QUESTION, AIMessage(content="Kyiv"))
+    cache.store("b", "Weather in Lisbon tomorrow", AIMessage(content="Sunny"))
+
+    rows, scores = cache.search(
+        cache.embedder.embed([QUESTION, "Weather in Lisbon tomorrow"]), "a"
+    )
+
+    assert rows[0] == 0 and scores[0] == pytest.approx(1.0)
+    assert scores[1] < 0.3
+
+
+def test_one_word_swap_is_similar_but_not_served():
+    kyiv, lviv = (
+        f"What will the weather be like in {city} this weekend, should I take "
+        f"an umbrella?"
+        for city in ("Kyiv", "Lviv")
+    )
+    cache = SemanticResponseCache(capacity=4)
+    cache.store("a", kyiv, AIMessage(content="Take one"))
+
+    _, scores = cache.search(cache.embedder.embed([lviv]), "a")
+
+    assert scores[0] > 0.9
+    assert cache.lookup("a", lviv, 0.9) is None
+    assert cache.lookup("a", kyiv.lower().rstrip("?"), 0.9) is not None
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "same"),
+    [
+        (QUESTION, "Ukraine's capital?", True),
+        ("Weather forecast for Kyiv", "weather forecasts in Kyiv", True),
+        ("Weather forecast for Kyiv", "Weather forcast for Kyiv", True),
+        ("Weather forecast for Kyiv", "Weather forecast for Lviv", False),
+        ("Weather forecast for Kyiv", "Weather forecast for Kyiv tomorrow", False),
+        ("Holidays in 2024", "Holidays in 2025", False),
+    ],
+)
+def test_same_question_allows_inflections_but_not_other_words(a, b, same):
+    assert same_question(question_key(a), question_key(b)) is same
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticResponseCache(capacity=2)
+    cache.store("a", "first question", AIMessage(content="1"))
+    cache.store("a", "second question", AIMessage(content="2"))
+    assert cache.lookup("a", "first question", 0.9) is not None
+
+    cache.store("a", "third question", AIMessage(content="3"))
+
+    assert len(cache) == 2
+    assert cache.lookup("a", "second question", 0.9) is None
+    assert cache.lookup("a", "first question", 0.9) is not None
+
+
+def test_entries_persist_across_restarts(tmp_path):
+    cache = SemanticResponseCache(capacity=8, directory=tmp_path)
+    cache.store("a", QUESTION, AIMessage(content="Kyiv"))
+    cache.save()
+
+    reopened = SemanticResponseCache(capacity=8, directory=tmp_path)
+    hit = reopened.lookup("a", "what's the capital of ukraine", 0.8)
+
+    assert hit is not None and hit.message.content == "Kyiv"
+
+
+def test_unsaved_entries_never_pair_with_saved_rows(tmp_path):
+    cache = SemanticResponseCache(capacity=8, directory=tmp_path)
+    cache.store("a", QUESTION, AIMessage(content="Kyiv"))
+    cache.save()
+    cache.store("a", "Weather in Lisbon tomorrow", AIMessage(content="Sunny"))
+    cache.save()
+    cache.store("a", "Population of Lviv", AIMessage(content="720k"))
+
+    reopened = SemanticResponseCache(capacity=8, directory=tmp_path)
+
+    assert len(reopened) == 2
+    assert reopened.lookup("a", "Population of Lviv", 0.8) is None
+    hit = reopened.lookup("a", "Weather in Lisbon tomorrow", 0.8)
+    assert hit is not None and hit.message.content == "Sunny"
+    assert len(list(tmp_path.glob("vectors-*.npy"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_are_saved_every_few_stores(tmp_path):
+    cache = SemanticResponseCache(capacity=8, directory=tmp_path, save_every=2)
+    cache.store("a", QUESTION, AIMessage(content="Kyiv"))
+    assert cache._saving is None
+
+    cache.store("a", "Weather in Lisbon tomorrow", AIMessage(content="Sunny"))
+    await cache._saving
+
+    assert len(SemanticResponseCache(capacity=8, directory=tmp_path)) == 2
+
+
+class TestGraphSemanticCache:
+    @pytest.mark.asyncio
+    async def test_similar_first_turn_question_is_answered_from_cache(
+        self, cached_graph, ask
+    ):
+        graph = cached_graph(
+            SemanticResponseCache(capacity=8),
+            [AIMessage(content="Kyiv"), AIMessage(content="uncached")],
+        )
+
+        await ask(graph, HumanMessage(content=QUESTION))
+        answer = await ask(graph, HumanMessage(content="what's the capital of ukraine"))
+
+        assert answer.content == "Kyiv"
+
+    @pytest.mark.asyncio
+    async def test_later_turns_and_tool_calls_are_not_cached(self, cached_graph, ask):
+        cache = SemanticResponseCache(capacity=8)
+        graph = cached_graph(
+            cache,
+            [
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "lookup", "args": {}, "id": "call_1"}],
+                ),
+                AIMessage(content="Kyiv"),
+            ],
+        )
+
+        await ask(graph, HumanMessage(content=QUESTION))
+        await ask(
+            graph,
+            HumanMessage(content="hi"),
+            AIMessage(content="hello"),
+            HumanMessage(content=QUESTION),
+        )
+
+        assert len(cache) == 0
+
+    def test_time_is_part_of_the_cache_inputs_only_when_rounded(self, cached_graph):
+        graph = cached_graph(SemanticResponseCache(capacity=8), [])
+        inputs = {"system_time": "2026-10-18T10:00:00+00:00", "history": []}
+
+        assert graph.get_cache_inputs(inputs) == {"history": []}
+        graph._custom_params["system_time_granularity"] = 3600
+        assert graph.get_cache_inputs(inputs) == inputs
@@ -0,0 +1,100 @@
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, StateGraph
+
+from app.agent.config import SummarizationConfig
+from app.agent.langgraph.base_state import BaseState, State
+from app.agent.langgraph.context import (
+    ConversationSummarizer,
+    TokenCounter,
+    resolve_history,
+)
+from app.agent.langgraph.context.summarizer import SUMMARY_ID
+
+CONFIG = {"configurable": {"thread_id": "thread-1"}}
+
+
+def reply(state: State):
+    return {"messages": [AIMessage(content=f"reply {len(state.messages)}")]}
+
+
+def compiled_graph(*parallel_nodes):
+    builder = StateGraph(state_schema=State, input_schema=BaseState)
+    for node in ("call_model", *parallel_nodes):
+        builder.add_node(node, reply)
+        builder.add_edge(START, node)
+    return builder.compile(checkpointer=MemorySaver())
+
+
+async def run_turns(graph, count):
+    for i in range(count):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {i}")]}, CONFIG)
+
+
+def summarizer(model, trigger_tokens=30, keep_tokens=20):
+    return ConversationSummarizer(
+        SummarizationConfig(
+            enabled=True, trigger_tokens=trigger_tokens, keep_tokens=keep_tokens
+        ),
+        lambda: model,
+        TokenCounter(count=Mock(return_value=10)),
+    )
+
+
+class TestConversationSummarizer:
+    @pytest.mark.asyncio
+    async def test_short_threads_are_left_alone(self):
+        graph = compiled_graph()
+        await run_turns(graph, 1)
+        model = FakeListChatModel(responses=["summary"])
+
+        assert not await summarizer(model).summarize(graph, CONFIG)
+        assert (await graph.aget_state(CONFIG)).values.get("llm_context") is None
+
+    @pytest.mark.asyncio
+    async def test_older_turns_are_compacted_into_llm_context(self):
+        graph = compiled_graph()
+        await run_turns(graph, 3)
+        model = FakeListChatModel(responses=["they said hi three times"])
+
+        assert await summarizer(model).summarize(graph, CONFIG)
+
+        context = (await graph.aget_state(CONFIG)).values["llm_context"]
+        assert context[0].id == SUMMARY_ID
+        assert context[0].content.endswith("they said hi three times")
+        assert [m.content for m in context[1:]] == ["turn 2", "reply 5"]
+
+    @pytest.mark.asyncio
+    async def test_next_turn_sees_summary_and_new_messages(self):
+        graph = compiled_graph()
+        await run_turns(graph, 3)
+        await summarizer(FakeListChatModel(responses=["s"])).summarize(graph, CONFIG)
+        await run_turns(graph, 1)
+
+        values = (await graph.aget_state(CONFIG)).values
+        history = resolve_history(values["messages"], values["llm_context"])
+
+        assert history[0].id == SUMMARY_ID
+        assert [m.content for m in history[1:]] == [
+            "turn 2",
+            "reply 5",
+            "turn 0",
+            "reply 7",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_summary_is_written_as_the_model_node(self):
+        # Two nodes write in the last step, so the writer cannot be inferred.
+        graph = compiled_graph("audit")
+        await run_turns(graph, 2)
+        model = FakeListChatModel(responses=["summary"])
+
+        assert await summarizer(model).summarize(graph, CONFIG)
+
+        snapshot = await graph.aget_state(CONFIG)
+        assert snapshot.values["llm_context"][0].id == SUMMARY_ID
+        assert snapshot.next == ()
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import tool
+
+from app.agent.langgraph.tools import ToolExecutor, ToolResultCache
+from app.agent.langgraph.tools.cache import get_cache_ttl, tool_cache_key
+
+
+def call(call_id, **args):
+    return {"id": call_id, "name": "lookup", "args": args, "type": "tool_call"}
+
+
+def counting_tool(calls, delay=0.0, metadata=None):
+    @tool
+    async def lookup(city: str) -> str:
+        """Look up a city."""
+        calls.append(city)
+        await asyncio.sleep(delay)
+        return f"{city}:{len(calls)}"
+
+    lookup.metadata = metadata
+    return lookup
+
+
+class TestToolResultCache:
+    def test_key_ignores_argument_order(self):
+        assert tool_cache_key("t", {"a": 1, "b": 2}) == tool_cache_key(
+            "t", {"b": 2, "a": 1}
+        )
+
+    @pytest.mark.asyncio
+    async def test_results_expire_after_ttl(self):
+        cache = ToolResultCache()
+        calls = []
+
+        async def run():
+            calls.append(1)
+            return len(calls)
+
+        assert await cache.get_or_run("t", {}, 0.05, run) == 1
+        assert await cache.get_or_run("t", {}, 0.05, run) == 1
+        await asyncio.sleep(0.06)
+        assert await cache.get_or_run("t", {}, 0.05, run) == 2
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        cache = ToolResultCache(maxsize=2)
+
+        async def run():
+            return "x"
+
+        for name in ("a", "b", "a", "c"):
+            await cache.get_or_run(name, {}, 60, run)
+
+        assert len(cache) == 2
+        assert tool_cache_key("b", {}) not in cache._results
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_the_running_call_is_cancelled(self):
+        cache = ToolResultCache()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(1)
+
+        async def fast():
+            return "fast"
+
+        leader = asyncio.create_task(cache.get_or_run("t", {}, 60, slow))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_run("t", {}, 60, fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "fast"
+
+
+class TestToolExecutorMemoization:
+    def test_tools_can_opt_out_of_the_default_ttl(self):
+        calls = []
+        assert get_cache_ttl(counting_tool(calls), default=60) == 60
+        assert (
+            get_cache_ttl(counting_tool(calls, metadata={"cache_ttl": 0}), default=60)
+            == 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_run_once(self):
+        calls = []
+        executor = ToolExecutor(
+            [counting_tool(calls, delay=0.02)], cache=ToolResultCache(), cache_ttl=60
+        )
+
+        first, second = await asyncio.gather(
+            executor.run_call(call("a", city="Kyiv"), {}),
+            executor.run_call(call("b", city="Kyiv"), {}),
+        )
+        third = await executor.run_call(call("c", city="Kyiv"), {})
+
+        assert calls == ["Kyiv"]
+        assert [m.tool_call_id for m in (first, second, third)] == ["a", "b", "c"]
+        assert first.content == second.content == third.content == "Kyiv:1"
+        assert first is not third
+
+    @pytest.mark.asyncio
+    async def test_uncached_by_default_and_errors_are_not_cached(self):
+        calls = []
+        executor = ToolExecutor([counting_tool(calls)], cache=ToolResultCache())
+
+        await executor.run_call(call("a", city="Kyiv"), {})
+        await executor.run_call(call("b", city="Kyiv"), {})
+        assert len(calls) == 2
+
+        @tool
+        def lookup(city: str) -> str:
+            """Always fails."""
+            calls.append(city)
+            raise ValueError("boom")
+
+        lookup.metadata = {"cache_ttl": 60}
+
+        failing = ToolExecutor([lookup], cache=ToolResultCache())
+        for call_id in ("c", "d"):
+            message = await failing.run_call(call(call_id, city="Kyiv"), {})
+            assert isinstance(message, ToolMessage) and message.status == "error"
+        assert len(calls) == 4
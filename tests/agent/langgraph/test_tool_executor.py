@@ -0,0 +1,157 @@
+import asyncio
+from typing import Annotated
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.graph import START, StateGraph
+from langgraph.prebuilt import InjectedState
+from langgraph.types import Command
+
+from app.agent.langgraph.base_state import BaseState, State
+from app.agent.langgraph.tools import ToolExecutor
+from app.agent.langgraph.tools.executor import TOOL_LATENCY, TOOL_QUEUE_WAIT
+
+running = {"now": 0, "peak": 0}
+
+
+@tool
+async def slow_lookup(city: str) -> str:
+    """Look up a city slowly."""
+    running["now"] += 1
+    running["peak"] = max(running["peak"], running["now"])
+    await asyncio.sleep(0.02)
+    running["now"] -= 1
+    return f"{city}: sunny"
+
+
+@tool
+async def hanging(city: str) -> str:
+    """Never returns."""
+    await asyncio.Event().wait()
+    return city
+
+
+@tool
+def broken(city: str) -> str:
+    """Always fails."""
+    raise ValueError("no data")
+
+
+@tool
+def count_messages(
+    city: str,
+    state: Annotated[BaseState, InjectedState],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command:
+    """Count the messages in the conversation."""
+    reply = ToolMessage(f"{city}: {len(state.messages)}", tool_call_id=tool_call_id)
+    return Command(update={"messages": [reply]})
+
+
+def calls(*names):
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"id": f"call_{i}", "name": name, "args": {"city": f"c{i}"}}
+            for i, name in enumerate(names)
+        ],
+    )
+
+
+def state(*names):
+    return BaseState(messages=[HumanMessage(content="hi"), calls(*names)])
+
+
+@pytest.fixture(autouse=True)
+def reset_running():
+    running.update(now=0, peak=0)
+
+
+class TestToolExecutor:
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently_within_tool_limit(self):
+        executor = ToolExecutor([slow_lookup], concurrency={"slow_lookup": 2})
+
+        result = await executor(state(*["slow_lookup"] * 5), {})
+
+        assert [m.content for m in result["messages"]] == [
+            f"c{i}: sunny" for i in range(5)
+        ]
+        assert running["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hanging_tool_times_out_without_blocking_others(self):
+        executor = ToolExecutor([slow_lookup, hanging], timeouts={"hanging": 0.05})
+
+        result = await asyncio.wait_for(
+            executor(state("hanging", "slow_lookup"), {}), timeout=1
+        )
+
+        timed_out, ok = result["messages"]
+        assert timed_out.status == "error"
+        assert "timed out" in timed_out.content
+        assert timed_out.tool_call_id == "call_0"
+        assert ok.content == "c1: sunny"
+
+    @pytest.mark.asyncio
+    async def test_timeout_starts_once_the_call_has_a_slot(self):
+        executor = ToolExecutor(
+            [slow_lookup], timeout=0.05, concurrency={"slow_lookup": 1}
+        )
+
+        result = await executor(state(*["slow_lookup"] * 5), {})
+
+        assert [m.status for m in result["messages"]] == ["success"] * 5
+
+    @pytest.mark.asyncio
+    async def test_latency_excludes_the_wait_for_a_slot(self):
+        executor = ToolExecutor([slow_lookup], concurrency={"slow_lookup": 1})
+        latency = TOOL_LATENCY.labels(tool="slow_lookup", status="success")
+        queue_wait = TOOL_QUEUE_WAIT.labels(tool="slow_lookup")
+        latency_before, wait_before = latency._sum.get(), queue_wait._sum.get()
+
+        await executor(state(*["slow_lookup"] * 5), {})
+
+        # Five 20ms calls in a row: each takes ~20ms, the later ones queue.
+        assert latency._sum.get() - latency_before < 0.2
+        assert queue_wait._sum.get() - wait_before > 0.15
+
+    @pytest.mark.asyncio
+    async def test_failures_and_unknown_tools_become_error_messages(self):
+        executor = ToolExecutor([broken])
+        errors = TOOL_LATENCY.labels(tool="broken", status="error")
+        before = errors._sum.get()
+
+        result = await executor(state("broken", "missing"), {})
+
+        assert [m.status for m in result["messages"]] == ["error", "error"]
+        assert "no data" in result["messages"][0].content
+        assert "not available" in result["messages"][1].content
+        assert errors._sum.get() > before
+
+    @pytest.mark.asyncio
+    async def test_runs_as_a_graph_node(self):
+        builder = StateGraph(state_schema=State, input_schema=BaseState)
+        builder.add_node("tools", ToolExecutor([slow_lookup]))
+        builder.add_edge(START, "tools")
+        graph = builder.compile()
+
+        result = await graph.ainvoke({"messages": [calls("slow_lookup")]})
+
+        assert result["messages"][-1].content == "c0: sunny"
+
+    @pytest.mark.asyncio
+    async def test_injects_state_and_call_id_and_applies_commands(self):
+        builder = StateGraph(state_schema=State, input_schema=BaseState)
+        builder.add_node("tools", ToolExecutor([count_messages, slow_lookup]))
+        builder.add_edge(START, "tools")
+        graph = builder.compile()
+
+        result = await graph.ainvoke(
+            {"messages": [calls("count_messages", "slow_lookup")]}
+        )
+
+        counted, looked_up = result["messages"][-2:]
+        assert (counted.content, counted.tool_call_id) == ("c0: 1", "call_0")
+        assert looked_up.content == "c1: sunny"
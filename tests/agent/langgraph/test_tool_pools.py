@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from langchain_core.tools import BaseTool, tool
+
+from app.agent.langgraph.tools import ExecutionPolicy, ToolExecutor, ToolPools
+from app.agent.langgraph.tools.pools import get_execution_policy
+
+
+class PidTool(BaseTool):
+    name: str = "pid"
+    description: str = "Report the worker process id"
+    metadata: dict = {"execution_policy": "process"}
+
+    def _run(self, **kwargs) -> str:
+        return str(os.getpid())
+
+
+@tool
+def blocking(seconds: float) -> str:
+    """Block the calling thread."""
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+@tool
+async def non_blocking(seconds: float) -> str:
+    """Sleep on the event loop."""
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+def call(name, **args):
+    return {"id": f"call_{name}", "name": name, "args": args, "type": "tool_call"}
+
+
+class TestExecutionPolicy:
+    def test_defaults_follow_the_implementation(self):
+        assert get_execution_policy(blocking) is ExecutionPolicy.THREAD
+        assert get_execution_policy(non_blocking) is ExecutionPolicy.ASYNC
+
+    def test_declared_policy_wins(self):
+        assert get_execution_policy(PidTool()) is ExecutionPolicy.PROCESS
+
+
+class TestToolPools:
+    @pytest.mark.asyncio
+    async def test_thread_tools_do_not_block_the_event_loop(self):
+        pools = ToolPools(thread_workers=2)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        result = await pools.run(
+            blocking, call("blocking", seconds=0.1), {}, ExecutionPolicy.THREAD
+        )
+        beat.cancel()
+        pools.shutdown()
+
+        assert result.content.startswith("tool")
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_process_tools_run_in_a_worker_process(self):
+        pools = ToolPools(process_workers=1)
+
+        pid = await pools.run(PidTool(), call("pid"), {}, ExecutionPolicy.PROCESS)
+        pools.shutdown()
+
+        assert pid != str(os.getpid())
+
+    @pytest.mark.asyncio
+    async def test_cancelled_calls_leave_the_queue(self):
+        pools = ToolPools(thread_workers=1)
+        running = pools.run(
+            blocking, call("blocking", seconds=0.05), {}, ExecutionPolicy.THREAD
+        )
+        first = asyncio.ensure_future(running)
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(
+            pools.run(blocking, call("blocking", seconds=1), {}, ExecutionPolicy.THREAD)
+        )
+        await asyncio.sleep(0)
+        assert pools.threads.in_flight == 2
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        await first
+        await asyncio.sleep(0)
+
+        assert pools.threads.in_flight == 0
+        pools.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_in_flight_count_is_only_updated_on_the_loop(self, monkeypatch):
+        pools = ToolPools(thread_workers=2)
+        track = pools.threads._track
+        threads = []
+
+        def record(delta):
+            threads.append(threading.current_thread())
+            track(delta)
+
+        monkeypatch.setattr(pools.threads, "_track", record)
+        await asyncio.gather(
+            *(
+                pools.run(
+                    blocking, call("blocking", seconds=0.01), {}, ExecutionPolicy.THREAD
+                )
+                for _ in range(4)
+            )
+        )
+        await asyncio.sleep(0)
+
+        assert threads == [threading.main_thread()] * 8
+        assert pools.threads.in_flight == 0
+        pools.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_executor_times_out_blocking_tools(self):
+        executor = ToolExecutor([blocking], timeout=0.05, pools=ToolPools())
+        message = await executor.run_call(call("blocking", seconds=0.3), {})
+
+        assert message.status == "error"
+        assert "timed out" in message.content
@@ -0,0 +1,444 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+import pytest
+
+from app.agent.interfaces import AgentInstance
+from app.agent.services.events import ErrorEvent, TokenEvent
+from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.run_manager import (
+    RunManager,
+    RunNotFoundError,
+    RunStatus,
+    parse_event_id,
+)
+from app.bootstrap.config import AppConfig
+from app.models import Thread, User
+from app.models.thread import ThreadStatus
+
+
+class FakeAgent(AgentInstance):
+    def __init__(self, events, release=None):
+        super().__init__("fake_agent", AppConfig())
+        self.events = events
+        self.release = release
+
+    async def stream_events(self, message, thread, user, run_id=None, options=None):
+        for event in self.events:
+            if self.release is not None:
+                await self.release.wait()
+            yield event
+
+    async def load_history(self, thread, user):
+        return
+        yield
+
+
+class GatedAgent(FakeAgent):
+    """Yields the first event at once and the rest after *release* is set."""
+
+    async def stream_events(self, message, thread, user, run_id=None, options=None):
+        first, *rest = self.events
+        yield first
+        await self.release.wait()
+        for event in rest:
+            yield event
+
+
+def message(content):
+    return BaseEvent.from_payload(event="ai_message", payload={"content": content})
+
+
+def token(content):
+    return TokenEvent.from_data({"content": content})
+
+
+def _parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\r\n"))
+    return fields
+
+
+def _contents(frames):
+    return [json.loads(_parse(frame)["data"])["content"] for frame in frames]
+
+
+async def _disconnect(subscriber):
+    pending = asyncio.create_task(anext(subscriber))
+    await asyncio.sleep(0)
+    pending.cancel()
+    await asyncio.gather(pending, return_exceptions=True)
+    await subscriber.aclose()
+
+
+def _manager(**overrides):
+    settings = {"run_queue_size": 2, "run_buffer_size": 3} | overrides
+    thread_service = Mock(update_thread=AsyncMock())
+    return RunManager(AppConfig(**settings), thread_service)
+
+
+@pytest.fixture
+def run_manager():
+    return _manager()
+
+
+@pytest.fixture
+def thread():
+    return Thread(
+        id=uuid4(),
+        user_id="test_user_id",
+        agent_id="fake_agent",
+        status=ThreadStatus.idle,
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+
+
+@pytest.fixture
+def user():
+    return User(id="test_user_id")
+
+
+class TestRunManager:
+    @pytest.mark.asyncio
+    async def test_fans_out_to_every_subscriber(self, run_manager, thread, user):
+        release = asyncio.Event()
+        events = [message("a"), message("b")]
+        run = run_manager.start(FakeAgent(events, release), "hi", thread, user)
+
+        first = run_manager.subscribe(run.id)
+        second = run_manager.subscribe(run.id)
+        release.set()
+
+        assert _contents([f async for f in first]) == ["a", "b"]
+        assert _contents([f async for f in second]) == ["a", "b"]
+        assert run.status is RunStatus.completed
+
+    @pytest.mark.asyncio
+    async def test_run_survives_subscriber_disconnect(self, run_manager, thread, user):
+        release = asyncio.Event()
+        events = [message("a"), message("b")]
+        run = run_manager.start(FakeAgent(events, release), "hi", thread, user)
+
+        subscriber = run_manager.subscribe(run.id)
+        release.set()
+        assert _contents([await anext(subscriber)]) == ["a"]
+        await subscriber.aclose()
+
+        await run.task
+        assert run.status is RunStatus.completed
+        assert not run.subscribers
+
+    @pytest.mark.asyncio
+    async def test_finished_runs_are_not_listed(self, run_manager, thread, user):
+        run = run_manager.start(FakeAgent([message("a")]), "hi", thread, user)
+        assert run_manager.list_runs(user.id) == [run]
+
+        await run.task
+
+        assert run_manager.list_runs(user.id) == []
+        assert run_manager.get(run.id) is run
+
+    @pytest.mark.asyncio
+    async def test_finished_runs_expire_after_ttl(self, thread, user):
+        run_manager = _manager(run_buffer_ttl=0)
+        run = run_manager.start(FakeAgent([message("a")]), "hi", thread, user)
+
+        await run.task
+
+        with pytest.raises(RunNotFoundError):
+            run_manager.get(run.id)
+
+    @pytest.mark.asyncio
+    async def test_frames_carry_monotonic_event_ids(self, run_manager, thread, user):
+        release = asyncio.Event()
+        events = [message("a"), message("b")]
+        run = run_manager.start(FakeAgent(events, release), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+        release.set()
+
+        frames = [f async for f in subscriber]
+
+        ids = [parse_event_id(_parse(frame)["id"]) for frame in frames]
+        assert ids == [(run.id, 1), (run.id, 2)]
+
+    @pytest.mark.asyncio
+    async def test_replays_missed_frames_after_last_event_id(
+        self, run_manager, thread, user
+    ):
+        events = [message(c) for c in "abcd"]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        await run.task
+
+        replayed = [f async for f in run_manager.subscribe(run.id, 2)]
+        assert _contents(replayed) == ["c", "d"]
+        replayed = [f async for f in run_manager.subscribe(run.id, 0)]
+        assert _contents(replayed) == ["b", "c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_replay_continues_with_live_frames(self, run_manager, thread, user):
+        release = asyncio.Event()
+        events = [message("a"), message("b")]
+        run = run_manager.start(FakeAgent(events, release), "hi", thread, user)
+        first = run_manager.subscribe(run.id)
+        release.set()
+        await anext(first)
+
+        resumed = run_manager.subscribe(run.id, 0)
+
+        assert _contents([f async for f in resumed]) == ["a", "b"]
+
+
+class FailingAgent(FakeAgent):
+    async def stream_events(self, message, thread, user, run_id=None, options=None):
+        async for event in super().stream_events(message, thread, user, run_id):
+            yield event
+        raise RuntimeError("model unavailable")
+
+
+class TestRunFailure:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "agent",
+        [
+            FailingAgent([message("a")]),
+            FakeAgent([message("a"), ErrorEvent.from_data({"content": "boom"})]),
+        ],
+        ids=["raised", "error_event"],
+    )
+    async def test_failed_run_ends_with_error_status(
+        self, run_manager, thread, user, agent
+    ):
+        run = run_manager.start(agent, "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        frames = [f async for f in subscriber]
+        await run.task
+
+        end = _parse(frames[-1])
+        assert end["event"] == "stream_end"
+        assert json.loads(end["data"])["status"] == "error"
+        assert run.status is RunStatus.error
+        assert thread.status is ThreadStatus.error
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_not_summarized(self, run_manager, thread, user):
+        agent = SummarizingAgent([message("a")], delay=0)
+        agent.events.append(ErrorEvent.from_data({"content": "boom"}))
+
+        await run_manager.start(agent, "hi", thread, user).task
+        await asyncio.sleep(0.01)
+
+        assert agent.summarized == []
+
+
+class TestRunCancellation:
+    @pytest.mark.asyncio
+    async def test_cancel_interrupts_run_and_thread(self, run_manager, thread, user):
+        never = asyncio.Event()
+        run = run_manager.start(FakeAgent([message("a")], never), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+        await asyncio.sleep(0)
+
+        await run_manager.cancel(run.id)
+
+        assert run.status is RunStatus.interrupted
+        assert thread.status is ThreadStatus.interrupted
+        run_manager._thread_service.update_thread.assert_awaited_once_with(thread)
+        frames = [f async for f in subscriber]
+        assert _parse(frames[-1])["event"] == "stream_end"
+        assert json.loads(_parse(frames[-1])["data"])["status"] == "interrupted"
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_attached_run_after_grace(self, thread, user):
+        run_manager = _manager(run_disconnect_grace=0)
+        never = asyncio.Event()
+        run = run_manager.start(
+            FakeAgent([message("a")], never),
+            "hi",
+            thread,
+            user,
+            cancel_on_disconnect=True,
+        )
+        await _disconnect(run_manager.subscribe(run.id))
+
+        await asyncio.wait({run.task}, timeout=1)
+
+        assert run.status is RunStatus.interrupted
+
+    @pytest.mark.asyncio
+    async def test_reattaching_within_grace_keeps_run_alive(self, thread, user):
+        run_manager = _manager(run_disconnect_grace=0.01)
+        release = asyncio.Event()
+        run = run_manager.start(
+            FakeAgent([message("a")], release),
+            "hi",
+            thread,
+            user,
+            cancel_on_disconnect=True,
+        )
+        await _disconnect(run_manager.subscribe(run.id))
+        resumed = run_manager.subscribe(run.id)
+        await asyncio.sleep(0.02)
+        release.set()
+
+        assert _contents([f async for f in resumed]) == ["a"]
+        assert run.status is RunStatus.completed
+
+    @pytest.mark.asyncio
+    async def test_background_run_ignores_disconnect(self, thread, user):
+        run_manager = _manager(run_disconnect_grace=0)
+        release = asyncio.Event()
+        run = run_manager.start(FakeAgent([message("a")], release), "hi", thread, user)
+        await _disconnect(run_manager.subscribe(run.id))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        await run.task
+
+        assert run.status is RunStatus.completed
+
+
+class SummarizingAgent(FakeAgent):
+    def __init__(self, events, delay, duration=0):
+        super().__init__(events)
+        self.delay = delay
+        self.duration = duration
+        self.summarized = []
+
+    @property
+    def summarize_after(self):
+        return self.delay
+
+    async def summarize_history(self, thread, user):
+        await asyncio.sleep(self.duration)
+        self.summarized.append(thread.id)
+
+
+class TestThreadSummarization:
+    @pytest.mark.asyncio
+    async def test_thread_is_summarized_after_debounce(self, run_manager, thread, user):
+        agent = SummarizingAgent([message("a")], delay=0.01)
+
+        await run_manager.start(agent, "hi", thread, user).task
+        assert agent.summarized == []
+        await asyncio.sleep(0.03)
+
+        assert agent.summarized == [thread.id]
+
+    @pytest.mark.asyncio
+    async def test_active_thread_is_summarized_once(self, run_manager, thread, user):
+        agent = SummarizingAgent([message("a")], delay=0.05)
+
+        for _ in range(3):
+            await run_manager.start(agent, "hi", thread, user).task
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+        assert agent.summarized == [thread.id]
+
+    @pytest.mark.asyncio
+    async def test_new_run_cancels_a_running_summary(self, run_manager, thread, user):
+        agent = SummarizingAgent([message("a")], delay=0, duration=0.05)
+
+        await run_manager.start(agent, "hi", thread, user).task
+        await asyncio.sleep(0.01)
+        agent.delay = None
+        await run_manager.start(agent, "hi", thread, user).task
+        await asyncio.sleep(0.1)
+
+        assert agent.summarized == []
+
+    @pytest.mark.asyncio
+    async def test_interrupted_run_is_not_summarized(self, run_manager, thread, user):
+        agent = SummarizingAgent([message("a")], delay=0)
+        agent.release = asyncio.Event()
+        run = run_manager.start(agent, "hi", thread, user)
+        await asyncio.sleep(0)
+
+        await run_manager.cancel(run.id)
+        await asyncio.sleep(0.01)
+
+        assert agent.summarized == []
+
+
+class TestSlowConsumerPolicy:
+    @pytest.mark.asyncio
+    async def test_disconnect_drops_the_subscriber(self, thread, user):
+        run_manager = _manager(run_slow_consumer_policy="disconnect")
+        events = [message(c) for c in "abc"]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        await run.task
+
+        assert _contents([f async for f in subscriber]) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_drop_tokens_keeps_structural_events(self, thread, user):
+        run_manager = _manager(run_slow_consumer_policy="drop_tokens")
+        events = [token("a"), token("b"), token("c"), message("done")]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        await run.task
+
+        assert _contents([f async for f in subscriber]) == ["a", "b", "done"]
+
+    @pytest.mark.asyncio
+    async def test_coalesce_tokens_merges_held_tokens(self, thread, user):
+        run_manager = _manager(run_slow_consumer_policy="coalesce_tokens")
+        events = [token("a"), token("b"), token("c"), token("d"), message("done")]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        await run.task
+
+        frames = [f async for f in subscriber]
+        assert _contents(frames) == ["a", "b", "cd", "done"]
+        assert parse_event_id(_parse(frames[2])["id"]) == (run.id, 4)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy", ["drop_tokens", "coalesce_tokens"])
+    async def test_structural_backlog_is_bounded(self, thread, user, policy):
+        run_manager = _manager(run_slow_consumer_policy=policy)
+        events = [message(c) for c in "abcdef"]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        await run.task
+
+        assert _contents([f async for f in subscriber]) == ["a", "b", "c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_block_holds_the_run_until_the_client_reads(self, thread, user):
+        run_manager = _manager(run_slow_consumer_policy="block")
+        events = [message(c) for c in "abc"]
+        run = run_manager.start(FakeAgent(events), "hi", thread, user)
+        subscriber = run_manager.subscribe(run.id)
+
+        await asyncio.sleep(0.01)
+        assert not run.task.done()
+
+        assert _contents([f async for f in subscriber]) == ["a", "b", "c"]
+        assert run.status is RunStatus.completed
+
+    @pytest.mark.asyncio
+    async def test_block_releases_the_run_when_the_client_leaves(self, thread, user):
+        run_manager = _manager(run_slow_consumer_policy="block")
+        release = asyncio.Event()
+        agent = GatedAgent([message(c) for c in "abcde"], release)
+        run = run_manager.start(agent, "hi", thread, user)
+        await asyncio.sleep(0.01)
+
+        subscriber = run_manager.subscribe(run.id, last_seq=0)
+        release.set()
+        assert _contents([await anext(subscriber)]) == ["a"]
+        await asyncio.sleep(0.01)
+        assert not run.task.done()
+        await subscriber.aclose()
+
+        await asyncio.wait_for(run.task, timeout=1)
+        assert run.status is RunStatus.completed
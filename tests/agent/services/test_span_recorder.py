@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.agent.services.span_recorder import SpanOutputRecorder
+
+
+@pytest.mark.asyncio
+async def test_updates_are_throttled_until_close():
+    span = Mock()
+    recorder = SpanOutputRecorder(span, interval=60)
+
+    recorder.record(["a"])
+    recorder.record(["b"])
+    await asyncio.sleep(0)
+
+    span.update.assert_not_called()
+
+    await recorder.close()
+
+    span.update.assert_called_once_with(output=["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_updates_run_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    calls = []
+    span = Mock()
+    span.update.side_effect = lambda **kwargs: calls.append(threading.get_ident())
+    recorder = SpanOutputRecorder(span, interval=0)
+
+    recorder.record(["a"])
+    await recorder.close()
+
+    assert calls
+    assert loop_thread not in calls
+
+
+@pytest.mark.asyncio
+async def test_close_without_new_output_does_not_push_again():
+    span = Mock()
+    recorder = SpanOutputRecorder(span, interval=0)
+
+    recorder.record(["a"])
+    await recorder.close()
+    await recorder.close()
+
+    span.update.assert_called_once_with(output=["a"])
+
+
+@pytest.mark.asyncio
+async def test_failed_update_is_swallowed():
+    span = Mock()
+    span.update.side_effect = RuntimeError("boom")
+    recorder = SpanOutputRecorder(span, interval=60)
+
+    recorder.record(["a"])
+    await recorder.close()
+
+    span.update.assert_called_once()
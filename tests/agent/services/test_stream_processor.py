@@ -1,3 +1,4 @@
+import asyncio
 import json
 import tracemalloc
 from unittest.mock import Mock, patch
@@ -7,14 +8,22 @@ import pytest
 from langchain_core.messages import AIMessage, AIMessageChunk
 from langfuse._client.span import LangfuseSpan
 
-from app.agent.models import HumanMessage
+from app.agent.langgraph.utils import to_chat_message
+from app.agent.models import CustomUIMessage, HumanMessage
 from app.agent.services.events import EndEvent, TokenEvent
 from app.agent.services.events.base_event import BaseEvent
+from app.agent.services.stream_options import StreamOptions, StreamProfile
 from app.agent.services.stream_processor import StreamProcessor
 
 tracemalloc.start()
 
 
+def ui_message(component_id: str, progress: str) -> CustomUIMessage:
+    return CustomUIMessage(
+        component="progress", id=component_id, params={"progress": progress}
+    )
+
+
 @pytest.fixture
 def stream_processor():
     return StreamProcessor()
@@ -83,14 +92,14 @@ class TestStreamProcessor:
 
         messages = [("content", "test content"), ("id", "test_id"), Mock()]
 
-        with patch.object(BaseEvent, "from_payload") as mock_from_payload:
-            mock_from_payload.return_value = Mock()
+        with patch.object(BaseEvent, "from_model") as mock_from_model:
+            mock_from_model.return_value = Mock()
             result = stream_processor._messages_to_events(
                 messages, mock_run_id, mock_span
             )
 
             assert len(result) >= 1
-            mock_from_payload.assert_called()
+            mock_from_model.assert_called()
 
     @patch("app.agent.services.stream_processor.to_chat_message")
     def test_messages_to_events_with_human_message_skip(
@@ -208,3 +217,188 @@ class TestStreamProcessor:
         data = json.loads(end_event.data)
         assert data["run_id"] == str(mock_run_id)
         assert data["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_process_stream_coalesces_tokens_until_max_bytes(self, mock_run_id):
+        processor = StreamProcessor(token_flush_max_bytes=4)
+
+        async def mock_stream():
+            for text in ["ab", "cd", "ef"]:
+                yield ("messages", (AIMessageChunk(content=text), {}))
+
+        events = [e async for e in processor.process_stream(mock_stream(), mock_run_id)]
+
+        assert [json.loads(e.data)["content"] for e in events[:-1]] == ["abcd", "ef"]
+        assert all(isinstance(e, TokenEvent) for e in events[:-1])
+        assert isinstance(events[-1], EndEvent)
+
+    @pytest.mark.asyncio
+    async def test_process_stream_flushes_tokens_before_structural_event(
+        self, mock_run_id
+    ):
+        processor = StreamProcessor(token_flush_interval=10)
+        structural = Mock()
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="Hel"), {}))
+            yield ("messages", (AIMessageChunk(content="lo"), {}))
+            yield ("updates", {"node1": {"messages": ["msg"]}})
+
+        with patch.object(processor, "_messages_to_events", return_value=[structural]):
+            events = [
+                e async for e in processor.process_stream(mock_stream(), mock_run_id)
+            ]
+
+        assert len(events) == 3
+        assert json.loads(events[0].data)["content"] == "Hello"
+        assert events[1] is structural
+        assert isinstance(events[2], EndEvent)
+
+    @pytest.mark.asyncio
+    async def test_process_stream_flushes_tokens_after_max_delay(self, mock_run_id):
+        processor = StreamProcessor(token_flush_interval=0.01)
+        received: list[BaseEvent] = []
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="first"), {}))
+            await asyncio.sleep(0.05)
+            assert len(received) == 1
+            yield ("messages", (AIMessageChunk(content="second"), {}))
+
+        async for event in processor.process_stream(mock_stream(), mock_run_id):
+            received.append(event)
+
+        assert [json.loads(e.data)["content"] for e in received[:-1]] == [
+            "first",
+            "second",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_process_stream_keeps_latest_ui_event_per_component(
+        self, mock_run_id
+    ):
+        processor = StreamProcessor(ui_flush_interval=10)
+
+        async def mock_stream():
+            for progress in ["10", "50", "90"]:
+                yield ("custom", ui_message("doc-upload", progress))
+            yield ("custom", ui_message("weather", "1"))
+            yield ("custom", ui_message("doc-upload", "100"))
+
+        events = [e async for e in processor.process_stream(mock_stream(), mock_run_id)]
+
+        assert [e.event for e in events] == ["ui", "ui", "stream_end"]
+        assert [
+            (json.loads(e.data)["id"], json.loads(e.data)["params"]["progress"])
+            for e in events[:-1]
+        ] == [("doc-upload", "100"), ("weather", "1")]
+
+    @pytest.mark.asyncio
+    async def test_process_stream_flushes_ui_events_after_interval(self, mock_run_id):
+        processor = StreamProcessor(ui_flush_interval=0.01)
+        received: list[BaseEvent] = []
+
+        async def mock_stream():
+            yield ("custom", ui_message("doc-upload", "10"))
+            yield ("custom", ui_message("doc-upload", "20"))
+            await asyncio.sleep(0.05)
+            assert len(received) == 1
+            yield ("custom", ui_message("doc-upload", "30"))
+
+        async for event in processor.process_stream(mock_stream(), mock_run_id):
+            received.append(event)
+
+        assert [json.loads(e.data)["params"]["progress"] for e in received[:-1]] == [
+            "20",
+            "30",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_process_stream_flushes_tokens_before_buffering_ui_event(
+        self, mock_run_id
+    ):
+        processor = StreamProcessor(token_flush_interval=10, ui_flush_interval=0.01)
+        received: list[BaseEvent] = []
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="Hel"), {}))
+            yield ("custom", ui_message("doc-upload", "10"))
+            await asyncio.sleep(0.05)
+            yield ("messages", (AIMessageChunk(content="lo"), {}))
+
+        async for event in processor.process_stream(mock_stream(), mock_run_id):
+            received.append(event)
+
+        assert [e.event for e in received] == ["token", "ui", "token", "stream_end"]
+        assert json.loads(received[0].data)["content"] == "Hel"
+
+    @pytest.mark.asyncio
+    async def test_process_stream_flushes_tokens_when_stream_fails(self, mock_run_id):
+        processor = StreamProcessor(token_flush_interval=10)
+        received: list[BaseEvent] = []
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="partial"), {}))
+            raise RuntimeError("model failed")
+
+        with pytest.raises(RuntimeError, match="model failed"):
+            async for event in processor.process_stream(mock_stream(), mock_run_id):
+                received.append(event)
+
+        assert [json.loads(e.data)["content"] for e in received] == ["partial"]
+
+    @pytest.mark.asyncio
+    async def test_tokens_profile_skips_ai_messages_without_converting(
+        self, stream_processor, mock_run_id
+    ):
+        options = StreamOptions(profile=StreamProfile.TOKENS)
+        tool_call = AIMessage(
+            content="",
+            tool_calls=[{"id": "call_1", "name": "get_weather", "args": {}}],
+        )
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="Hi"), {}))
+            yield ("updates", {"call_model": {"messages": [AIMessage(content="Hi")]}})
+            yield ("updates", {"call_model": {"messages": [tool_call]}})
+
+        with patch(
+            "app.agent.services.stream_processor.to_chat_message",
+            wraps=to_chat_message,
+        ) as converter:
+            events = [
+                e
+                async for e in stream_processor.process_stream(
+                    mock_stream(), mock_run_id, options=options
+                )
+            ]
+
+        assert [e.event for e in events] == ["token", "tool_call", "stream_end"]
+        converter.assert_called_once_with(tool_call)
+
+    @pytest.mark.asyncio
+    async def test_messages_profile_skips_tokens(self, stream_processor, mock_run_id):
+        options = StreamOptions(profile=StreamProfile.MESSAGES)
+
+        async def mock_stream():
+            yield ("messages", (AIMessageChunk(content="Hi"), {}))
+            yield ("updates", {"call_model": {"messages": [AIMessage(content="Hi")]}})
+
+        events = [
+            e
+            async for e in stream_processor.process_stream(
+                mock_stream(), mock_run_id, options=options
+            )
+        ]
+
+        assert [e.event for e in events] == ["ai_message", "stream_end"]
+
+    def test_stream_options_request_only_needed_modes(self):
+        assert StreamOptions().stream_modes() == ["updates", "messages", "custom"]
+        assert StreamOptions(profile=StreamProfile.MESSAGES).stream_modes() == [
+            "updates",
+            "custom",
+        ]
+        assert StreamOptions(event_types=frozenset({"token"})).stream_modes() == [
+            "messages"
+        ]
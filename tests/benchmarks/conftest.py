@@ -0,0 +1,26 @@
+import pytest
+
+from tests.benchmarks.harness import UPDATE_BASELINES, BenchmarkResult, save_baselines
+
+_results: list[BenchmarkResult] = []
+
+
+@pytest.fixture
+def benchmark_results() -> list[BenchmarkResult]:
+    return _results
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    if UPDATE_BASELINES and _results:
+        save_baselines(_results)
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    if not _results:
+        return
+
+    terminalreporter.section("benchmarks")
+    for result in _results:
+        terminalreporter.write_line(result.format())
+    if UPDATE_BASELINES:
+        terminalreporter.write_line("baselines updated")
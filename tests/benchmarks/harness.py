@@ -0,0 +1,245 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+BASELINES = Path(__file__).with_name("baselines.json")
+UPDATE_BASELINES = os.getenv("BENCHMARK_UPDATE_BASELINES") == "1"
+THROUGHPUT_TOLERANCE = float(os.getenv("BENCHMARK_THROUGHPUT_TOLERANCE", "0.5"))
+ALLOCATION_TOLERANCE = float(os.getenv("BENCHMARK_ALLOCATION_TOLERANCE", "0.5"))
+REPEAT = 3
+
+
+def reference_rate() -> float:
+    """Items per second of a fixed JSON-encoding workload, timed next to each
+    benchmark; throughput is saved and compared relative to it, so baselines
+    carry over between machines and load levels.
+    """
+    items = [
+        {"id": f"ai_{i}", "content": "Сонячно і тепло, " * 10, "n": list(range(10))}
+        for i in range(2_000)
+    ]
+    fastest = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        for item in items:
+            json.dumps(item).encode()
+        fastest = min(fastest, time.perf_counter() - started)
+    return len(items) / fastest
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    events: int
+    seconds: float
+    output_bytes: int
+    allocated_bytes: int
+    latencies: Sequence[float] = field(default=(), repr=False)
+    reference_per_sec: float = 0.0
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+    @property
+    def relative_throughput(self) -> float:
+        """Events per second as a multiple of :func:`reference_rate`."""
+        if not self.reference_per_sec:
+            return 0.0
+        return self.events_per_sec / self.reference_per_sec
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.output_bytes / self.seconds if self.seconds else 0.0
+
+    @property
+    def output_bytes_per_event(self) -> float:
+        return self.output_bytes / self.events if self.events else 0.0
+
+    @property
+    def allocated_bytes_per_event(self) -> float:
+        return self.allocated_bytes / self.events if self.events else 0.0
+
+    def percentile(self, pct: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[pct - 1]
+
+    def format(self) -> str:
+        line = (
+            f"{self.name:<40} {self.events_per_sec:>12,.0f} ev/s "
+            f"{self.relative_throughput:>6.2f}x ref "
+            f"{self.bytes_per_sec / 1_000_000:>9.1f} MB/s "
+            f"{self.allocated_bytes_per_event:>9,.0f} B peak/ev"
+        )
+        if self.latencies:
+            line += (
+                f" p50 {self.percentile(50) * 1e6:>8.1f} us"
+                f" p99 {self.percentile(99) * 1e6:>8.1f} us"
+            )
+        return line
+
+    def to_baseline(self) -> dict[str, float]:
+        return {
+            "relative_throughput": round(self.relative_throughput, 4),
+            "output_bytes_per_event": round(self.output_bytes_per_event, 1),
+            "allocated_bytes_per_event": round(self.allocated_bytes_per_event, 1),
+            "p50_us": round(self.percentile(50) * 1e6, 1),
+            "p99_us": round(self.percentile(99) * 1e6, 1),
+        }
+
+
+def measure(
+    name: str, items: Sequence[Any], encode: Callable[[Any], bytes]
+) -> BenchmarkResult:
+    """Time *encode* over *items*, keeping the fastest of ``REPEAT`` passes,
+    then re-run it under tracemalloc.
+
+    Allocation is the per-event peak of traced memory, i.e. the transient
+    working set needed to produce one frame.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.stop()
+
+    seconds = float("inf")
+    for _ in range(REPEAT):
+        output_bytes = 0
+        timings: list[float] = []
+        started = time.perf_counter()
+        for item in items:
+            item_started = time.perf_counter()
+            output_bytes += len(encode(item))
+            timings.append(time.perf_counter() - item_started)
+        elapsed = time.perf_counter() - started
+        if elapsed < seconds:
+            seconds, latencies = elapsed, timings
+    reference = reference_rate()
+
+    tracemalloc.start()
+    allocated = 0
+    try:
+        for item in items:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            encode(item)
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - baseline
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        name,
+        len(items),
+        seconds,
+        output_bytes,
+        allocated,
+        latencies,
+        reference,
+    )
+
+
+async def measure_stream(
+    name: str,
+    run: Callable[[], AsyncIterator[Any]],
+    size: Callable[[Any], int],
+) -> BenchmarkResult:
+    """Drain the stream returned by *run*, timed ``REPEAT`` times keeping the
+    fastest pass, then once more under tracemalloc.
+
+    Latency is the time the consumer waited for each output event; allocation
+    is the peak traced memory between consecutive events.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.stop()
+
+    seconds = float("inf")
+    for _ in range(REPEAT):
+        events = 0
+        output_bytes = 0
+        waits: list[float] = []
+        started = last = time.perf_counter()
+        async for event in run():
+            now = time.perf_counter()
+            waits.append(now - last)
+            events += 1
+            output_bytes += size(event)
+            last = time.perf_counter()
+        elapsed = time.perf_counter() - started
+        if elapsed < seconds:
+            seconds, latencies = elapsed, waits
+    reference = reference_rate()
+
+    tracemalloc.start()
+    allocated = 0
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        async for _event in run():
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += max(peak - baseline, 0)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        name, events, seconds, output_bytes, allocated, latencies, reference
+    )
+
+
+def load_baselines() -> dict[str, dict[str, float]]:
+    if not BASELINES.exists():
+        return {}
+    data: dict[str, dict[str, float]] = json.loads(BASELINES.read_text())
+    return data
+
+
+def save_baselines(results: Sequence[BenchmarkResult]) -> None:
+    baselines = load_baselines()
+    baselines.update({result.name: result.to_baseline() for result in results})
+    BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def regressions(result: BenchmarkResult) -> list[str]:
+    """Compare *result* with its saved baseline and describe any regression.
+
+    Throughput is compared relative to the reference workload timed alongside
+    it, and with allocation, within a tolerance; output size is
+    deterministic and must not grow.
+    """
+    baseline = load_baselines().get(result.name)
+    if baseline is None:
+        return []
+
+    current = result.to_baseline()
+    problems = []
+    if current["relative_throughput"] < baseline["relative_throughput"] * (
+        1 - THROUGHPUT_TOLERANCE
+    ):
+        problems.append(
+            f"{result.name}: {current['relative_throughput']:.2f}x reference "
+            f"vs baseline {baseline['relative_throughput']:.2f}x"
+        )
+    if current["allocated_bytes_per_event"] > baseline["allocated_bytes_per_event"] * (
+        1 + ALLOCATION_TOLERANCE
+    ):
+        problems.append(
+            f"{result.name}: {current['allocated_bytes_per_event']:,.0f} B/ev "
+            f"allocated vs baseline {baseline['allocated_bytes_per_event']:,.0f}"
+        )
+    if current["output_bytes_per_event"] > baseline["output_bytes_per_event"]:
+        problems.append(
+            f"{result.name}: {current['output_bytes_per_event']:,.1f} B/ev "
+            f"output vs baseline {baseline['output_bytes_per_event']:,.1f}"
+        )
+    return problems
@@ -0,0 +1,109 @@
+import json
+from uuid import uuid4
+
+import pytest
+from pydantic import BaseModel
+from sse_starlette.sse import ensure_bytes
+
+from app.agent.models import AIMessage, Token, ToolCall
+from app.agent.services.events import EventEncoder, TokenEvent
+from app.agent.services.events.base_event import BaseEvent
+from tests.benchmarks.harness import THROUGHPUT_TOLERANCE, measure, regressions
+
+EVENTS = 5_000
+
+
+class LegacyEvent(BaseModel):
+    event: str
+    data: str
+
+
+def legacy_message(chat: BaseModel) -> bytes:
+    payload = chat.model_dump()
+    payload["source"] = "stream"
+    event = LegacyEvent(event=payload["type"], data=json.dumps(payload))
+    return ensure_bytes(event.model_dump(), "\r\n")
+
+
+def legacy_token(token: Token) -> bytes:
+    event = LegacyEvent(event="token", data=token.model_dump_json())
+    return ensure_bytes(event.model_dump(), "\r\n")
+
+
+encoder = EventEncoder()
+
+
+def encoded_message(chat: BaseModel) -> bytes:
+    return encoder.encode(
+        BaseEvent.from_model(
+            event=chat.type,  # type: ignore[attr-defined]
+            model=chat,
+            source="stream",
+        )
+    )
+
+
+def encoded_token(token: Token) -> bytes:
+    return encoder.encode(TokenEvent.from_data(token))
+
+
+def _messages() -> list[BaseModel]:
+    run_id = str(uuid4())
+    return [
+        AIMessage(run_id=run_id, content="Сонячно і тепло, " * 20)
+        if i % 2
+        else ToolCall(
+            run_id=run_id, id=f"call_{i}", name="get_weather", args={"city": "Kyiv"}
+        )
+        for i in range(EVENTS)
+    ]
+
+
+def _tokens() -> list[Token]:
+    run_id = str(uuid4())
+    return [Token(run_id=run_id, content=f"tok{i} ") for i in range(EVENTS)]
+
+
+def _parse(frame: bytes) -> tuple[str, dict[str, object]]:
+    lines = frame.decode().strip().split("\r\n")
+    fields = dict(line.split(": ", 1) for line in lines)
+    return fields["event"], json.loads(fields["data"])
+
+
+class TestEventEncoding:
+    def test_encoded_frames_match_legacy_frames(self):
+        for item in [*_messages()[:2], *_tokens()[:1]]:
+            legacy = legacy_token if isinstance(item, Token) else legacy_message
+            encoded = encoded_token if isinstance(item, Token) else encoded_message
+            assert _parse(encoded(item)) == _parse(legacy(item))
+
+    def test_model_source_is_appended_to_encoded_object(self):
+        token = Token(run_id="r", content="hi")
+        event = BaseEvent.from_model(event="token", model=token, source="stream")
+        assert json.loads(event.data) == {**token.model_dump(), "source": "stream"}
+
+    def test_multiline_data_is_split_into_data_lines(self):
+        frame = encoder.encode(BaseEvent(event="x", data=b"a\nb"), event_id="7")
+        assert frame == b"id: 7\r\nevent: x\r\ndata: a\r\ndata: b\r\n\r\n"
+
+    @pytest.mark.slow
+    @pytest.mark.parametrize(
+        ("name", "items", "legacy", "encoded"),
+        [
+            ("messages", _messages, legacy_message, encoded_message),
+            ("tokens", _tokens, legacy_token, encoded_token),
+        ],
+    )
+    def test_encoder_outperforms_legacy_path(
+        self, benchmark_results, name, items, legacy, encoded
+    ):
+        payloads = items()
+        before = measure(f"sse/{name}/legacy", payloads, legacy)
+        after = measure(f"sse/{name}/encoder", payloads, encoded)
+        benchmark_results.extend([before, after])
+
+        # Both paths are timed in this run; the tolerance absorbs machine noise.
+        assert after.events_per_sec > before.events_per_sec * (1 - THROUGHPUT_TOLERANCE)
+        assert after.output_bytes <= before.output_bytes
+        assert after.allocated_bytes <= before.allocated_bytes
+        assert not regressions(after)
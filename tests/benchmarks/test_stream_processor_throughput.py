@@ -0,0 +1,136 @@
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from app.agent.langgraph.utils import to_chat_message
+from app.agent.models import CustomUIMessage
+from app.agent.services.stream_processor import StreamProcessor
+from tests.benchmarks.harness import measure, measure_stream, regressions
+
+Trace = list[tuple[str, Any]]
+
+
+def _answer(i: int) -> AIMessage:
+    return AIMessage(id=f"ai_{i}", content="Сонячно і тепло, " * 20)
+
+
+def _tool_calls(i: int, count: int) -> AIMessage:
+    return AIMessage(
+        id=f"ai_{i}",
+        content="",
+        tool_calls=[
+            {"id": f"call_{i}_{n}", "name": "get_weather", "args": {"city": "Kyiv"}}
+            for n in range(count)
+        ],
+    )
+
+
+def _tool_result(i: int, n: int) -> ToolMessage:
+    return ToolMessage(
+        id=f"tool_{i}_{n}",
+        tool_call_id=f"call_{i}_{n}",
+        name="get_weather",
+        content="The weather in Kyiv is sunny and 21°C!",
+    )
+
+
+def _ui(i: int) -> CustomUIMessage:
+    return CustomUIMessage(
+        component="file_upload",
+        id=f"doc-upload-{i % 3}",
+        params={"label": "Uploading", "progress": str(i % 100)},
+    )
+
+
+def token_heavy() -> Trace:
+    trace: Trace = [
+        ("messages", (AIMessageChunk(content=f"tok{i} "), {})) for i in range(5_000)
+    ]
+    trace.append(("updates", {"call_model": {"messages": [_answer(0)]}}))
+    return trace
+
+
+def tool_call_burst() -> Trace:
+    trace: Trace = []
+    for i in range(300):
+        trace.append(("updates", {"call_model": {"messages": [_tool_calls(i, 5)]}}))
+        trace.append(
+            ("updates", {"tools": {"messages": [_tool_result(i, n) for n in range(5)]}})
+        )
+    return trace
+
+
+def ui_flood() -> Trace:
+    return [("custom", _ui(i)) for i in range(3_000)]
+
+
+def large_updates() -> Trace:
+    return [
+        ("updates", {"call_model": {"messages": [_answer(i) for i in range(100)]}})
+        for _ in range(30)
+    ]
+
+
+TRACES: dict[str, Callable[[], Trace]] = {
+    "token_heavy": token_heavy,
+    "tool_call_burst": tool_call_burst,
+    "ui_flood": ui_flood,
+    "large_updates": large_updates,
+}
+
+# Flush intervals are far longer than a replay so coalesced output stays
+# deterministic; only size limits and structural events trigger a flush.
+PROCESSORS: dict[str, Callable[[], StreamProcessor]] = {
+    "passthrough": StreamProcessor,
+    "coalesced": lambda: StreamProcessor(
+        token_flush_interval=60,
+        token_flush_max_bytes=1024,
+        ui_flush_interval=60,
+    ),
+}
+
+
+async def _replay(trace: Trace) -> AsyncGenerator[tuple[str, Any]]:
+    for item in trace:
+        yield item
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("processor_name", PROCESSORS)
+@pytest.mark.parametrize("trace_name", TRACES)
+async def test_process_stream_throughput(benchmark_results, trace_name, processor_name):
+    trace = TRACES[trace_name]()
+    processor = PROCESSORS[processor_name]()
+
+    def run() -> AsyncGenerator[Any]:
+        return processor.process_stream(_replay(trace), uuid4())
+
+    result = await measure_stream(
+        f"stream/{trace_name}/{processor_name}", run, lambda e: len(e.data)
+    )
+    benchmark_results.append(result)
+
+    assert result.events > 1
+    assert not regressions(result)
+
+
+@pytest.mark.slow
+def test_to_chat_message_throughput(benchmark_results):
+    messages = [
+        *(_answer(i) for i in range(1_000)),
+        *(_tool_calls(i, 3) for i in range(1_000)),
+        *(_tool_result(i, 0) for i in range(1_000)),
+    ]
+
+    result = measure(
+        "models/to_chat_message",
+        messages,
+        lambda m: to_chat_message(m).model_dump_json().encode(),
+    )
+    benchmark_results.append(result)
+
+    assert not regressions(result)